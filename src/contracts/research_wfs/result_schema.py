@@ -106,6 +106,26 @@ class FxConfig(TypedDict):
     as_of: Optional[str]
 
 
+class ScreeningRung(TypedDict):
+    """One screening rung: candidates evaluated on a subset of IS windows."""
+    windows: List[int]  # IS window indices (season order)
+    candidates: int  # candidates evaluated in this rung
+    kept: int  # survivors passed to the next rung
+
+
+class ScreeningConfig(TypedDict):
+    """Parameter-screening strategy and the budget it spent."""
+    strategy: Literal["full", "successive_halving"]
+    eta: Optional[int]  # successive_halving: keep 1/eta per rung
+    min_windows: Optional[int]  # successive_halving: IS windows in the first rung
+    top_k: int
+    candidates: int
+    windows: int
+    rungs: List[ScreeningRung]
+    evaluations: int  # candidate x window simulations actually run
+    full_evaluations: int  # candidates x windows
+
+
 class ConfigSection(BaseModel):
     """Configuration used for the research run."""
     instrument: InstrumentConfig
@@ -113,6 +133,7 @@ class ConfigSection(BaseModel):
     risk: RiskConfig
     data: DataConfig
     fx: Optional[FxConfig] = None
+    screening: Optional[ScreeningConfig] = None
     
     model_config = ConfigDict(frozen=True)
 
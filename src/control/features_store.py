@@ -70,6 +70,21 @@ def features_path(
     return dir_path / f"features_{tf_min}m.npz"
 
 
+def features_state_path(
+    outputs_root: Path,
+    season: str,
+    dataset_id: str,
+    tf_min: Timeframe,
+) -> Path:
+    """
+    取得 features 續算狀態檔路徑（INCREMENTAL 從上次的 checkpoint 繼續計算）
+
+    建議位置：cache/shared/{season}/{dataset_id}/features/features_{tf_min}m.state.npz
+    """
+    dir_path = features_dir(outputs_root, season, dataset_id)
+    return dir_path / f"features_{tf_min}m.state.npz"
+
+
 def write_features_npz_atomic(
     path: Path,
     features_dict: Dict[str, np.ndarray],
@@ -40,7 +40,7 @@ class CommissionConfig:
 
 def compute_stress_matrix(
     bars: Dict[str, np.ndarray],
-    fills: List[Dict[str, Any]],
+    fills: List[Dict[str, Any]] | Any,
     commission_config: CommissionConfig,
     slippage_policy: SlippagePolicy,
     tick_size_map: Dict[str, float],  # 商品符號 -> tick_size
@@ -51,7 +51,8 @@ def compute_stress_matrix(
 
     Args:
         bars: 價格 bars 字典，至少包含 "open", "high", "low", "close"
-        fills: 成交列表，每個成交為字典，包含 "entry_price", "exit_price", "entry_side", "exit_side", "quantity" 等欄位
+        fills: 成交列表，每個成交為字典，包含 "entry_price", "exit_price", "entry_side", "exit_side", "quantity" 等欄位；
+            亦可傳入 simulator 的 TradeLedger（或其 records 結構陣列），以向量方式計算
         commission_config: 手續費配置
         slippage_policy: 滑價政策
         tick_size_map: tick_size 對應表
@@ -105,7 +106,7 @@ def compute_stress_matrix(
 
 
 def _compute_net_with_slippage(
-    fills: List[Dict[str, Any]],
+    fills: List[Dict[str, Any]] | Any,
     slip_ticks: int,
     tick_size: float,
     commission_per_side: float,
@@ -113,6 +114,10 @@ def _compute_net_with_slippage(
     """
     計算給定滑價 tick 數下的淨利、總盈利、總虧損與交易次數
     """
+    records = getattr(fills, "records", fills)
+    if isinstance(records, np.ndarray) and records.dtype.names:
+        return _compute_net_with_slippage_records(records, slip_ticks, tick_size, commission_per_side)
+
     total_net = 0.0
     total_gross_profit = 0.0
     total_gross_loss = 0.0
@@ -162,6 +167,49 @@ def _compute_net_with_slippage(
     return total_net, total_gross_profit, total_gross_loss, trades
 
 
+def _compute_net_with_slippage_records(
+    records: np.ndarray,
+    slip_ticks: int,
+    tick_size: float,
+    commission_per_side: float,
+) -> Tuple[float, float, float, int]:
+    """
+    `_compute_net_with_slippage` 的向量版本，輸入為 TRADE_LEDGER_DTYPE 結構陣列
+    （direction: +1 多 / -1 空，每筆 1 口）。
+
+    累加使用 np.cumsum（由左至右逐筆相加），結果與逐筆迴圈版本逐位元相同。
+    """
+    if tick_size <= 0:
+        raise ValueError(f"tick_size 必須 > 0，收到: {tick_size}")
+    if slip_ticks < 0:
+        raise ValueError(f"slip_ticks 必須 >= 0，收到: {slip_ticks}")
+    if records.shape[0] == 0:
+        return 0.0, 0.0, 0.0, 0
+
+    slippage_amount = slip_ticks * tick_size
+    is_long = records["direction"] > 0
+    entry = records["entry_price"]
+    exit_ = records["exit_price"]
+    # 多頭：buy 進、sell 出；空頭：sellshort 進、buytocover 出
+    entry_adj = np.where(is_long, entry + slippage_amount, entry - slippage_amount)
+    exit_adj = np.where(is_long, exit_ - slippage_amount, exit_ + slippage_amount)
+    gross = np.where(is_long, exit_adj - entry_adj, entry_adj - exit_adj)
+
+    commission_total = 2 * commission_per_side * 1.0
+    net = gross - commission_total
+    win = net > 0
+
+    def _seq_sum(x: np.ndarray) -> float:
+        return float(np.cumsum(x)[-1]) if x.size else 0.0
+
+    return (
+        _seq_sum(net),
+        _seq_sum(net[win] + commission_total),
+        _seq_sum(net[~win] - commission_total),
+        int(records.shape[0]),
+    )
+
+
 def survive_s2(
     result_s2: StressResult,
     *,
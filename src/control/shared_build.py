@@ -8,8 +8,13 @@ Shared Data Build 控制器
 from __future__ import annotations
 
 import hashlib
+import logging
+import zipfile
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Literal, Optional, Tuple
 import numpy as np
 import pandas as pd
 
@@ -38,7 +43,7 @@ from control.bars_store import (
 from core.resampler import (
     get_session_spec_for_dataset,
     normalize_raw_bars,
-    resample_ohlcv,
+    resample_ohlcv_multi,
     compute_safe_recompute_start,
     SessionSpecTaipei,
 )
@@ -49,9 +54,11 @@ from core.bars_contract import (
     create_bars_manifest_entry,
 )
 from core.features import compute_features_for_tf
+from core.features.online import FeatureState, capture_feature_state, resume_features_for_tf
 from control.features_store import (
     features_dir,
     features_path,
+    features_state_path,
     write_features_npz_atomic,
     load_features_npz,
     compute_features_sha256_dict,
@@ -64,6 +71,8 @@ from control.features_manifest import (
 )
 from core.paths import get_shared_cache_root
 
+logger = logging.getLogger(__name__)
+
 
 BuildMode = Literal["FULL", "INCREMENTAL"]
 
@@ -92,6 +101,8 @@ def build_shared(
     feature_scope: str = "BASELINE",
     feature_registry: Optional[FeatureRegistry] = None,
     tfs: Optional[List[int]] = None,
+    max_threads: Optional[int] = None,
+    verify_incremental: bool = False,
 ) -> dict:
     """
     Build shared data with governance gate.
@@ -123,6 +134,8 @@ def build_shared(
         feature_scope: 特徵 scope（BASELINE / ALL_PACKS）
         feature_registry: 特徵註冊表，若為 None 則依 feature_scope 決定
         tfs: timeframe 分鐘數列表，預設為 [15, 30, 60, 120, 240]
+        max_threads: features cache 的並行 thread 上限（None 為循序）；輸出與循序建置相同
+        verify_incremental: INCREMENTAL 拼接 resampled bars / 續算 features 後另做完整重建比對（不一致時 raise ValueError）
 
     Returns:
         build report dict（deterministic keys）
@@ -186,6 +199,7 @@ def build_shared(
             diff=diff,
             tfs=tfs,
             build_bars=True,
+            verify_incremental=verify_incremental,
         )
         
         # 寫入 bars manifest
@@ -234,6 +248,8 @@ def build_shared(
             tfs=tfs,
             registry=registry,
             session_spec=bars_cache_report["session_spec"] if bars_cache_report else None,
+            max_threads=max_threads,
+            verify_incremental=verify_incremental,
         )
         
         # 寫入 features manifest
@@ -286,6 +302,7 @@ def build_shared(
         report["dimension_found"] = bars_cache_report["dimension_found"]
         report["session_spec"] = bars_cache_report["session_spec"]
         report["safe_recompute_start_by_tf"] = bars_cache_report["safe_recompute_start_by_tf"]
+        report["incremental_splice_by_tf"] = bars_cache_report["incremental_splice_by_tf"]
         report["bars_files_sha256"] = bars_cache_report["files_sha256"]
         report["bars_manifest_sha256"] = bars_manifest_sha256
     
@@ -294,6 +311,7 @@ def build_shared(
         report["features_files_sha256"] = features_cache_report["files_sha256"]
         report["features_manifest_sha256"] = features_manifest_sha256
         report["lookback_rewind_by_tf"] = features_cache_report["lookback_rewind_by_tf"]
+        report["incremental_resume_by_tf"] = features_cache_report["incremental_resume_by_tf"]
     
     # 如果是 INCREMENTAL 模式且 append_only 或 is_new，標記為增量成功
     if mode == "INCREMENTAL" and (diff["append_only"] or diff["is_new"]):
@@ -452,6 +470,7 @@ def _build_bars_cache(
     diff: Dict[str, Any],
     tfs: Optional[List[int]] = None,
     build_bars: bool = True,
+    verify_incremental: bool = False,
 ) -> Dict[str, Any]:
     """
     建立 bars cache（normalized + resampled）
@@ -462,6 +481,7 @@ def _build_bars_cache(
         - 先載入現有的 normalized_bars.npz（若不存在 -> 當 FULL）
         - 合併新舊 normalized（驗證時間單調遞增、無重疊）
         - 對每個 tf：計算 safe_recompute_start，重算 safe 區段，與舊 prefix 拼接
+          （只 resample safe point 之後的 normalized bars；上一版 resampled 檔不可用時完整重建）
     
     Args:
         season: 季節標記
@@ -472,12 +492,14 @@ def _build_bars_cache(
         diff: 指紋比較結果
         tfs: timeframe 分鐘數列表
         build_bars: 是否建立 bars cache
+        verify_incremental: INCREMENTAL 拼接後另做完整重建比對，不一致時 raise ValueError
         
     Returns:
         bars cache 報告，包含：
             - dimension_found: bool
             - session_spec: dict
             - safe_recompute_start_by_tf: dict
+            - incremental_splice_by_tf: dict（各 tf 是否由上一版 prefix 拼接）
             - files_sha256: dict
             - bars_manifest_sha256: str
     """
@@ -486,6 +508,7 @@ def _build_bars_cache(
             "dimension_found": False,
             "session_spec": None,
             "safe_recompute_start_by_tf": {},
+            "incremental_splice_by_tf": {},
             "files_sha256": {},
             "bars_manifest_sha256": None,
             "bars_built": False,
@@ -502,11 +525,14 @@ def _build_bars_cache(
     normalized = normalize_raw_bars(raw_ingest_result)
 
     # 3. 處理 INCREMENTAL 模式
+    append_start_dt = None  # 新資料第一筆時間（成功接在現有 normalized bars 之後時）
+    previous_norm_sha256 = None
     if mode == "INCREMENTAL" and diff["append_only"]:
         # 嘗試載入現有的 normalized bars
         norm_path = normalized_bars_path(outputs_root, season, dataset_id)
         try:
             existing_norm = load_npz(norm_path)
+            previous_norm_sha256 = sha256_file(norm_path)
             
             # 驗證現有 normalized bars 的結構
             required_keys = {"ts", "open", "high", "low", "close", "volume"}
@@ -514,23 +540,26 @@ def _build_bars_cache(
                 raise ValueError(f"現有 normalized bars 缺少必要欄位: {existing_norm.keys()}")
             
             # 合併新舊 normalized bars
-            # 確保新資料的時間在舊資料之後（append-only）
+            # append-only（舊日期指紋未變）時 TXT 中舊資料段應與現有 normalized 相同，
+            # 只取最後一筆舊資料之後的新 bars；重疊段的結尾與現有檔案不符時改為完整重建
             last_existing_ts = existing_norm["ts"][-1]
-            first_new_ts = normalized["ts"][0]
-            
-            if first_new_ts <= last_existing_ts:
-                raise ValueError(
-                    f"INCREMENTAL 模式要求新資料在舊資料之後，但 "
-                    f"first_new_ts={first_new_ts} <= last_existing_ts={last_existing_ts}"
+            new_from = int(np.searchsorted(normalized["ts"], last_existing_ts, side="right"))
+            overlap = min(new_from, len(existing_norm["ts"]))
+            if overlap == 0 or not _same_bars(
+                {key: normalized[key][new_from - overlap:new_from] for key in required_keys},
+                {key: existing_norm[key][-overlap:] for key in required_keys},
+            ):
+                logger.warning(
+                    "TXT 的舊資料段與現有 normalized bars 不符，改為完整重建: %s", norm_path
                 )
-            
-            # 合併 arrays
-            merged = {}
-            for key in required_keys:
-                merged[key] = np.concatenate([existing_norm[key], normalized[key]])
-            
-            normalized = merged
-            
+            else:
+                appended = {key: normalized[key][new_from:] for key in required_keys}
+                normalized = {
+                    key: np.concatenate([existing_norm[key], appended[key]]) for key in required_keys
+                }
+                if len(appended["ts"]) > 0:
+                    append_start_dt = pd.Timestamp(appended["ts"][0]).to_pydatetime()
+
         except FileNotFoundError:
             # 檔案不存在，當作 FULL 處理
             pass
@@ -574,26 +603,77 @@ def _build_bars_cache(
     else:
         first_ts_dt = None
     
+    # INCREMENTAL 且成功接上現有 normalized bars：上一版 resampled bars 可作為 prefix 的 tf
+    # 只重算 safe point 之後的尾段再拼接；其餘 tf 完整重建
+    previous_resampled = {}
+    if append_start_dt is not None:
+        previous_resampled = _previous_resampled_bars(
+            outputs_root=outputs_root,
+            season=season,
+            dataset_id=dataset_id,
+            tfs=tfs,
+            session_spec=session_spec,
+            previous_norm_sha256=previous_norm_sha256,
+        )
+    
+    safe_start_by_tf = {}
+    append_safe_start_by_tf = {}
     for tf in tfs:
         # 計算 safe recompute start（如果是 INCREMENTAL append-only）
         safe_start = None
         if mode == "INCREMENTAL" and diff["append_only"] and first_ts_dt is not None:
             safe_start = compute_safe_recompute_start(first_ts_dt, tf, session_spec, dataset_id=dataset_id)
             safe_recompute_start_by_tf[str(tf)] = safe_start.isoformat() if safe_start else None
-        
-        # 進行 resample
-        resampled = resample_ohlcv(
-            ts=normalized["ts"],
-            o=normalized["open"],
-            h=normalized["high"],
-            l=normalized["low"],
-            c=normalized["close"],
-            v=normalized["volume"],
-            tf_min=tf,
+        safe_start_by_tf[tf] = safe_start
+        if tf in previous_resampled:
+            append_safe_start_by_tf[tf] = compute_safe_recompute_start(
+                append_start_dt, tf, session_spec, dataset_id=dataset_id
+            )
+    
+    def _resample(ts_from: int, tfs_: List[int], start_ts: Dict[int, Any]) -> Dict[int, Dict[str, np.ndarray]]:
+        # 一次 resample 多個 timeframe（時段過濾與 session anchor 只做一次，粗 tf 由細 tf 聚合）
+        return resample_ohlcv_multi(
+            ts=normalized["ts"][ts_from:],
+            o=normalized["open"][ts_from:],
+            h=normalized["high"][ts_from:],
+            l=normalized["low"][ts_from:],
+            c=normalized["close"][ts_from:],
+            v=normalized["volume"][ts_from:],
+            tfs=tfs_,
             session=session_spec,
             dataset_id=dataset_id,
-            start_ts=safe_start,
+            start_ts=start_ts,
+        )
+    
+    resampled_by_tf = {}
+    if append_safe_start_by_tf:
+        # normalized ts 已通過 Gate（遞增），safe point 之前的 bars 不必再轉換與過濾
+        tail_from = min(
+            int(np.searchsorted(normalized["ts"], np.datetime64(safe, "s"), side="left"))
+            for safe in append_safe_start_by_tf.values()
         )
+        tail_by_tf = _resample(tail_from, list(append_safe_start_by_tf), append_safe_start_by_tf)
+        for tf, safe in append_safe_start_by_tf.items():
+            spliced = _splice_resampled(previous_resampled[tf], tail_by_tf[tf], safe)
+            if spliced is not None:
+                resampled_by_tf[tf] = spliced
+                safe_recompute_start_by_tf[str(tf)] = safe.isoformat()
+    
+    rebuild_tfs = [tf for tf in tfs if tf not in resampled_by_tf]
+    if rebuild_tfs:
+        resampled_by_tf.update(_resample(0, rebuild_tfs, safe_start_by_tf))
+    splice_by_tf = {str(tf): tf not in rebuild_tfs for tf in tfs}
+    
+    if verify_incremental and len(rebuild_tfs) < len(tfs):
+        # 驗證模式：拼接結果必須與完整重建逐位元相同
+        spliced_tfs = [tf for tf in tfs if tf not in rebuild_tfs]
+        full_by_tf = _resample(0, spliced_tfs, safe_start_by_tf)
+        for tf in spliced_tfs:
+            if not _same_bars(resampled_by_tf[tf], full_by_tf[tf]):
+                raise ValueError(f"INCREMENTAL 拼接結果與完整重建不一致: {tf}m")
+    
+    for tf in tfs:
+        resampled = resampled_by_tf[tf]
         
         # 寫入 resampled bars
         resampled_path = resampled_bars_path(outputs_root, season, dataset_id, tf)
@@ -658,12 +738,218 @@ def _build_bars_cache(
             "tz": session_spec.tz,
         },
         "safe_recompute_start_by_tf": safe_recompute_start_by_tf,
+        "incremental_splice_by_tf": splice_by_tf,
         "files_sha256": files_sha256,
         "bars_manifest_data": bars_manifest_data,
         "bars_built": True,
     }
 
 
+def _previous_resampled_bars(
+    *,
+    outputs_root: Path,
+    season: str,
+    dataset_id: str,
+    tfs: List[int],
+    session_spec: SessionSpecTaipei,
+    previous_norm_sha256: Optional[str],
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    上一次建置留下、可作為 INCREMENTAL 拼接 prefix 的 resampled bars
+
+    只採用上一版 bars manifest 記錄的檔案（SHA256 相符、由同一份 normalized bars 產生），
+    且 session 規格與 resample 起點未變；不符合的 tf 不在回傳中（改為完整重建）。
+    """
+    from control.bars_manifest import bars_manifest_path, load_bars_manifest
+
+    try:
+        manifest = load_bars_manifest(bars_manifest_path(outputs_root, season, dataset_id))
+    except (FileNotFoundError, ValueError):
+        return {}
+    files = manifest.get("files") or {}
+    same_spec = (
+        manifest.get("resample_anchor_start") == RESAMPLE_ANCHOR_START.strftime("%Y-%m-%d %H:%M:%S")
+        and manifest.get("session_open_taipei") == session_spec.open_hhmm
+        and manifest.get("session_close_taipei") == session_spec.close_hhmm
+        and [list(b) for b in manifest.get("breaks_taipei") or []] == [list(b) for b in session_spec.breaks]
+    )
+    if not same_spec or previous_norm_sha256 is None or files.get("normalized_bars.npz") != previous_norm_sha256:
+        return {}
+
+    required_keys = {"ts", "open", "high", "low", "close", "volume"}
+    previous = {}
+    for tf in tfs:
+        path = resampled_bars_path(outputs_root, season, dataset_id, tf)
+        if not path.exists() or files.get(f"resampled_{tf}m.npz") != sha256_file(path):
+            continue
+        try:
+            bars = load_npz(path)
+        except ValueError:
+            continue
+        if set(bars) == required_keys:
+            previous[tf] = bars
+    return previous
+
+
+def _splice_resampled(
+    previous: Dict[str, np.ndarray],
+    tail: Dict[str, np.ndarray],
+    safe_start: datetime,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    上一版 resampled bars 中 ts < safe_start 的部分 + safe_start 之後重算的尾段
+
+    早於 safe_start 的 bucket 只由 safe_start 之前（上一版已有）的 bars 組成，因此只要尾段
+    沒有早於 safe_start 的 bucket，拼接結果即與完整重建相同；否則回傳 None（改為完整重建）。
+    """
+    safe64 = np.datetime64(safe_start, "s")
+    if len(tail["ts"]) > 0 and tail["ts"][0] < safe64:
+        return None
+    keep = int(np.searchsorted(previous["ts"], safe64, side="left"))
+    spliced = {}
+    for key, values in tail.items():
+        if previous[key].dtype != values.dtype:
+            return None
+        spliced[key] = np.concatenate([previous[key][:keep], values])
+    return spliced
+
+
+def _same_bars(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> bool:
+    """兩組 bars 欄位、dtype 與內容（含 NaN 位元）完全相同"""
+    return set(a) == set(b) and all(
+        a[k].dtype == b[k].dtype and a[k].shape == b[k].shape and a[k].tobytes() == b[k].tobytes() for k in a
+    )
+
+
+def _split_feature_threads(max_threads: Optional[int], n_tfs: int) -> Tuple[int, Optional[int]]:
+    """
+    把 max_threads 分配為 (並行 tf 數, 每個 tf 內特徵計算的 thread 數)
+
+    None / 1 表示全部循序（原行為）。
+    """
+    if max_threads is None or max_threads <= 1 or n_tfs == 0:
+        return 1, None
+    tf_threads = min(max_threads, n_tfs)
+    per_tf = max_threads // tf_threads
+    return tf_threads, (per_tf if per_tf > 1 else None)
+
+
+def _build_features_for_tf(
+    *,
+    tf: int,
+    season: str,
+    dataset_id: str,
+    outputs_root: Path,
+    mode: BuildMode,
+    diff: Dict[str, Any],
+    registry: FeatureRegistry,
+    session_spec_obj: Any,
+    max_threads: Optional[int],
+    verify_incremental: bool = False,
+) -> Tuple[Optional[str], str, Optional[bool]]:
+    """
+    建立單一 timeframe 的 features NPZ 與續算狀態（_build_features_cache 的每個 tf 步驟）
+
+    INCREMENTAL（append-only）時，若上一版 features 與其續算狀態可用，只計算上一版 checkpoint
+    之後的 bars（見 core.features.online）；否則完整計算。兩者都會寫出新的續算狀態。
+
+    Returns:
+        (重算起點 ts（僅續算時；否則 None）, features NPZ 的 SHA256,
+         是否續算（僅 INCREMENTAL append-only；否則 None）)
+    """
+    # 1. 載入 resampled bars
+    resampled_path = resampled_bars_path(outputs_root, season, dataset_id, tf)
+    if not resampled_path.exists():
+        raise FileNotFoundError(
+            f"無法建立 features cache：resampled bars 不存在於 {resampled_path}。"
+            "請先建立 bars cache。"
+        )
+
+    resampled_data = load_npz(resampled_path)
+
+    # 驗證必要 keys
+    required_keys = {"ts", "open", "high", "low", "close", "volume"}
+    missing_keys = required_keys - set(resampled_data.keys())
+    if missing_keys:
+        raise ValueError(f"resampled bars 缺少必要 keys: {missing_keys}")
+
+    ts = resampled_data["ts"]
+    o = resampled_data["open"]
+    h = resampled_data["high"]
+    l = resampled_data["low"]
+    c = resampled_data["close"]
+    v = resampled_data["volume"]
+
+    # 2. 建立 features / 續算狀態檔案路徑
+    features_path_obj = features_path(outputs_root, season, dataset_id, tf)
+    state_path = features_state_path(outputs_root, season, dataset_id, tf)
+
+    def _compute_full() -> Dict[str, np.ndarray]:
+        return compute_features_for_tf(
+            ts=ts,
+            o=o,
+            h=h,
+            l=l,
+            c=c,
+            v=v,
+            tf_min=tf,
+            registry=registry,
+            session_spec=session_spec_obj,
+            breaks_policy="drop",
+            max_threads=max_threads,
+        )
+
+    # 3. INCREMENTAL（append-only）：從上一版的續算狀態繼續
+    incremental = mode == "INCREMENTAL" and diff["append_only"]
+    resumed = None
+    rewind_info = None
+    if incremental:
+        previous = _previous_features_state(features_path_obj, state_path)
+        if previous is not None:
+            previous_features, previous_state = previous
+            resumed = resume_features_for_tf(
+                ts, o, h, l, c, v, tf, registry, session_spec_obj, previous_features, previous_state,
+            )
+            if resumed is not None and previous_state.checkpoint < len(ts):
+                rewind_info = str(ts[previous_state.checkpoint])
+
+    if resumed is None:
+        features = _compute_full()
+        state = capture_feature_state(ts, o, h, l, c, v, tf, registry)
+    else:
+        features, state, _ = resumed
+        if verify_incremental and not _same_bars(features, _compute_full()):
+            # 驗證模式：續算結果必須與完整計算逐位元相同
+            raise ValueError(f"INCREMENTAL features 續算結果與完整重建不一致: {tf}m")
+
+    write_features_npz_atomic(features_path_obj, features)
+    sha = sha256_file(features_path_obj)
+    # 狀態只搭配這一版 features 檔案使用
+    state.features_sha256 = sha
+    write_npz_atomic(state_path, state.to_arrays())
+    return rewind_info, sha, ((resumed is not None) if incremental else None)
+
+
+def _previous_features_state(
+    features_path_obj: Path,
+    state_path: Path,
+) -> Optional[Tuple[Dict[str, np.ndarray], FeatureState]]:
+    """
+    上一版 features 與其續算狀態；缺檔、檔案損毀/無法解析或狀態不是搭配該 features 檔案時為 None
+    （呼叫端改為完整計算）
+    """
+    if not features_path_obj.exists() or not state_path.exists():
+        return None
+    try:
+        state = FeatureState.from_arrays(load_npz(state_path))
+        if state.features_sha256 != sha256_file(features_path_obj):
+            return None
+        return load_features_npz(features_path_obj), state
+    except (ValueError, KeyError, OSError, EOFError, zipfile.BadZipFile) as e:
+        logger.warning("features 續算狀態不可用，改為完整計算: %s (%r)", state_path, e)
+        return None
+
+
 def _build_features_cache(
     *,
     season: str,
@@ -674,19 +960,21 @@ def _build_features_cache(
     tfs: Optional[List[int]] = None,
     registry: FeatureRegistry,
     session_spec: Optional[Dict[str, Any]] = None,
+    max_threads: Optional[int] = None,
+    verify_incremental: bool = False,
 ) -> Dict[str, Any]:
     """
     建立 features cache
     
     行為規格：
-    1. FULL 模式：對每個 tf 載入 resampled bars，計算 features，寫入 features NPZ
+    1. FULL 模式：對每個 tf 載入 resampled bars，計算 features，寫入 features NPZ 與續算狀態
+       （features_{tf}m.state.npz）
     2. INCREMENTAL（append-only）：
-        - 計算 lookback rewind：rewind_bars = registry.max_lookback_for_tf(tf)
-        - 找到 append_start 在 resampled ts 的 index
-        - rewind_start_idx = max(0, append_idx - rewind_bars)
-        - 載入現有 features（若存在），取 prefix (< rewind_start_ts)
-        - 計算 new_part（>= rewind_start_ts）
-        - 拼接 prefix + new_part 寫回
+        - 上一版 features 與續算狀態可用時（狀態搭配該 features 檔案、特徵規格未變、
+          checkpoint 之前的 bars 相同），保留上一版 checkpoint 之前的值
+        - 遞迴型特徵（EMA、Wilder ATR/RSI/ADX、MACD、z-score）從狀態繼續計算新 bars；
+          有限視窗型只重算新 bars 所需的尾段；session_vwap 等無法續算者整段重算
+        - 結果與 FULL 逐位元相同；否則（或狀態不可用時）完整計算
     
     Args:
         season: 季節標記
@@ -697,11 +985,14 @@ def _build_features_cache(
         tfs: timeframe 分鐘數列表
         registry: 特徵註冊表
         session_spec: session 規格字典（從 bars cache 取得）
+        max_threads: 並行 thread 上限（各 tf 並行，剩餘分給 tf 內特徵計算）；None 為循序
+        verify_incremental: 續算後另做完整計算比對（不一致時 raise ValueError）
         
     Returns:
         features cache 報告，包含：
             - files_sha256: dict
-            - lookback_rewind_by_tf: dict
+            - lookback_rewind_by_tf: dict（續算的 tf → 重算起點 ts）
+            - incremental_resume_by_tf: dict（僅 INCREMENTAL append-only；tf → 是否續算）
             - features_manifest_data: dict
     """
     # 如果未提供 tfs，從 registry 載入預設值
@@ -723,185 +1014,39 @@ def _build_features_cache(
             tz=session_spec.get("tz", "Asia/Taipei"),
         )
     
-    # 計算 append_start 資訊（如果是 INCREMENTAL append-only）
-    append_start_day = None
-    if mode == "INCREMENTAL" and diff["append_only"] and diff["append_range"]:
-        append_start_day = diff["append_range"]["start_day"]
-    
     lookback_rewind_by_tf = {}
+    resume_by_tf = {}
     files_sha256 = {}
     
-    for tf in tfs:
-        # 1. 載入 resampled bars
-        resampled_path = resampled_bars_path(outputs_root, season, dataset_id, tf)
-        if not resampled_path.exists():
-            raise FileNotFoundError(
-                f"無法建立 features cache：resampled bars 不存在於 {resampled_path}。"
-                "請先建立 bars cache。"
-            )
-        
-        resampled_data = load_npz(resampled_path)
-        
-        # 驗證必要 keys
-        required_keys = {"ts", "open", "high", "low", "close", "volume"}
-        missing_keys = required_keys - set(resampled_data.keys())
-        if missing_keys:
-            raise ValueError(f"resampled bars 缺少必要 keys: {missing_keys}")
-        
-        ts = resampled_data["ts"]
-        o = resampled_data["open"]
-        h = resampled_data["high"]
-        l = resampled_data["low"]
-        c = resampled_data["close"]
-        v = resampled_data["volume"]
-        
-        # 2. 建立 features 檔案路徑
-        features_path_obj = features_path(outputs_root, season, dataset_id, tf)
-        
-        # 3. 處理 INCREMENTAL 模式
-        if mode == "INCREMENTAL" and diff["append_only"] and append_start_day:
-            # 計算 lookback rewind
-            rewind_bars = registry.max_lookback_for_tf(tf)
-            
-            # 找到 append_start 在 ts 中的 index
-            # 將 append_start_day 轉換為 datetime64[s] 以便比較
-            # 這裡簡化處理：假設 append_start_day 是 YYYY-MM-DD 格式
-            # 實際實作需要更精確的時間比對
-            append_start_ts = np.datetime64(f"{append_start_day}T00:00:00")
-            
-            # 找到第一個 >= append_start_ts 的 index
-            append_idx = np.searchsorted(ts, append_start_ts, side="left")
-            
-            # 計算 rewind_start_idx
-            rewind_start_idx = max(0, append_idx - rewind_bars)
-            rewind_start_ts = ts[rewind_start_idx]
-            
-            # 儲存 lookback rewind 資訊
-            lookback_rewind_by_tf[str(tf)] = str(rewind_start_ts)
-            
-            # 嘗試載入現有 features（如果存在）
-            if features_path_obj.exists():
-                try:
-                    existing_features = load_features_npz(features_path_obj)
-                    
-                    # 驗證現有 features 的結構（依 registry 的 tf specs）
-                    feat_required_keys = {"ts"} | {s.name for s in registry.specs_for_tf(tf)}
-                    if not feat_required_keys.issubset(existing_features.keys()):
-                        missing = sorted(feat_required_keys - set(existing_features.keys()))
-                        raise ValueError(f"現有 features 缺少必要欄位: {missing}")
-                    
-                    # 找到現有 features 中 < rewind_start_ts 的部分
-                    existing_ts = existing_features["ts"]
-                    prefix_mask = existing_ts < rewind_start_ts
-                    
-                    if np.any(prefix_mask):
-                        # 建立 prefix arrays
-                        prefix_features = {}
-                        for key in feat_required_keys:
-                            prefix_features[key] = existing_features[key][prefix_mask]
-                        
-                        # 計算 new_part（從 rewind_start_ts 開始）
-                        new_mask = ts >= rewind_start_ts
-                        if np.any(new_mask):
-                            new_ts = ts[new_mask]
-                            new_o = o[new_mask]
-                            new_h = h[new_mask]
-                            new_l = l[new_mask]
-                            new_c = c[new_mask]
-                            new_v = v[new_mask]
-                            
-                            # 計算 new features
-                            new_features = compute_features_for_tf(
-                                ts=new_ts,
-                                o=new_o,
-                                h=new_h,
-                                l=new_l,
-                                c=new_c,
-                                v=new_v,
-                                tf_min=tf,
-                                registry=registry,
-                                session_spec=session_spec_obj,
-                                breaks_policy="drop",
-                            )
-                            
-                            # 拼接 prefix + new_part
-                            final_features = {}
-                            for key in feat_required_keys:
-                                final_features[key] = np.concatenate([prefix_features[key], new_features[key]])
-                            
-                            # 寫入 features NPZ
-                            write_features_npz_atomic(features_path_obj, final_features)
-                            
-                        else:
-                            # 沒有新的資料，直接使用現有 features
-                            write_features_npz_atomic(features_path_obj, existing_features)
-                    
-                    else:
-                        # 沒有 prefix，重新計算全部
-                        features = compute_features_for_tf(
-                            ts=ts,
-                            o=o,
-                            h=h,
-                            l=l,
-                            c=c,
-                            v=v,
-                            tf_min=tf,
-                            registry=registry,
-                            session_spec=session_spec_obj,
-                            breaks_policy="drop",
-                        )
-                        write_features_npz_atomic(features_path_obj, features)
-                    
-                except Exception as e:
-                    # 載入失敗，重新計算全部
-                    features = compute_features_for_tf(
-                        ts=ts,
-                        o=o,
-                        h=h,
-                        l=l,
-                        c=c,
-                        v=v,
-                        tf_min=tf,
-                        registry=registry,
-                        session_spec=session_spec_obj,
-                        breaks_policy="drop",
-                    )
-                    write_features_npz_atomic(features_path_obj, features)
-            
-            else:
-                # 檔案不存在，當作 FULL 處理
-                features = compute_features_for_tf(
-                    ts=ts,
-                    o=o,
-                    h=h,
-                    l=l,
-                    c=c,
-                    v=v,
-                    tf_min=tf,
-                    registry=registry,
-                    session_spec=session_spec_obj,
-                    breaks_policy="drop",
-                )
-                write_features_npz_atomic(features_path_obj, features)
-        
-        else:
-            # FULL 模式或非 append-only
-            features = compute_features_for_tf(
-                ts=ts,
-                o=o,
-                h=h,
-                l=l,
-                c=c,
-                v=v,
-                tf_min=tf,
-                registry=registry,
-                session_spec=session_spec_obj,
-                breaks_policy="drop",
-            )
-            write_features_npz_atomic(features_path_obj, features)
-        
-        # 計算 SHA256
-        files_sha256[f"features_{tf}m.npz"] = sha256_file(features_path_obj)
+    # 各 tf 互相獨立（各自讀 resampled bars、寫自己的 features NPZ），可並行；
+    # thread 預算先分給 tf，剩餘的再給每個 tf 內的特徵計算
+    tf_threads, feature_threads = _split_feature_threads(max_threads, len(tfs))
+    build_one_tf = partial(
+        _build_features_for_tf,
+        season=season,
+        dataset_id=dataset_id,
+        outputs_root=outputs_root,
+        mode=mode,
+        diff=diff,
+        registry=registry,
+        session_spec_obj=session_spec_obj,
+        max_threads=feature_threads,
+        verify_incremental=verify_incremental,
+    )
+    if tf_threads > 1:
+        with ThreadPoolExecutor(max_workers=tf_threads, thread_name_prefix="features-tf") as pool:
+            futures = [pool.submit(build_one_tf, tf=tf) for tf in tfs]
+            tf_results = [future.result() for future in futures]
+    else:
+        tf_results = [build_one_tf(tf=tf) for tf in tfs]
+
+    # 依 tfs 順序組裝（與循序建置相同的 key 順序）
+    for tf, (rewind_info, sha, resumed) in zip(tfs, tf_results):
+        if rewind_info is not None:
+            lookback_rewind_by_tf[str(tf)] = rewind_info
+        if resumed is not None:
+            resume_by_tf[str(tf)] = resumed
+        files_sha256[f"features_{tf}m.npz"] = sha
     
     # 建立 features manifest 資料
     # 將 FeatureSpec 轉換為可序列化的字典
@@ -926,6 +1071,7 @@ def _build_features_cache(
     return {
         "files_sha256": files_sha256,
         "lookback_rewind_by_tf": lookback_rewind_by_tf,
+        "incremental_resume_by_tf": resume_by_tf,
         "features_manifest_data": features_manifest_data,
     }
 
@@ -120,6 +120,18 @@ def shared_cli():
     default="15,30,60,120,240",
     help="Timeframes in minutes, comma-separated (default: 15,30,60,120,240)",
 )
+@click.option(
+    "--max-threads",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Threads for feature computation (default: sequential)",
+)
+@click.option(
+    "--verify-incremental",
+    is_flag=True,
+    default=False,
+    help="INCREMENTAL: also rebuild resampled bars / features in full and fail if the incremental result differs",
+)
 @click.option(
     "--json",
     "json_output",
@@ -143,6 +155,8 @@ def build_command(
     features_only: bool,
     dry_run: bool,
     tfs: str,
+    max_threads: Optional[int],
+    verify_incremental: bool,
     json_output: bool,
 ):
     """
@@ -234,6 +248,8 @@ def build_command(
             build_features=build_features,
             feature_scope=feature_scope.upper(),
             tfs=tf_list,
+            max_threads=max_threads,
+            verify_incremental=verify_incremental,
         )
         
         # 輸出結果
@@ -449,6 +465,10 @@ def _print_human_summary(report: dict):
                 if start:
                     click.echo(f"    {tf}m: {start}")
         
+        spliced = [tf for tf, ok in report.get("incremental_splice_by_tf", {}).items() if ok]
+        if spliced:
+            click.echo(f"  Tail-only resample (spliced): {', '.join(f'{tf}m' for tf in spliced)}")
+        
         bars_manifest_sha256 = report.get("bars_manifest_sha256")
         if bars_manifest_sha256:
             click.echo(f"  Bars manifest SHA256: {bars_manifest_sha256[:16]}...")
@@ -474,6 +494,10 @@ def _print_human_summary(report: dict):
             click.echo("  Lookback rewind by TF:")
             for tf, rewind_ts in lookback_rewind.items():
                 click.echo(f"    {tf}m: {rewind_ts}")
+        
+        resumed = [tf for tf, ok in report.get("incremental_resume_by_tf", {}).items() if ok]
+        if resumed:
+            click.echo(f"  Resumed from online state: {', '.join(f'{tf}m' for tf in resumed)}")
 
 
 # 註冊到 fishbro CLI 的入口點
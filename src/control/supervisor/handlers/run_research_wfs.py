@@ -27,11 +27,18 @@ import json
 import hashlib
 import os
 import importlib
+import multiprocessing
+import tempfile
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import timedelta
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
 import traceback
+from collections import OrderedDict
+from dataclasses import dataclass
 
 from ..job_handler import BaseJobHandler, JobContext
 from control.artifacts import write_json_atomic
@@ -42,7 +49,14 @@ from core.data_aligner import DataAligner
 from core.resampler import get_session_spec_for_dataset
 from core.features import compute_features_for_tf
 from core.features.cross import compute_cross_features_v1
-from core.backtest.simulator import simulate_bar_engine, CostConfig
+from core.backtest.simulator import (
+    CostConfig,
+    SimulatorState,
+    TradeLedger,
+    simulate_bar_engine,
+    simulate_bar_engine_batch,
+    stack_signal_rows,
+)
 from core.feature_bundle import FeatureBundle, FeatureSeries
 from core.feature_context import FeatureContext
 from contracts.config_consistency import assert_cost_model_ssot_instruments
@@ -78,6 +92,8 @@ MAX_WINDOWS = None  # No preset limit (set to int to enforce)
 MAX_PARAM_SEARCH_SPACE = 10_000  # Maximum parameter combinations per window
 MAX_TOTAL_EXECUTION_TIME_SEC = 7200  # 2 hours maximum execution time
 HEARTBEAT_INTERVAL_SEC = 30  # Send heartbeat every 30 seconds during heavy compute
+SCREEN_BATCH_SIZE = 256  # Candidates per batched simulator call (bounds the K x n equity matrix)
+SEGMENT_CACHE_SIZE = 2  # Prepared segments kept per process (one window's IS + OOS in flight)
 
 
 def _iter_seasons(start_season: str, end_season: str) -> List[str]:
@@ -574,11 +590,31 @@ def _extract_signals(strategy_instance, df, ctx: FeatureContext | None):
     raise RuntimeError("Strategy missing compute_signals/compute_orders")
 
 
-def _build_df_segment(ts64, segment_mask, data: dict, features: dict, alias_map: dict[str, str]):
+def _segment_range(ts64: np.ndarray, start: np.datetime64, end: np.datetime64) -> slice:
+    """[start, stop) bar-index range covering start <= ts64 <= end (ts64 sorted ascending)."""
+    import numpy as np
+
+    lo = int(np.searchsorted(ts64, start, side="left"))
+    hi = int(np.searchsorted(ts64, end, side="right"))
+    return slice(lo, max(lo, hi))
+
+
+def _segment_view(values: np.ndarray, segment: slice) -> np.ndarray:
+    """Read-only view of `values` over a contiguous segment (no copy)."""
+    view = values[segment]
+    view.flags.writeable = False
+    return view
+
+
+def _segment_arrays(ts64: np.ndarray, segment: slice, data: dict) -> dict:
+    return {k: _segment_view(v, segment) for k, v in data.items() if hasattr(v, "__len__") and len(v) == len(ts64)}
+
+
+def _build_df_segment(ts64, segment: slice, data: dict, features: dict, alias_map: dict[str, str]):
     import pandas as pd
 
-    seg_ts = ts64[segment_mask]
-    seg_data = {k: v[segment_mask] for k, v in data.items() if hasattr(v, "__len__") and len(v) == len(ts64)}
+    seg_ts = ts64[segment]
+    seg_data = _segment_arrays(ts64, segment, data)
     idx = pd.to_datetime(seg_ts.astype("datetime64[ns]"))
     df = pd.DataFrame(
         {
@@ -592,17 +628,55 @@ def _build_df_segment(ts64, segment_mask, data: dict, features: dict, alias_map:
     )
     for name, values in (features or {}).items():
         if hasattr(values, "__len__") and len(values) == len(ts64):
-            df[name] = values[segment_mask]
+            df[name] = _segment_view(values, segment)
     for alias, actual in (alias_map or {}).items():
         if actual in df.columns:
             df[alias] = df[actual]
     return df
 
 
-def _run_segment_simulation(
+@dataclass(frozen=True)
+class _PreparedSegment:
+    """
+    Strategy-independent inputs for one segment: bar views, the strategy DataFrame and the
+    FeatureContext. Built once per window and shared read-only by every candidate in it.
+    """
+
+    ts: np.ndarray
+    data: dict[str, np.ndarray]
+    df: Any
+    ctx: FeatureContext
+
+
+class _SegmentCache(OrderedDict):
+    """
+    LRU of prepared segments keyed by (start, stop), holding at most `maxsize` entries.
+
+    Screening works one window at a time (every candidate of a window shares its segment), and
+    the per-window IS / OOS runs follow, so a couple of entries give the same reuse as an
+    unbounded cache while memory stays flat in the number of windows (per process).
+    """
+
+    def __init__(self, maxsize: int = SEGMENT_CACHE_SIZE):
+        super().__init__()
+        self.maxsize = max(1, int(maxsize))
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+def _prepare_segment(
     *,
     ts64,
-    segment_mask,
+    segment: slice,
     data: dict,
     features_data1: dict,
     features_data2: dict | None,
@@ -612,20 +686,19 @@ def _run_segment_simulation(
     data2_id: str | None,
     season: str,
     tf_min: int,
-    strategy_class,
-    instrument: str,
-    initial_equity: float,
-    strategy_params: dict | None,
-    cost: CostConfig,
-    record_trades: bool = False,
-) -> tuple[list[EquityPoint], float, float, int, np.ndarray, list[str], list[dict[str, Any]]]:
-    import numpy as np
+    segment_cache: dict[tuple[int, int], _PreparedSegment] | None = None,
+) -> _PreparedSegment:
+    """
+    Build the segment view (df + FeatureContext), or return it from `segment_cache`.
 
-    seg_ts = ts64[segment_mask]
-    if len(seg_ts) == 0:
-        return [], 0.0, 0.0, 0, np.array([], dtype=np.float64), [], []
+    The cache is keyed by the segment's index range only, so it must be scoped to one run
+    (one set of bars / features).
+    """
+    key = (int(segment.start), int(segment.stop))
+    if segment_cache is not None and key in segment_cache:
+        return segment_cache[key]
 
-    df = _build_df_segment(ts64, segment_mask, data, features_data1, alias_map)
+    df = _build_df_segment(ts64, segment, data, features_data1, alias_map)
     ctx_seg = FeatureContext(
         timeframe_min=tf_min,
         data1=_bundle_from_features(
@@ -634,7 +707,7 @@ def _run_segment_simulation(
             dataset_id=dataset_id,
             season=season,
             tf_min=tf_min,
-            mask=segment_mask,
+            segment=segment,
         ),
         data2=_bundle_from_features(
             ts64=ts64,
@@ -642,7 +715,7 @@ def _run_segment_simulation(
             dataset_id=data2_id or dataset_id,
             season=season,
             tf_min=tf_min,
-            mask=segment_mask,
+            segment=segment,
         ) if features_data2 is not None else None,
         cross=_bundle_from_features(
             ts64=ts64,
@@ -650,14 +723,83 @@ def _run_segment_simulation(
             dataset_id=f"{dataset_id}__{data2_id}" if data2_id else dataset_id,
             season=season,
             tf_min=tf_min,
-            mask=segment_mask,
+            segment=segment,
         ) if cross_features is not None else None,
         data2_id=data2_id,
     )
+    prepared = _PreparedSegment(
+        ts=_segment_view(ts64, segment),
+        data=_segment_arrays(ts64, segment, data),
+        df=df,
+        ctx=ctx_seg,
+    )
+    if segment_cache is not None:
+        segment_cache[key] = prepared
+    return prepared
+
+
+def _segment_signals(prepared: _PreparedSegment, strategy_class, strategy_params: dict | None) -> dict:
+    """Extract strategy signals for one candidate on a prepared segment."""
     strategy_instance = strategy_class(strategy_params or {})
-    signals = _extract_signals(strategy_instance, df, ctx_seg)
+    return _extract_signals(strategy_instance, prepared.df, prepared.ctx)
+
+
+def _run_segment_simulation(
+    *,
+    ts64,
+    segment: slice,
+    data: dict,
+    features_data1: dict,
+    features_data2: dict | None,
+    cross_features: dict | None,
+    alias_map: dict[str, str],
+    dataset_id: str,
+    data2_id: str | None,
+    season: str,
+    tf_min: int,
+    strategy_class,
+    instrument: str,
+    initial_equity: float,
+    strategy_params: dict | None,
+    cost: CostConfig,
+    record_trades: bool = False,
+    metrics_only: bool = False,
+    initial_state: SimulatorState | None = None,
+    segment_cache: dict[tuple[int, int], _PreparedSegment] | None = None,
+) -> tuple[list[EquityPoint], float, float, int, np.ndarray, list[str], TradeLedger, SimulatorState | None]:
+    """
+    Simulate one segment for one candidate.
+
+    metrics_only=True returns no points / equity / ledger (only net, mdd, trades, warnings),
+    skipping the equity curve and daily downsample. The ledger stays columnar; it is rendered
+    to dicts only when written into WindowResult.oos_trades.
 
-    seg_data = {k: v[segment_mask] for k, v in data.items() if hasattr(v, "__len__") and len(v) == len(ts64)}
+    initial_state continues from a previous segment's final state (cash, open position and
+    last-bar signals); the returned state can seed the next contiguous segment.
+    """
+    import numpy as np
+
+    if segment.stop <= segment.start:
+        return [], 0.0, 0.0, 0, np.array([], dtype=np.float64), [], TradeLedger.empty(), initial_state
+
+    prepared = _prepare_segment(
+        ts64=ts64,
+        segment=segment,
+        data=data,
+        features_data1=features_data1,
+        features_data2=features_data2,
+        cross_features=cross_features,
+        alias_map=alias_map,
+        dataset_id=dataset_id,
+        data2_id=data2_id,
+        season=season,
+        tf_min=tf_min,
+        segment_cache=segment_cache,
+    )
+    signals = _segment_signals(prepared, strategy_class, strategy_params)
+
+    seg_ts = prepared.ts
+    seg_data = prepared.data
     sim = simulate_bar_engine(
         ts=seg_ts,
         open_=seg_data["open"],
@@ -668,12 +810,330 @@ def _run_segment_simulation(
         cost=cost,
         initial_equity=initial_equity,
         record_trades=record_trades,
+        metrics_only=metrics_only,
+        initial_state=initial_state,
     )
+    if metrics_only:
+        return [], sim.net, sim.mdd, sim.trades, sim.equity, sim.warnings, sim.trades_ledger, sim.final_state
 
     t_daily, v_daily = _downsample_daily(seg_ts, sim.equity, instrument=instrument)
     points = [EquityPoint(t=t, v=float(v)) for t, v in zip(t_daily, v_daily)]
 
-    return points, sim.net, sim.mdd, sim.trades, sim.equity, sim.warnings, (sim.trades_ledger or [])
+    return points, sim.net, sim.mdd, sim.trades, sim.equity, sim.warnings, sim.trades_ledger, sim.final_state
+
+
+def _screen_segment_batch(
+    *,
+    ts64,
+    segment: slice,
+    data: dict,
+    features_data1: dict,
+    features_data2: dict | None,
+    cross_features: dict | None,
+    alias_map: dict[str, str],
+    dataset_id: str,
+    data2_id: str | None,
+    season: str,
+    tf_min: int,
+    strategy_class,
+    initial_equity: float,
+    candidates: list[dict],
+    cost: CostConfig,
+    segment_cache: dict[tuple[int, int], _PreparedSegment] | None = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cheap-screening metrics for many candidates on one segment.
+
+    The segment is prepared once (or taken from `segment_cache`); signals are extracted per
+    candidate, then the whole chunk is simulated with one metrics-only
+    `simulate_bar_engine_batch` call (no equity matrix).
+    Returns (net, mdd, trades) arrays aligned with `candidates`.
+    """
+    import numpy as np
+
+    k_rows = len(candidates)
+    net = np.zeros(k_rows, dtype=np.float64)
+    mdd = np.zeros(k_rows, dtype=np.float64)
+    trades = np.zeros(k_rows, dtype=np.int64)
+    if segment.stop <= segment.start or k_rows == 0:
+        return net, mdd, trades
+
+    prepared = _prepare_segment(
+        ts64=ts64,
+        segment=segment,
+        data=data,
+        features_data1=features_data1,
+        features_data2=features_data2,
+        cross_features=cross_features,
+        alias_map=alias_map,
+        dataset_id=dataset_id,
+        data2_id=data2_id,
+        season=season,
+        tf_min=tf_min,
+        segment_cache=segment_cache,
+    )
+    seg_ts = prepared.ts
+    seg_data = prepared.data
+    for lo in range(0, k_rows, SCREEN_BATCH_SIZE):
+        chunk = candidates[lo : lo + SCREEN_BATCH_SIZE]
+        rows = [_segment_signals(prepared, strategy_class, params_c) for params_c in chunk]
+        batch = simulate_bar_engine_batch(
+            ts=seg_ts,
+            open_=seg_data["open"],
+            high=seg_data["high"],
+            low=seg_data["low"],
+            close=seg_data["close"],
+            signals=stack_signal_rows(rows, len(seg_ts)),
+            cost=cost,
+            initial_equity=initial_equity,
+            metrics_only=True,
+        )
+        hi = lo + len(chunk)
+        net[lo:hi] = batch.net
+        mdd[lo:hi] = batch.mdd
+        trades[lo:hi] = batch.trades
+    return net, mdd, trades
+
+
+class _SharedArray(NamedTuple):
+    """Placeholder for an array handed to screening workers as a memory-mapped .npy file."""
+
+    path: str
+
+
+_SCREEN_WORKER: dict[str, Any] = {}
+
+
+def _share_value(root: Path, value: Any) -> Any:
+    """Write numeric arrays (recursively through dicts) under `root`, replacing them by _SharedArray."""
+    import numpy as np
+
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        path = root / f"{uuid.uuid4().hex}.npy"
+        np.save(path, value, allow_pickle=False)
+        return _SharedArray(str(path))
+    if isinstance(value, dict):
+        return {k: _share_value(root, v) for k, v in value.items()}
+    return value
+
+
+def _attach_value(value: Any) -> Any:
+    import numpy as np
+
+    if isinstance(value, _SharedArray):
+        return np.load(value.path, mmap_mode="r", allow_pickle=False)
+    if isinstance(value, dict):
+        return {k: _attach_value(v) for k, v in value.items()}
+    return value
+
+
+def _screen_worker_init(shared: dict[str, Any]) -> None:
+    _SCREEN_WORKER.clear()
+    _SCREEN_WORKER.update(_attach_value(shared))
+    _SCREEN_WORKER["segment_cache"] = _SegmentCache()
+
+
+def _screen_worker_run(segment_key: str, candidates: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    state = _SCREEN_WORKER
+    return _screen_segment_batch(
+        segment=state["segments"][segment_key],
+        candidates=candidates,
+        segment_cache=state["segment_cache"],
+        **state["kwargs"],
+    )
+
+
+class _CandidateScreener:
+    """
+    Runs `_screen_segment_batch` over candidate lists, in-process or on a process pool.
+
+    With workers > 1, bars / feature / cross-feature arrays are written
+    once as .npy files (under /dev/shm when available) and memory-mapped read-only by each
+    worker, so a task only pickles its candidate dicts and a segment key (segments are index
+    ranges, sliced as views inside the worker). Candidates are split
+    into contiguous chunks and reassembled in input order; every candidate is simulated
+    independently, so results are identical to the serial path.
+
+    `heartbeat(segment_key)` is called at most every HEARTBEAT_INTERVAL_SEC while screening
+    (also while waiting on the pool), so long screenings keep the job alive.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int,
+        segments: dict[str, slice],
+        segment_cache: dict[tuple[int, int], _PreparedSegment] | None = None,
+        heartbeat: Callable[[str], None] | None = None,
+        **kwargs: Any,
+    ):
+        self.workers = max(1, min(int(workers), os.cpu_count() or 1))
+        self._segments = segments
+        # In-process prepared segments; each pool worker keeps its own cache.
+        self._segment_cache = segment_cache if segment_cache is not None else _SegmentCache()
+        self._heartbeat = heartbeat
+        self._last_beat = float("-inf")
+        self._kwargs = kwargs
+        self._tmp: tempfile.TemporaryDirectory | None = None
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _beat(self, segment_key: str) -> None:
+        if self._heartbeat is None:
+            return
+        now = time.monotonic()
+        if now - self._last_beat >= HEARTBEAT_INTERVAL_SEC:
+            self._last_beat = now
+            self._heartbeat(segment_key)
+
+    def __enter__(self) -> "_CandidateScreener":
+        if self.workers > 1:
+            shm = Path("/dev/shm")
+            self._tmp = tempfile.TemporaryDirectory(prefix="wfs_screen_", dir=str(shm) if shm.is_dir() else None)
+            shared = _share_value(Path(self._tmp.name), {"segments": self._segments, "kwargs": self._kwargs})
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_screen_worker_init,
+                initargs=(shared,),
+            )
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._tmp is not None:
+            self._tmp.cleanup()
+            self._tmp = None
+
+    def screen(self, segment_key: str, candidates: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(net, mdd, trades) arrays aligned with `candidates` for one registered segment."""
+        import numpy as np
+
+        self._beat(segment_key)
+        if self._pool is None or len(candidates) < 2:
+            return _screen_segment_batch(
+                segment=self._segments[segment_key],
+                candidates=candidates,
+                segment_cache=self._segment_cache,
+                **self._kwargs,
+            )
+        chunk = max(1, -(-len(candidates) // (self.workers * 4)))
+        chunks = [candidates[lo : lo + chunk] for lo in range(0, len(candidates), chunk)]
+        futures = [self._pool.submit(_screen_worker_run, segment_key, c) for c in chunks]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=HEARTBEAT_INTERVAL_SEC, return_when=FIRST_COMPLETED)
+            self._beat(segment_key)
+        parts = [f.result() for f in futures]
+        return tuple(np.concatenate([p[j] for p in parts]) for j in range(3))  # type: ignore[return-value]
+
+
+SCREENING_STRATEGIES = ("full", "successive_halving")
+
+
+def _window_priority(n_windows: int) -> list[int]:
+    """
+    Window order for budgeted screening: the most recent IS window first, then repeatedly the
+    window farthest from those already chosen (ties -> later window). Prefixes are nested.
+    """
+    if n_windows <= 0:
+        return []
+    order = [n_windows - 1]
+    remaining = set(range(n_windows - 1))
+    while remaining:
+        nxt = max(remaining, key=lambda w: (min(abs(w - c) for c in order), w))
+        order.append(nxt)
+        remaining.remove(nxt)
+    return order
+
+
+def _screen_grid(
+    screener: _CandidateScreener,
+    candidates: list[dict],
+    n_windows: int,
+    *,
+    strategy: str,
+    top_k_limit: int,
+    mdd_floor: float,
+    eta: int = 3,
+    min_windows: int = 1,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+    """
+    Screen candidates over the IS windows ("is_{w}" segments of `screener`).
+
+    Returns per (candidate, window) net / mdd / trades, the indices of the candidates evaluated
+    on every window (the ones eligible for top-K), and the ScreeningConfig record.
+
+    strategy="full" evaluates every candidate on every window. "successive_halving" evaluates
+    the survivors on the first b windows of `_window_priority` (b = min_windows, then x eta per
+    rung), keeps the best max(top_k_limit, ceil(n / eta)) by net / max(max|mdd|, mdd_floor)
+    (stable, so ties keep grid order) and repeats while more than top_k_limit remain; the
+    survivors are then evaluated on all windows. Results already computed for a
+    (candidate, window) pair are reused across rungs.
+    """
+    import math
+
+    import numpy as np
+
+    if strategy not in SCREENING_STRATEGIES:
+        raise ValueError(f"Unknown screening strategy: {strategy!r} (expected one of {SCREENING_STRATEGIES})")
+    if eta < 2:
+        raise ValueError(f"screening_eta must be >= 2, got {eta}")
+    if min_windows < 1:
+        raise ValueError(f"screening_min_windows must be >= 1, got {min_windows}")
+
+    n_cand = len(candidates)
+    net = np.zeros((n_cand, n_windows), dtype=np.float64)
+    mdd = np.zeros((n_cand, n_windows), dtype=np.float64)
+    trades = np.zeros((n_cand, n_windows), dtype=np.int64)
+    evaluated = np.zeros((n_cand, n_windows), dtype=bool)
+
+    def _evaluate(idx: np.ndarray, windows: list[int]) -> None:
+        for w in windows:
+            need = idx[~evaluated[idx, w]]
+            if need.size == 0:
+                continue
+            net_w, mdd_w, trades_w = screener.screen(f"is_{w}", [candidates[i] for i in need])
+            net[need, w] = net_w
+            mdd[need, w] = mdd_w
+            trades[need, w] = trades_w
+            evaluated[need, w] = True
+
+    alive = np.arange(n_cand)
+    rungs: list[dict[str, Any]] = []
+    if strategy == "successive_halving":
+        priority = _window_priority(n_windows)
+        budget = min(min_windows, n_windows)
+        while alive.size > top_k_limit and budget < n_windows:
+            windows = priority[:budget]
+            _evaluate(alive, windows)
+            cols = np.asarray(windows)
+            sub_net = net[np.ix_(alive, cols)].sum(axis=1)
+            sub_mdd = np.abs(mdd[np.ix_(alive, cols)]).max(axis=1)
+            score = sub_net / np.maximum(sub_mdd, mdd_floor)
+            keep = max(top_k_limit, math.ceil(alive.size / eta))
+            order = np.argsort(-score, kind="stable")
+            rungs.append({"windows": sorted(windows), "candidates": int(alive.size), "kept": int(keep)})
+            alive = np.sort(alive[order[:keep]])
+            budget = min(n_windows, budget * eta)
+
+    all_windows = list(range(n_windows))
+    _evaluate(alive, all_windows)
+    rungs.append({"windows": all_windows, "candidates": int(alive.size), "kept": int(alive.size)})
+
+    record: dict[str, Any] = {
+        "strategy": strategy,
+        "eta": int(eta) if strategy == "successive_halving" else None,
+        "min_windows": int(min_windows) if strategy == "successive_halving" else None,
+        "top_k": int(top_k_limit),
+        "candidates": int(n_cand),
+        "windows": int(n_windows),
+        "rungs": rungs,
+        "evaluations": int(evaluated.sum()),
+        "full_evaluations": int(n_cand * n_windows),
+    }
+    return net, mdd, trades, alive, record
 
 
 def _bundle_from_features(
@@ -683,18 +1143,18 @@ def _bundle_from_features(
     dataset_id: str,
     season: str,
     tf_min: int,
-    mask: np.ndarray | None = None,
+    segment: slice | None = None,
 ) -> FeatureBundle:
-    if mask is not None:
-        ts_use = ts64[mask]
+    if segment is not None:
+        ts_use = _segment_view(ts64, segment)
     else:
         ts_use = ts64
     series: dict[tuple[str, int], FeatureSeries] = {}
     for name, values in (features or {}).items():
         if name == "ts":
             continue
-        if mask is not None:
-            values_use = values[mask]
+        if segment is not None:
+            values_use = _segment_view(values, segment)
         else:
             values_use = values
         series[(name, tf_min)] = FeatureSeries(ts=ts_use, values=values_use, name=name, timeframe_min=tf_min)
@@ -720,6 +1180,10 @@ class RunResearchWFSHandler(BaseJobHandler):
             raise ValueError(f"Invalid start_season format: {start_season}. Expected format: YYYYQ#")
         if not (isinstance(end_season, str) and len(end_season) == 6 and end_season[4] == 'Q'):
             raise ValueError(f"Invalid end_season format: {end_season}. Expected format: YYYYQ#")
+
+        screening = params.get("screening")
+        if screening is not None and screening not in SCREENING_STRATEGIES:
+            raise ValueError(f"Invalid screening: {screening}. Expected one of {SCREENING_STRATEGIES}")
     
     def _apply_guardrails(self, start_season: str, end_season: str, param_count: int, context: JobContext) -> None:
         """Apply resource guardrails before heavy computation."""
@@ -778,6 +1242,11 @@ class RunResearchWFSHandler(BaseJobHandler):
         dataset_id = str(params.get("dataset_id") or instrument)
         data2_dataset_id = params.get("data2_dataset_id")
         data2_dataset_id = str(data2_dataset_id).strip() if data2_dataset_id else None
+        carry_position = bool(params.get("carry_position", False))
+        workers = int(params.get("workers", 1) or 1)
+        screening = str(params.get("screening") or "full")
+        screening_eta = int(params.get("screening_eta", 3) or 3)
+        screening_min_windows = int(params.get("screening_min_windows", 1) or 1)
 
         if _strategy_requires_secondary_data(strategy_id) and not data2_dataset_id:
             raise ValueError(
@@ -832,7 +1301,7 @@ class RunResearchWFSHandler(BaseJobHandler):
         estimate = self._compute_estimate(
             start_season,
             end_season,
-            workers=int(params.get("workers", 1) or 1),
+            workers=workers,
             param_count=param_count,
         )
 
@@ -882,6 +1351,9 @@ class RunResearchWFSHandler(BaseJobHandler):
             data = load_npz(bars_path)
             ts = data["ts"]
             ts64 = ts.astype("datetime64[s]")
+            if len(ts64) > 1 and bool(np.any(ts64[1:] < ts64[:-1])):
+                # Windows are [start, stop) index ranges found by searchsorted.
+                raise ValueError(f"Bars ts must be sorted ascending: {bars_path}")
             data_arrays = {
                 "open": data["open"].astype(float),
                 "high": data["high"].astype(float),
@@ -1002,13 +1474,13 @@ class RunResearchWFSHandler(BaseJobHandler):
                 oos_start_dt, oos_end_dt = _quarter_start_end(s)
                 is_start_dt = oos_start_dt.replace(year=oos_start_dt.year - 3)
                 is_end_dt = oos_start_dt - timedelta(seconds=1)
-                oos_mask = (ts64 >= np.datetime64(oos_start_dt.replace(tzinfo=None))) & (ts64 <= np.datetime64(oos_end_dt.replace(tzinfo=None)))
-                is_mask = (ts64 >= np.datetime64(is_start_dt.replace(tzinfo=None))) & (ts64 <= np.datetime64(is_end_dt.replace(tzinfo=None)))
+                oos_seg = _segment_range(ts64, np.datetime64(oos_start_dt.replace(tzinfo=None)), np.datetime64(oos_end_dt.replace(tzinfo=None)))
+                is_seg = _segment_range(ts64, np.datetime64(is_start_dt.replace(tzinfo=None)), np.datetime64(is_end_dt.replace(tzinfo=None)))
                 window_defs.append(
                     {
                         "season": s,
-                        "is_mask": is_mask,
-                        "oos_mask": oos_mask,
+                        "is_seg": is_seg,
+                        "oos_seg": oos_seg,
                         "is_range": TimeRange(
                             start=is_start_dt.isoformat().replace("+00:00", "Z"),
                             end=is_end_dt.isoformat().replace("+00:00", "Z"),
@@ -1025,43 +1497,76 @@ class RunResearchWFSHandler(BaseJobHandler):
             top_k_limit = 100
             trades_min_total = 120
 
-            cheap_candidates: list[tuple[float, dict]] = []
-            for candidate in param_grid:
-                params_c = {**base_params, **candidate}
-                total_net = 0.0
-                total_mdd = 0.0
-                total_trades = 0
-                for win in window_defs:
-                    _, net, mdd, trades, _, _, _ = _run_segment_simulation(
-                        ts64=ts64,
-                        segment_mask=win["is_mask"],
-                        data=data_arrays,
-                        features_data1=features_data1,
-                        features_data2=features_data2,
-                        cross_features=cross_features,
-                        alias_map=alias_map,
-                        dataset_id=dataset_id,
-                        data2_id=data2_dataset_id,
-                        season=season,
-                        tf_min=tf_min,
-                        strategy_class=strategy_class,
-                        instrument=instrument,
-                        initial_equity=initial_equity,
-                        strategy_params=params_c,
-                        cost=cost,
-                    )
-                    total_net += float(net)
-                    total_mdd = max(total_mdd, abs(float(mdd)))
-                    total_trades += int(trades)
-                if total_net <= 0.0 or total_trades < trades_min_total:
-                    continue
-                score = total_net / max(total_mdd, mdd_floor)
-                cheap_candidates.append((score, params_c))
-
-            cheap_candidates.sort(key=lambda x: x[0], reverse=True)
-            top_k = [c[1] for c in cheap_candidates[:top_k_limit]]
-            if not top_k:
-                top_k = [base_params]
+            candidate_params = [{**base_params, **candidate} for candidate in param_grid]
+            # Prepared segments (df + FeatureContext) reused by every candidate evaluated in a window.
+            segment_cache = _SegmentCache()
+            screener = _CandidateScreener(
+                workers=workers,
+                segments={f"is_{idx}": win["is_seg"] for idx, win in enumerate(window_defs)},
+                segment_cache=segment_cache,
+                heartbeat=lambda key: context.heartbeat(progress=0.25, phase=f"screening_{key}"),
+                ts64=ts64,
+                data=data_arrays,
+                features_data1=features_data1,
+                features_data2=features_data2,
+                cross_features=cross_features,
+                alias_map=alias_map,
+                dataset_id=dataset_id,
+                data2_id=data2_dataset_id,
+                season=season,
+                tf_min=tf_min,
+                strategy_class=strategy_class,
+                initial_equity=initial_equity,
+                cost=cost,
+            )
+            window_scores: list[tuple[np.ndarray, np.ndarray] | None] = [None] * len(window_defs)
+            with screener:
+                grid_net, grid_mdd, grid_trades, screened, screening_record = _screen_grid(
+                    screener,
+                    candidate_params,
+                    len(window_defs),
+                    strategy=screening,
+                    top_k_limit=top_k_limit,
+                    mdd_floor=mdd_floor,
+                    eta=screening_eta,
+                    min_windows=screening_min_windows,
+                )
+                config = config.model_copy(update={"screening": screening_record})
+
+                # Totals accumulate window by window (same float order as a per-window pass).
+                cand_net = np.zeros(len(candidate_params), dtype=np.float64)
+                cand_mdd = np.zeros(len(candidate_params), dtype=np.float64)
+                cand_trades = np.zeros(len(candidate_params), dtype=np.int64)
+                for idx in range(len(window_defs)):
+                    cand_net += grid_net[:, idx]
+                    cand_mdd = np.maximum(cand_mdd, np.abs(grid_mdd[:, idx]))
+                    cand_trades += grid_trades[:, idx]
+
+                cheap_candidates: list[tuple[float, int]] = []
+                for k in screened.tolist():
+                    total_net = float(cand_net[k])
+                    total_mdd = float(cand_mdd[k])
+                    total_trades = int(cand_trades[k])
+                    if total_net <= 0.0 or total_trades < trades_min_total:
+                        continue
+                    score = total_net / max(total_mdd, mdd_floor)
+                    cheap_candidates.append((score, k))
+
+                cheap_candidates.sort(key=lambda x: x[0], reverse=True)
+                top_idx = [c[1] for c in cheap_candidates[:top_k_limit]]
+                top_k = [candidate_params[k] for k in top_idx]
+
+                # Per-window top-K metrics: top-K candidates were screened on every window
+                # already; only the base_params fallback needs its own metrics-only run.
+                for idx, win in enumerate(window_defs):
+                    if win["is_seg"].stop > win["is_seg"].start:
+                        if top_idx:
+                            window_scores[idx] = (grid_net[top_idx, idx], grid_mdd[top_idx, idx])
+                        else:
+                            net_w, mdd_w, _ = screener.screen(f"is_{idx}", [base_params])
+                            window_scores[idx] = (net_w, mdd_w)
+                if not top_k:
+                    top_k = [base_params]
 
             for idx, win in enumerate(window_defs):
                 context.heartbeat(progress=0.25 + (idx / max(1, len(window_defs))) * 0.55, phase=f"season_{win['season']}")
@@ -1074,11 +1579,21 @@ class RunResearchWFSHandler(BaseJobHandler):
                 best_is_trades = 0
                 best_is_equity = np.array([], dtype=np.float64)
                 best_is_warn = []
-
-                for candidate in top_k:
-                    is_points, is_net, is_mdd, is_trades, is_equity, is_warn, _ = _run_segment_simulation(
+                best_is_state = None
+
+                # Rank top-K on metrics only, then re-run the winner once with full equity output.
+                if window_scores[idx] is not None:
+                    net_w, mdd_w = window_scores[idx]
+                    for k, candidate in enumerate(top_k):
+                        score = float(net_w[k]) / max(abs(float(mdd_w[k])), mdd_floor)
+                        if score > best_score:
+                            best_score = score
+                            best_params = candidate
+
+                if best_params is not None:
+                    best_is_points, best_is_net, is_mdd, best_is_trades, best_is_equity, best_is_warn, _, best_is_state = _run_segment_simulation(
                         ts64=ts64,
-                        segment_mask=win["is_mask"],
+                        segment=win["is_seg"],
                         data=data_arrays,
                         features_data1=features_data1,
                         features_data2=features_data2,
@@ -1091,19 +1606,12 @@ class RunResearchWFSHandler(BaseJobHandler):
                         strategy_class=strategy_class,
                         instrument=instrument,
                         initial_equity=initial_equity,
-                        strategy_params=candidate,
+                        strategy_params=best_params,
                         cost=cost,
+                        segment_cache=segment_cache,
                     )
-                    score = float(is_net) / max(abs(float(is_mdd)), mdd_floor) if len(is_equity) else -1e18
-                    if score > best_score:
-                        best_score = score
-                        best_params = candidate
-                        best_is_points = is_points
-                        best_is_net = is_net
-                        best_is_mdd = float(is_mdd)
-                        best_is_trades = int(is_trades)
-                        best_is_equity = is_equity
-                        best_is_warn = is_warn
+                    best_is_mdd = float(is_mdd)
+                    best_is_trades = int(best_is_trades)
 
                 if best_params is None:
                     best_params = base_params
@@ -1111,9 +1619,11 @@ class RunResearchWFSHandler(BaseJobHandler):
                 stitched_is.extend(best_is_points)
                 oos_initial = float(best_is_equity[-1]) if len(best_is_equity) else initial_equity
 
-                oos_points, oos_net, oos_mdd, oos_trades, oos_equity, oos_warn, oos_trades_detail = _run_segment_simulation(
+                # carry_position: OOS continues the IS run's state (open position included) instead
+                # of starting flat from the IS end equity.
+                oos_points, oos_net, oos_mdd, oos_trades, oos_equity, oos_warn, oos_trades_detail, _ = _run_segment_simulation(
                     ts64=ts64,
-                    segment_mask=win["oos_mask"],
+                    segment=win["oos_seg"],
                     data=data_arrays,
                     features_data1=features_data1,
                     features_data2=features_data2,
@@ -1129,11 +1639,13 @@ class RunResearchWFSHandler(BaseJobHandler):
                     strategy_params=best_params,
                     cost=cost,
                     record_trades=True,
+                    initial_state=best_is_state if carry_position else None,
+                    segment_cache=segment_cache,
                 )
                 stitched_oos.extend(oos_points)
 
-                oos_ts = ts64[win["oos_mask"]]
-                oos_close = data_arrays["close"][win["oos_mask"]]
+                oos_ts = ts64[win["oos_seg"]]
+                oos_close = data_arrays["close"][win["oos_seg"]]
                 bnh_t, bnh_e = _equity_from_close(oos_ts, oos_close, instrument, initial_equity=oos_initial)
                 stitched_bnh.extend([EquityPoint(t=t, v=float(v)) for t, v in zip(bnh_t, bnh_e)])
 
@@ -1141,13 +1653,13 @@ class RunResearchWFSHandler(BaseJobHandler):
                 update_ratio_pct = None
                 hold_ratio_pct = None
                 if data2_missing_mask is not None:
-                    miss = data2_missing_mask[win["oos_mask"]]
+                    miss = data2_missing_mask[win["oos_seg"]]
                     missing_ratio_pct = float(np.mean(miss) * 100.0) if miss.size > 0 else 0.0
                 if data2_update_mask is not None:
-                    upd = data2_update_mask[win["oos_mask"]]
+                    upd = data2_update_mask[win["oos_seg"]]
                     update_ratio_pct = float(np.mean(upd) * 100.0) if upd.size > 0 else 0.0
                 if data2_hold_mask is not None:
-                    hold = data2_hold_mask[win["oos_mask"]]
+                    hold = data2_hold_mask[win["oos_seg"]]
                     hold_ratio_pct = float(np.mean(hold) * 100.0) if hold.size > 0 else 0.0
 
                 pass_window = oos_net > 0.0 and oos_trades >= 5
@@ -1182,7 +1694,7 @@ class RunResearchWFSHandler(BaseJobHandler):
                         best_params={"strategy_params": best_params},
                         is_metrics={"net": best_is_net, "mdd": float(best_is_mdd), "trades": best_is_trades},
                         oos_metrics=oos_metrics,
-                        oos_trades=oos_trades_detail,  # type: ignore[arg-type]
+                        oos_trades=oos_trades_detail.to_dicts(),  # type: ignore[arg-type]
                         pass_=pass_window,  # type: ignore
                         fail_reasons=fail_reasons,
                         warnings=window_warnings,  # type: ignore
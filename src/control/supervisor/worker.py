@@ -15,6 +15,9 @@ from __future__ import annotations
 
 import time
 import os
+import subprocess
+import sys
+import threading
 from pathlib import Path
 
 from .supervisor import Supervisor
@@ -22,6 +25,49 @@ from .db import get_default_db_path
 from core.paths import get_numba_cache_root
 
 
+def _warm_numba_cache() -> threading.Thread | None:
+    """Compile numba kernels into NUMBA_CACHE_DIR in the background.
+
+    Starts `python -m indicators.warmup` in a child process and returns at once, so the
+    worker takes jobs while the cache fills (a cold warm-up takes tens of seconds); jobs
+    started meanwhile just compile what is not cached yet. Jobs run in bootstrap
+    subprocesses, so only the on-disk cache helps them, and the child sees the
+    NUMBA_CACHE_DIR set by main() regardless of what this process already imported.
+    A daemon thread reports the outcome; failures are reported and ignored.
+    """
+    env = os.environ.copy()
+    src_path = str(Path(__file__).resolve().parents[2])
+    pythonpath = env.get("PYTHONPATH", "")
+    if src_path not in pythonpath.split(os.pathsep):
+        env["PYTHONPATH"] = f"{src_path}{os.pathsep}{pythonpath}" if pythonpath else src_path
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "indicators.warmup"],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    except Exception as e:
+        print(f"NUMBA WARMUP: skipped ({e})")
+        return None
+
+    def _report() -> None:
+        stdout, stderr = proc.communicate()
+        lines = stdout.strip().splitlines()
+        summary = lines[-1] if lines else "(no output)"
+        status = "ok" if proc.returncode == 0 else f"exit {proc.returncode}"
+        print(f"NUMBA WARMUP: {status} in {time.perf_counter() - t0:.1f}s -- {summary}")
+        if proc.returncode != 0 and stderr.strip():
+            print(stderr.strip().splitlines()[-1])
+
+    thread = threading.Thread(target=_report, name="numba-warmup", daemon=True)
+    thread.start()
+    print("NUMBA WARMUP: started in background")
+    return thread
+
+
 def main() -> None:
     import argparse
 
@@ -56,6 +102,12 @@ def main() -> None:
         default=None,
         help="Run until this many jobs are spawned and completed, then exit.",
     )
+    parser.add_argument(
+        "--no-numba-warmup",
+        action="store_true",
+        default=False,
+        help="Skip the background compile of numba kernels into the cache at start-up.",
+    )
     parser.add_argument(
         "--artifacts-root",
         type=Path,
@@ -74,6 +126,12 @@ def main() -> None:
     except Exception:
         pass
 
+    # Under test isolation the cache root is a fresh per-test directory, so warming it
+    # would only add a cold compile to every worker start.
+    test_mode = os.environ.get("PYTEST_CURRENT_TEST") is not None or os.environ.get("FISHBRO_TEST_MODE") == "1"
+    if not args.no_numba_warmup and not test_mode:
+        _warm_numba_cache()
+
     print("=" * 60)
     print("FISHBRO WORKER INITIALIZING...")
     print(f"DATABASE: {db_path}")
@@ -7,8 +7,10 @@ Pure Function: f(Data, Strategy) -> Result.
 from __future__ import annotations
 
 import pandas as pd
+import hashlib
 import importlib
 import logging
+from functools import lru_cache
 from typing import List, Tuple, Optional
 
 from contracts.data_models import DataSnapshot
@@ -35,22 +37,66 @@ class BacktestKernel:
         Returns:
             ResearchResult
         """
+        signals, algo_returns = BacktestKernel._signals_and_returns(df_data, strategy_spec)
+        return BacktestKernel._build_result(signals, algo_returns, strategy_spec, snapshot_id)
+
+    @staticmethod
+    def run_with_equity(
+        df_data: pd.DataFrame,
+        strategy_spec: StrategySpec,
+        snapshot_id: str,
+        *,
+        initial_equity: float = 10_000.0,
+    ) -> Tuple[ResearchResult, pd.Series]:
+        """
+        Like `run`, but also returns the full-resolution equity curve as a Series.
+        This is used by WFS stitching / UI without duplicating signal/return logic.
+
+        Signals and returns are computed once; metrics and equity derive from the same arrays.
+        """
+        signals, algo_returns = BacktestKernel._signals_and_returns(df_data, strategy_spec)
+        growth = 1.0 + algo_returns
+        cum_returns = growth.cumprod()
+        result = BacktestKernel._build_result(
+            signals, algo_returns, strategy_spec, snapshot_id, growth=growth, cum_returns=cum_returns
+        )
+        equity = initial_equity * cum_returns
+        return result, equity
+
+    @staticmethod
+    def _signals_and_returns(df_data: pd.DataFrame, strategy_spec: StrategySpec) -> Tuple[pd.Series, pd.Series]:
         # 1. Load Strategy Logic
         strategy_class = BacktestKernel._resolve_strategy(strategy_spec.class_path)
         strategy_instance = strategy_class(strategy_spec.params)
-        
+
         # 2. Compute signals then simulate (vectorized kernel).
         signals = BacktestKernel._compute_signals(df_data, strategy_instance)
         algo_returns = BacktestKernel._compute_algo_returns(df_data, signals)
-        
+        return signals, algo_returns
+
+    @staticmethod
+    def _build_result(
+        signals: pd.Series,
+        algo_returns: pd.Series,
+        strategy_spec: StrategySpec,
+        snapshot_id: str,
+        *,
+        growth: Optional[pd.Series] = None,
+        cum_returns: Optional[pd.Series] = None,
+    ) -> ResearchResult:
+        if growth is None:
+            growth = 1 + algo_returns
+        if cum_returns is None:
+            cum_returns = growth.cumprod()
+
         # 4. Aggregate Metrics
-        total_types = (1 + algo_returns).prod() - 1
+        total_types = growth.prod() - 1
         sharpe = 0.0
-        if algo_returns.std() > 0:
-            sharpe = (algo_returns.mean() / algo_returns.std()) * (252**0.5) # Annualized
+        std = algo_returns.std()
+        if std > 0:
+            sharpe = (algo_returns.mean() / std) * (252**0.5) # Annualized
             
         # Drawdown
-        cum_returns = (1 + algo_returns).cumprod()
         peak = cum_returns.cummax()
         dd = (cum_returns - peak) / peak
         max_dd = dd.min()
@@ -66,40 +112,18 @@ class BacktestKernel:
             total_trades=trades_count
         )
         
-        # 5. Construct Result
-        import hashlib
-        run_id = hashlib.sha256(f"{snapshot_id}:{strategy_spec.compute_hash()}".encode()).hexdigest()
+        # 5. Construct Result (spec hash computed once per run)
+        strategy_hash = strategy_spec.compute_hash()
+        run_id = hashlib.sha256(f"{snapshot_id}:{strategy_hash}".encode()).hexdigest()
         
         return ResearchResult(
             run_id=run_id,
-            strategy_hash=strategy_spec.compute_hash(),
+            strategy_hash=strategy_hash,
             data_snapshot_id=snapshot_id,
             metrics=metrics,
             trades=[] # Populating detailed trade list requires event-loop logic, skipped for MVP
         )
 
-    @staticmethod
-    def run_with_equity(
-        df_data: pd.DataFrame,
-        strategy_spec: StrategySpec,
-        snapshot_id: str,
-        *,
-        initial_equity: float = 10_000.0,
-    ) -> Tuple[ResearchResult, pd.Series]:
-        """
-        Like `run`, but also returns the full-resolution equity curve as a Series.
-        This is used by WFS stitching / UI without duplicating signal/return logic.
-        """
-        strategy_class = BacktestKernel._resolve_strategy(strategy_spec.class_path)
-        strategy_instance = strategy_class(strategy_spec.params)
-
-        signals = BacktestKernel._compute_signals(df_data, strategy_instance)
-        algo_returns = BacktestKernel._compute_algo_returns(df_data, signals)
-        equity = initial_equity * (1.0 + algo_returns).cumprod()
-
-        result = BacktestKernel.run(df_data, strategy_spec, snapshot_id)
-        return result, equity
-
     @staticmethod
     def _compute_signals(df_data: pd.DataFrame, strategy_instance) -> pd.Series:
         # For this prototype, strategy class must implement `compute_signals(df)->Series`.
@@ -119,7 +143,9 @@ class BacktestKernel:
         return signals.shift(1).fillna(0) * returns
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def _resolve_strategy(class_path: str):
+        # Memoized: class paths are resolved once per process.
         module_name, class_name = class_path.rsplit(".", 1)
         module = importlib.import_module(module_name)
         return getattr(module, class_name)
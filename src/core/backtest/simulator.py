@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Iterator, List, Sequence, overload
 import numpy as np
+from numba import njit
 
 
 @dataclass(frozen=True)
@@ -21,7 +22,184 @@ class SimulationResult:
     net: float
     mdd: float
     warnings: list[str]
-    trades_ledger: list[dict[str, Any]]
+    trades_ledger: "TradeLedger"
+    final_state: Optional["SimulatorState"] = None
+
+
+@dataclass(frozen=True)
+class SimulatorState:
+    """
+    Simulator state after the last processed bar; pass it as `initial_state` to continue on the
+    next contiguous bars without re-simulating history.
+
+    bar_index counts bars consumed since the first segment; entry_idx uses the same coordinates
+    (-1 when flat). `pending` holds the last bar's signal values (SIGNAL_KEYS order), which act on
+    the first bar of the next segment.
+    """
+
+    bar_index: int
+    cash: float
+    equity: float
+    position: int
+    entry_price: float
+    entry_idx: int
+    entry_reason: int
+    entry_t: Optional[np.datetime64]
+    pending: tuple[float, float, float, float, float]
+
+    @property
+    def is_flat(self) -> bool:
+        return self.position == 0
+
+    def flattened(self) -> "SimulatorState":
+        """
+        Same equity with no carried position, bar index or pending signals: resuming from it is
+        identical to a fresh run with `initial_equity=self.equity` (bar 0 is not traded).
+        """
+        return SimulatorState(
+            bar_index=0,
+            cash=self.equity,
+            equity=self.equity,
+            position=0,
+            entry_price=0.0,
+            entry_idx=-1,
+            entry_reason=_REASON_MARKET_ENTRY,
+            entry_t=None,
+            pending=(np.nan,) * len(SIGNAL_KEYS),  # type: ignore[arg-type]
+        )
+
+
+@dataclass(frozen=True)
+class BatchSimulationResult:
+    equity: np.ndarray  # K x n
+    trades: np.ndarray  # (K,) int64
+    net: np.ndarray  # (K,) float64
+    mdd: np.ndarray  # (K,) float64
+    warnings: list[list[str]]
+
+
+SIGNAL_KEYS = ("target_dir", "long_stop", "short_stop", "exit_long_stop", "exit_short_stop")
+
+# Reason codes used by the compiled kernel's trade buffers.
+_REASON_MARKET_ENTRY = 0
+_REASON_STOP_ENTRY = 1
+_REASON_STOP_EXIT = 2
+_REASON_TARGET_CHANGE = 3
+_REASON_NAMES = ("market_entry", "stop_entry", "stop_exit", "target_change")
+
+TRADE_LEDGER_DTYPE = np.dtype(
+    [
+        ("entry_idx", np.int64),
+        ("exit_idx", np.int64),
+        ("direction", np.int8),
+        ("entry_price", np.float64),
+        ("exit_price", np.float64),
+        ("gross_pnl", np.float64),
+        ("commission", np.float64),
+        ("entry_reason", np.int8),
+        ("exit_reason", np.int8),
+    ]
+)
+
+
+class TradeLedger:
+    """
+    Columnar round-trip ledger: a TRADE_LEDGER_DTYPE record array plus the bar timestamps.
+
+    Columns are read as vectors (`ledger.records["gross_pnl"]`, `ledger.net_pnl`); ISO timestamps
+    and reason names are only rendered by `to_dicts()` / item access when the ledger is
+    serialized (e.g. into WindowResult.oos_trades).
+    """
+
+    __slots__ = ("records", "ts", "carry_entry_t")
+
+    def __init__(self, records: np.ndarray, ts: np.ndarray, carry_entry_t: Optional[np.datetime64] = None):
+        self.records = records
+        self.ts = ts
+        # Entry time of a position carried in from a previous segment (entry_idx < 0).
+        self.carry_entry_t = carry_entry_t
+
+    @classmethod
+    def empty(cls) -> "TradeLedger":
+        return cls(np.zeros(0, dtype=TRADE_LEDGER_DTYPE), np.array([], dtype="datetime64[s]"))
+
+    @property
+    def net_pnl(self) -> np.ndarray:
+        return self.records["gross_pnl"] - self.records["commission"]
+
+    @property
+    def bars_held(self) -> np.ndarray:
+        return self.records["exit_idx"] - self.records["entry_idx"]
+
+    def __len__(self) -> int:
+        return int(self.records.shape[0])
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.to_dicts())
+
+    @overload
+    def __getitem__(self, k: int) -> dict[str, Any]: ...
+
+    @overload
+    def __getitem__(self, k: slice) -> list[dict[str, Any]]: ...
+
+    def __getitem__(self, k: int | slice) -> dict[str, Any] | list[dict[str, Any]]:
+        """Row dict for an int index, list of row dicts for a slice (as on the former list ledger)."""
+        if isinstance(k, slice):
+            return TradeLedger(self.records[k], self.ts, self.carry_entry_t).to_dicts()
+        return TradeLedger(self.records[[k]], self.ts, self.carry_entry_t).to_dicts()[0]
+
+    def __eq__(self, other: object) -> bool:
+        # Ledgers compare by their rendered rows; a plain list is not a ledger (use to_dicts()).
+        if not isinstance(other, TradeLedger):
+            return NotImplemented
+        return self.to_dicts() == other.to_dicts()
+
+    # Mutable record buffers: equality without hashing.
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"TradeLedger(trades={len(self)})"
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        rec = self.records
+        if rec.shape[0] == 0:
+            return []
+        entry_idx = rec["entry_idx"]
+        carried = entry_idx < 0
+        entry_t = _ts_iso_z_many(self.ts, np.where(carried, 0, entry_idx))
+        if carried.any():
+            carry_t = _ts_iso_z(self.carry_entry_t)
+            entry_t = [carry_t if c else t for c, t in zip(carried.tolist(), entry_t)]
+        exit_t = _ts_iso_z_many(self.ts, rec["exit_idx"])
+        net = self.net_pnl.tolist()
+        bars_held = self.bars_held.tolist()
+        return [
+            {
+                "entry_t": entry_t[k],
+                "exit_t": exit_t[k],
+                "direction": "long" if d > 0 else "short",
+                "entry_price": ep,
+                "exit_price": xp,
+                "gross_pnl": g,
+                "commission": c,
+                "net_pnl": net[k],
+                "entry_reason": _REASON_NAMES[er],
+                "exit_reason": _REASON_NAMES[xr],
+                "bars_held": bars_held[k],
+            }
+            for k, (d, ep, xp, g, c, er, xr) in enumerate(
+                zip(
+                    rec["direction"].tolist(),
+                    rec["entry_price"].tolist(),
+                    rec["exit_price"].tolist(),
+                    rec["gross_pnl"].tolist(),
+                    rec["commission"].tolist(),
+                    rec["entry_reason"].tolist(),
+                    rec["exit_reason"].tolist(),
+                )
+            )
+        ]
 
 
 def simulate_bar_engine(
@@ -35,7 +213,32 @@ def simulate_bar_engine(
     cost: CostConfig,
     initial_equity: float = 10_000.0,
     record_trades: bool = False,
+    metrics_only: bool = False,
+    initial_state: Optional[SimulatorState] = None,
 ) -> SimulationResult:
+    """
+    Bar-by-bar execution simulator (compiled).
+
+    Signals at bar i-1 act on bar i:
+      - target_dir: desired position (-1/0/+1); NaN/invalid -> flat
+      - long_stop / short_stop: stop-entry prices (NaN -> market entry)
+      - exit_long_stop / exit_short_stop: protective stop-exit prices (NaN -> none)
+
+    Semantics are identical to the pure-Python reference loop in
+    tests/core/backtest/_reference_simulator.py (checked by test_simulator_numba_parity.py).
+
+    metrics_only=True tracks net / running peak / drawdown as scalars inside the kernel and
+    allocates no equity curve or ledger (result.equity is empty). Intended for screening.
+
+    initial_state (from a previous result's `final_state`) continues a run on the next
+    contiguous bars: cash, open position and the previous bar's signals carry over, so bar 0 is
+    traded like any other bar and initial_equity is ignored. Running segments back to back this
+    way reproduces the single-run equity curve exactly. net / mdd stay segment-local (measured
+    from the state's equity); ledger indices are segment-local, with a carried entry at a
+    negative index. Use `state.flattened()` to resume with equity only.
+    """
+    if metrics_only and record_trades:
+        raise ValueError("record_trades requires metrics_only=False")
     n = len(ts)
     if n == 0:
         return SimulationResult(
@@ -44,231 +247,558 @@ def simulate_bar_engine(
             net=0.0,
             mdd=0.0,
             warnings=[],
-            trades_ledger=[],
+            trades_ledger=TradeLedger.empty(),
+            final_state=initial_state,
         )
 
-    target_dir = signals.get("target_dir")
-    long_stop = signals.get("long_stop")
-    short_stop = signals.get("short_stop")
-    exit_long_stop = signals.get("exit_long_stop")
-    exit_short_stop = signals.get("exit_short_stop")
+    if initial_state is None:
+        resume = False
+        base_index = 0
+        cash0 = equity0 = float(initial_equity)
+        pos0, entry_price0, entry_idx0, entry_reason0 = 0, 0.0, -1, _REASON_MARKET_ENTRY
+        pending = np.full(len(SIGNAL_KEYS), np.nan, dtype=np.float64)
+        carry_entry_t = None
+    else:
+        resume = True
+        base_index = int(initial_state.bar_index)
+        cash0 = float(initial_state.cash)
+        equity0 = float(initial_state.equity)
+        pos0 = int(initial_state.position)
+        entry_price0 = float(initial_state.entry_price)
+        entry_idx0 = int(initial_state.entry_idx) - base_index if pos0 != 0 else -1
+        entry_reason0 = int(initial_state.entry_reason)
+        pending = np.asarray(initial_state.pending, dtype=np.float64)
+        carry_entry_t = initial_state.entry_t if pos0 != 0 else None
 
-    def _as_val(arr: Optional[np.ndarray], idx: int) -> Optional[float]:
-        if arr is None:
-            return None
-        try:
-            v = arr[idx]
-        except Exception:
-            return None
-        if v is None:
-            return None
-        try:
-            fv = float(v)
-        except Exception:
-            return None
-        if np.isnan(fv):
-            return None
-        return fv
-
-    def _apply_slippage(price: float, side: str) -> float:
-        if cost.slippage_ticks_per_side <= 0:
-            return price
-        delta = cost.slippage_ticks_per_side * cost.tick_size
-        if side == "buy":
-            return price + delta
-        return price - delta
-
-    def _commission() -> float:
-        return cost.commission_per_side * cost.fx_rate
-
-    equity = np.zeros(n, dtype=np.float64)
-    cash = float(initial_equity)
-    pos = 0
-    entry_price = 0.0
-    trades = 0
-    warnings: list[str] = []
-    trades_ledger: list[dict[str, Any]] = []
-    entry_idx: int | None = None
-    entry_reason: str | None = None
+    sig = [_signal_to_f64(signals.get(key), n) for key in SIGNAL_KEYS]
+    equity = np.zeros(0 if metrics_only else n, dtype=np.float64)
+    (
+        trades,
+        net,
+        mdd,
+        ambiguous_idx,
+        tr_entry_idx,
+        tr_exit_idx,
+        tr_dir,
+        tr_entry_price,
+        tr_exit_price,
+        tr_gross,
+        tr_commission,
+        tr_entry_reason,
+        tr_exit_reason,
+        cash,
+        pos,
+        entry_price,
+        entry_idx,
+        entry_reason,
+        last_eq,
+    ) = _bar_engine_kernel(
+        equity,
+        _price_to_f64(open_, n),
+        _price_to_f64(high, n),
+        _price_to_f64(low, n),
+        _price_to_f64(close, n),
+        sig[0],
+        sig[1],
+        sig[2],
+        sig[3],
+        sig[4],
+        cash0,
+        _slippage_points(cost),
+        float(cost.commission_per_side) * float(cost.fx_rate),
+        float(cost.multiplier),
+        float(cost.fx_rate),
+        bool(record_trades),
+        bool(metrics_only),
+        resume,
+        equity0,
+        pos0,
+        entry_price0,
+        entry_idx0,
+        entry_reason0,
+        pending,
+    )
 
-    def _ts_iso_z(ts64) -> str:
+    warnings = [f"AMBIGUOUS_ENTRY_IGNORED_DUE_TO_EXIT at {int(i)}" for i in ambiguous_idx]
+    records = np.empty(tr_entry_idx.shape[0], dtype=TRADE_LEDGER_DTYPE)
+    records["entry_idx"] = tr_entry_idx
+    records["exit_idx"] = tr_exit_idx
+    records["direction"] = tr_dir
+    records["entry_price"] = tr_entry_price
+    records["exit_price"] = tr_exit_price
+    records["gross_pnl"] = tr_gross
+    records["commission"] = tr_commission
+    records["entry_reason"] = tr_entry_reason
+    records["exit_reason"] = tr_exit_reason
+
+    pos = int(pos)
+    if pos != 0 and entry_idx >= 0:
+        carry_out_t = np.asarray(ts)[entry_idx]
+    else:
+        carry_out_t = carry_entry_t if pos != 0 else None
+    final_state = SimulatorState(
+        bar_index=base_index + n,
+        cash=float(cash),
+        equity=float(last_eq),
+        position=pos,
+        entry_price=float(entry_price),
+        entry_idx=base_index + int(entry_idx) if pos != 0 else -1,
+        entry_reason=int(entry_reason),
+        entry_t=carry_out_t,
+        pending=tuple(float(col[n - 1]) for col in sig),  # type: ignore[arg-type]
+    )
+
+    return SimulationResult(
+        equity=equity,
+        trades=int(trades),
+        net=float(net),
+        mdd=float(mdd),
+        warnings=warnings,
+        trades_ledger=TradeLedger(records, ts, carry_entry_t),
+        final_state=final_state,
+    )
+
+
+def simulate_bar_engine_batch(
+    *,
+    ts: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    signals: Dict[str, Optional[np.ndarray]],
+    cost: CostConfig | Sequence[CostConfig],
+    initial_equity: float = 10_000.0,
+    metrics_only: bool = False,
+) -> BatchSimulationResult:
+    """
+    Simulate K signal sets over the same OHLC bars in one call.
+
+    `signals` holds K x n arrays (same keys as `simulate_bar_engine`; missing keys / None
+    mean "no value" for every row). `cost` is either one CostConfig for all rows or one
+    per row. Row k is identical to `simulate_bar_engine` on row k's signals.
+
+    metrics_only=True skips the K x n equity matrix (result.equity has shape (K, 0)).
+    """
+    n = len(ts)
+    target = signals.get("target_dir")
+    k_rows = _batch_rows(signals)
+    costs = [cost] * k_rows if isinstance(cost, CostConfig) else list(cost)
+    if len(costs) != k_rows:
+        raise ValueError(f"cost rows mismatch: {len(costs)} != {k_rows}")
+
+    equity = np.zeros((k_rows, 0 if metrics_only else n), dtype=np.float64)
+    trades = np.zeros(k_rows, dtype=np.int64)
+    net = np.zeros(k_rows, dtype=np.float64)
+    mdd = np.zeros(k_rows, dtype=np.float64)
+    warnings: list[list[str]] = [[] for _ in range(k_rows)]
+    if n == 0 or k_rows == 0:
+        return BatchSimulationResult(equity=equity, trades=trades, net=net, mdd=mdd, warnings=warnings)
+
+    amb_row, amb_idx = _bar_engine_batch_kernel(
+        equity,
+        trades,
+        net,
+        mdd,
+        _price_to_f64(open_, n),
+        _price_to_f64(high, n),
+        _price_to_f64(low, n),
+        _price_to_f64(close, n),
+        _signal_matrix_to_f64(target, k_rows, n),
+        _signal_matrix_to_f64(signals.get("long_stop"), k_rows, n),
+        _signal_matrix_to_f64(signals.get("short_stop"), k_rows, n),
+        _signal_matrix_to_f64(signals.get("exit_long_stop"), k_rows, n),
+        _signal_matrix_to_f64(signals.get("exit_short_stop"), k_rows, n),
+        float(initial_equity),
+        np.array([_slippage_points(c) for c in costs], dtype=np.float64),
+        np.array([float(c.commission_per_side) * float(c.fx_rate) for c in costs], dtype=np.float64),
+        np.array([float(c.multiplier) for c in costs], dtype=np.float64),
+        np.array([float(c.fx_rate) for c in costs], dtype=np.float64),
+        bool(metrics_only),
+    )
+    for r, i in zip(amb_row, amb_idx):
+        warnings[int(r)].append(f"AMBIGUOUS_ENTRY_IGNORED_DUE_TO_EXIT at {int(i)}")
+    return BatchSimulationResult(equity=equity, trades=trades, net=net, mdd=mdd, warnings=warnings)
+
+
+def stack_signal_rows(rows: Sequence[Dict[str, Optional[np.ndarray]]], n: int) -> Dict[str, np.ndarray]:
+    """
+    Stack per-candidate signal dicts (1-D, as returned by strategies) into the K x n
+    float64 matrices expected by `simulate_bar_engine_batch`.
+    """
+    out: Dict[str, np.ndarray] = {}
+    for key in SIGNAL_KEYS:
+        mat = np.full((len(rows), n), np.nan, dtype=np.float64)
+        for k, row in enumerate(rows):
+            mat[k] = _signal_to_f64(row.get(key), n)
+        out[key] = mat
+    return out
+
+
+def _batch_rows(signals: Dict[str, Optional[np.ndarray]]) -> int:
+    rows = {np.shape(v)[0] for v in signals.values() if v is not None}
+    if len(rows) != 1:
+        raise ValueError(f"batch signals must share one row count, got {sorted(rows)}")
+    return rows.pop()
+
+
+def _signal_matrix_to_f64(arr: Optional[np.ndarray], k_rows: int, n: int) -> np.ndarray:
+    out = np.full((k_rows, n), np.nan, dtype=np.float64)
+    if arr is None:
+        return out
+    vals = np.asarray(arr, dtype=np.float64)
+    if vals.ndim != 2 or vals.shape[0] != k_rows:
+        raise ValueError(f"batch signal must be {k_rows} x n, got shape {vals.shape}")
+    m = min(n, vals.shape[1])
+    out[:, :m] = vals[:, :m]
+    return out
+
+
+def _slippage_points(cost: CostConfig) -> float:
+    if cost.slippage_ticks_per_side <= 0:
+        return 0.0
+    return float(cost.slippage_ticks_per_side) * float(cost.tick_size)
+
+
+def _ts_iso_z(ts64) -> str:
+    try:
+        return f"{np.datetime_as_string(ts64, unit='s')}Z"
+    except Exception:
+        return str(ts64)
+
+
+def _ts_iso_z_many(ts: np.ndarray, idx: np.ndarray) -> list[str]:
+    picked = np.asarray(ts)[idx]
+    if np.issubdtype(picked.dtype, np.datetime64):
+        return [f"{v}Z" for v in np.datetime_as_string(picked, unit="s").tolist()]
+    return [_ts_iso_z(v) for v in picked]
+
+
+def _coerce_float(v) -> float:
+    if v is None:
+        return np.nan
+    try:
+        return float(v)
+    except Exception:
+        return np.nan
+
+
+def _signal_to_f64(arr: Optional[np.ndarray], n: int) -> np.ndarray:
+    """
+    Coerce an optional signal array to a contiguous float64 array of length n.
+
+    Missing / non-numeric / out-of-range entries become NaN, matching the legacy
+    per-bar `_as_val` conversion (NaN means "no value" for every signal).
+    """
+    out = np.full(n, np.nan, dtype=np.float64)
+    if arr is None:
+        return out
+    try:
+        vals = np.asarray(arr, dtype=np.float64)
+    except (TypeError, ValueError):
         try:
-            return f"{np.datetime_as_string(ts64, unit='s')}Z"
-        except Exception:
-            return str(ts64)
+            vals = np.array([_coerce_float(v) for v in arr], dtype=np.float64)
+        except TypeError:
+            return out
+    if vals.ndim != 1:
+        return out
+    m = min(n, vals.shape[0])
+    out[:m] = vals[:m]
+    return out
+
+
+def _price_to_f64(arr: np.ndarray, n: int) -> np.ndarray:
+    vals = np.ascontiguousarray(arr, dtype=np.float64)
+    if vals.shape[0] != n:
+        raise ValueError(f"price array length mismatch: {vals.shape[0]} != {n}")
+    return vals
+
 
-    equity[0] = cash
+@njit(cache=True)
+def _bar_engine_kernel(
+    equity,
+    open_,
+    high,
+    low,
+    close,
+    target,
+    long_stop,
+    short_stop,
+    exit_long_stop,
+    exit_short_stop,
+    initial_equity,
+    slip,
+    commission,
+    multiplier,
+    fx_rate,
+    record_trades,
+    metrics_only,
+    resume,
+    initial_mtm,
+    pos0,
+    entry_price0,
+    entry_idx0,
+    entry_reason0,
+    pending,
+):
+    # initial_equity is the starting cash; a resumed run (resume=True) also starts from an open
+    # position and its mark-to-market equity, and trades bar 0 on the `pending` signals.
+    n = open_.shape[0]
+    cap = n if record_trades else 0
+    tr_entry_idx = np.empty(cap, dtype=np.int64)
+    tr_exit_idx = np.empty(cap, dtype=np.int64)
+    tr_dir = np.empty(cap, dtype=np.int8)
+    tr_entry_price = np.empty(cap, dtype=np.float64)
+    tr_exit_price = np.empty(cap, dtype=np.float64)
+    tr_gross = np.empty(cap, dtype=np.float64)
+    tr_commission = np.empty(cap, dtype=np.float64)
+    tr_entry_reason = np.empty(cap, dtype=np.int8)
+    tr_exit_reason = np.empty(cap, dtype=np.int8)
+    ambiguous = np.empty(n, dtype=np.int64)
+    n_amb = 0
+    n_rec = 0
 
-    for i in range(1, n):
+    cash = initial_equity
+    pos = pos0
+    entry_price = entry_price0
+    entry_idx = entry_idx0
+    entry_reason = entry_reason0
+    trades = 0
+    start = 0 if resume else 1
+    if not resume and not metrics_only:
+        equity[0] = cash
+    # Running peak / max drawdown (NaN-propagating like np.maximum.accumulate + np.max).
+    peak = initial_mtm
+    mdd = peak - initial_mtm
+    eq = initial_mtm
+
+    for i in range(start, n):
         s_idx = i - 1
+        if s_idx >= 0:
+            tv = target[s_idx]
+            long_stop_p = long_stop[s_idx]
+            short_stop_p = short_stop[s_idx]
+            exit_long_p = exit_long_stop[s_idx]
+            exit_short_p = exit_short_stop[s_idx]
+        else:
+            tv = pending[0]
+            long_stop_p = pending[1]
+            short_stop_p = pending[2]
+            exit_long_p = pending[3]
+            exit_short_p = pending[4]
         desired = 0
-        if target_dir is not None:
-            try:
-                desired = int(target_dir[s_idx])
-            except Exception:
-                desired = 0
-
-        long_stop_p = _as_val(long_stop, s_idx)
-        short_stop_p = _as_val(short_stop, s_idx)
-        exit_long_p = _as_val(exit_long_stop, s_idx)
-        exit_short_p = _as_val(exit_short_stop, s_idx)
-
-        bar_open = float(open_[i])
-        bar_high = float(high[i])
-        bar_low = float(low[i])
-
-        entry_stop_side: Optional[str] = None
-        entry_stop_price: Optional[float] = None
+        if np.isfinite(tv):
+            if tv >= 4.0e18:
+                desired = 4000000000000000000
+            elif tv <= -4.0e18:
+                desired = -4000000000000000000
+            else:
+                desired = int(tv)
+
+        bar_open = open_[i]
+        bar_high = high[i]
+        bar_low = low[i]
+
+        # 0 = market entry, 1 = long stop-entry, -1 = short stop-entry
+        entry_stop_side = 0
+        entry_stop_price = 0.0
         if desired != 0:
-            if desired > 0 and long_stop_p is not None:
-                entry_stop_side = "long"
+            if desired > 0 and not np.isnan(long_stop_p):
+                entry_stop_side = 1
                 entry_stop_price = long_stop_p
-            elif desired < 0 and short_stop_p is not None:
-                entry_stop_side = "short"
+            elif desired < 0 and not np.isnan(short_stop_p):
+                entry_stop_side = -1
                 entry_stop_price = short_stop_p
 
         entry_triggered = False
-        entry_fill = None
-        entry_fill_reason = None
-        if entry_stop_side == "long" and entry_stop_price is not None:
+        entry_fill = 0.0
+        if entry_stop_side == 1:
             if bar_high >= entry_stop_price:
                 entry_triggered = True
                 entry_fill = bar_open if bar_open >= entry_stop_price else entry_stop_price
-                entry_fill_reason = "stop_entry"
-        elif entry_stop_side == "short" and entry_stop_price is not None:
+        elif entry_stop_side == -1:
             if bar_low <= entry_stop_price:
                 entry_triggered = True
                 entry_fill = bar_open if bar_open <= entry_stop_price else entry_stop_price
-                entry_fill_reason = "stop_entry"
 
         exit_triggered = False
-        exit_fill = None
-        if pos > 0 and exit_long_p is not None:
+        exit_fill = 0.0
+        if pos > 0 and not np.isnan(exit_long_p):
             if bar_low <= exit_long_p:
                 exit_triggered = True
                 exit_fill = bar_open if bar_open <= exit_long_p else exit_long_p
-        elif pos < 0 and exit_short_p is not None:
+        elif pos < 0 and not np.isnan(exit_short_p):
             if bar_high >= exit_short_p:
                 exit_triggered = True
                 exit_fill = bar_open if bar_open >= exit_short_p else exit_short_p
 
-        # Stop-exit has priority (protective). If both entry+exit are possible in the same bar while holding,
-        # ignore entry and execute the exit (never skip a stop-loss).
+        # Stop-exit has priority (protective); the entry is ignored for this bar.
         if entry_triggered and exit_triggered:
-            warnings.append(f"AMBIGUOUS_ENTRY_IGNORED_DUE_TO_EXIT at {i}")
+            ambiguous[n_amb] = i
+            n_amb += 1
 
         if exit_triggered:
-            # Close position via stop-loss.
             if pos > 0:
-                exit_price = _apply_slippage(float(exit_fill), "sell")
-                gross = (exit_price - entry_price) * pos * cost.multiplier * cost.fx_rate
-                commission_total = _commission()
-                cash += gross
-                cash -= commission_total
-                if record_trades and entry_idx is not None:
-                    trades_ledger.append(
-                        {
-                            "entry_t": _ts_iso_z(ts[entry_idx]),
-                            "exit_t": _ts_iso_z(ts[i]),
-                            "direction": "long",
-                            "entry_price": float(entry_price),
-                            "exit_price": float(exit_price),
-                            "gross_pnl": float(gross),
-                            "commission": float(commission_total),
-                            "net_pnl": float(gross - commission_total),
-                            "entry_reason": entry_reason or "unknown",
-                            "exit_reason": "stop_exit",
-                            "bars_held": int(i - entry_idx),
-                        }
-                    )
-            elif pos < 0:
-                exit_price = _apply_slippage(float(exit_fill), "buy")
-                gross = (entry_price - exit_price) * (-pos) * cost.multiplier * cost.fx_rate
-                commission_total = _commission()
-                cash += gross
-                cash -= commission_total
-                if record_trades and entry_idx is not None:
-                    trades_ledger.append(
-                        {
-                            "entry_t": _ts_iso_z(ts[entry_idx]),
-                            "exit_t": _ts_iso_z(ts[i]),
-                            "direction": "short",
-                            "entry_price": float(entry_price),
-                            "exit_price": float(exit_price),
-                            "gross_pnl": float(gross),
-                            "commission": float(commission_total),
-                            "net_pnl": float(gross - commission_total),
-                            "entry_reason": entry_reason or "unknown",
-                            "exit_reason": "stop_exit",
-                            "bars_held": int(i - entry_idx),
-                        }
-                    )
+                exit_price = exit_fill - slip
+                gross = (exit_price - entry_price) * pos * multiplier * fx_rate
+            else:
+                exit_price = exit_fill + slip
+                gross = (entry_price - exit_price) * (-pos) * multiplier * fx_rate
+            cash += gross
+            cash -= commission
+            if record_trades:
+                tr_entry_idx[n_rec] = entry_idx
+                tr_exit_idx[n_rec] = i
+                tr_dir[n_rec] = 1 if pos > 0 else -1
+                tr_entry_price[n_rec] = entry_price
+                tr_exit_price[n_rec] = exit_price
+                tr_gross[n_rec] = gross
+                tr_commission[n_rec] = commission
+                tr_entry_reason[n_rec] = entry_reason
+                tr_exit_reason[n_rec] = _REASON_STOP_EXIT
+                n_rec += 1
             pos = 0
-            entry_idx = None
-            entry_reason = None
+            entry_idx = -1
             trades += 1
 
         # Market exit if target_dir requests change (after stop-exit)
         if pos != desired and pos != 0:
-            exit_price = _apply_slippage(bar_open, "sell" if pos > 0 else "buy")
             if pos > 0:
-                gross = (exit_price - entry_price) * pos * cost.multiplier * cost.fx_rate
+                exit_price = bar_open - slip
+                gross = (exit_price - entry_price) * pos * multiplier * fx_rate
             else:
-                gross = (entry_price - exit_price) * (-pos) * cost.multiplier * cost.fx_rate
-            commission_total = _commission()
+                exit_price = bar_open + slip
+                gross = (entry_price - exit_price) * (-pos) * multiplier * fx_rate
             cash += gross
-            cash -= commission_total
-            if record_trades and entry_idx is not None:
-                trades_ledger.append(
-                    {
-                        "entry_t": _ts_iso_z(ts[entry_idx]),
-                        "exit_t": _ts_iso_z(ts[i]),
-                        "direction": "long" if pos > 0 else "short",
-                        "entry_price": float(entry_price),
-                        "exit_price": float(exit_price),
-                        "gross_pnl": float(gross),
-                        "commission": float(commission_total),
-                        "net_pnl": float(gross - commission_total),
-                        "entry_reason": entry_reason or "unknown",
-                        "exit_reason": "target_change",
-                        "bars_held": int(i - entry_idx),
-                    }
-                )
+            cash -= commission
+            if record_trades:
+                tr_entry_idx[n_rec] = entry_idx
+                tr_exit_idx[n_rec] = i
+                tr_dir[n_rec] = 1 if pos > 0 else -1
+                tr_entry_price[n_rec] = entry_price
+                tr_exit_price[n_rec] = exit_price
+                tr_gross[n_rec] = gross
+                tr_commission[n_rec] = commission
+                tr_entry_reason[n_rec] = entry_reason
+                tr_exit_reason[n_rec] = _REASON_TARGET_CHANGE
+                n_rec += 1
             pos = 0
-            entry_idx = None
-            entry_reason = None
+            entry_idx = -1
             trades += 1
 
-        # Entry: if flat and desired !=0
+        # Entry: if flat and desired != 0
         if pos == 0 and desired != 0:
-            if entry_stop_side is None:
-                # Market entry
-                entry_price = _apply_slippage(bar_open, "buy" if desired > 0 else "sell")
-                cash -= _commission()
+            if entry_stop_side == 0:
+                entry_price = bar_open + slip if desired > 0 else bar_open - slip
+                cash -= commission
                 pos = 1 if desired > 0 else -1
                 entry_idx = i
-                entry_reason = "market_entry"
-            elif entry_triggered and entry_fill is not None:
-                entry_price = _apply_slippage(float(entry_fill), "buy" if desired > 0 else "sell")
-                cash -= _commission()
+                entry_reason = _REASON_MARKET_ENTRY
+            elif entry_triggered:
+                entry_price = entry_fill + slip if desired > 0 else entry_fill - slip
+                cash -= commission
                 pos = 1 if desired > 0 else -1
                 entry_idx = i
-                entry_reason = entry_fill_reason or "stop_entry"
+                entry_reason = _REASON_STOP_ENTRY
 
         # Mark-to-market
         if pos == 0:
-            equity[i] = cash
+            eq = cash
         else:
-            equity[i] = cash + (float(close[i]) - entry_price) * pos * cost.multiplier * cost.fx_rate
+            eq = cash + (close[i] - entry_price) * pos * multiplier * fx_rate
+        if not metrics_only:
+            equity[i] = eq
+        if np.isnan(eq) or eq > peak:
+            peak = eq
+        dd = peak - eq
+        if np.isnan(dd) or dd > mdd:
+            mdd = dd
 
-    net = float(equity[-1] - equity[0]) if len(equity) >= 2 else 0.0
-    mdd = _max_drawdown(equity)
-    return SimulationResult(equity=equity, trades=trades, net=net, mdd=mdd, warnings=warnings, trades_ledger=trades_ledger)
+    net = eq - initial_mtm if (n >= 2 or resume) else 0.0
+    return (
+        trades,
+        net,
+        mdd,
+        ambiguous[:n_amb],
+        tr_entry_idx[:n_rec],
+        tr_exit_idx[:n_rec],
+        tr_dir[:n_rec],
+        tr_entry_price[:n_rec],
+        tr_exit_price[:n_rec],
+        tr_gross[:n_rec],
+        tr_commission[:n_rec],
+        tr_entry_reason[:n_rec],
+        tr_exit_reason[:n_rec],
+        cash,
+        pos,
+        entry_price,
+        entry_idx,
+        entry_reason,
+        eq,
+    )
 
 
-def _max_drawdown(equity: np.ndarray) -> float:
-    if equity.size == 0:
-        return 0.0
-    peak = np.maximum.accumulate(equity)
-    dd = peak - equity
-    return float(np.max(dd))
+@njit(cache=True)
+def _bar_engine_batch_kernel(
+    equity,
+    trades,
+    net,
+    mdd,
+    open_,
+    high,
+    low,
+    close,
+    target,
+    long_stop,
+    short_stop,
+    exit_long_stop,
+    exit_short_stop,
+    initial_equity,
+    slip,
+    commission,
+    multiplier,
+    fx_rate,
+    metrics_only,
+):
+    k_rows = target.shape[0]
+    n = open_.shape[0]
+    amb_row = np.empty(k_rows * n, dtype=np.int64)
+    amb_idx = np.empty(k_rows * n, dtype=np.int64)
+    n_amb = 0
+    pending = np.full(5, np.nan)
+    for k in range(k_rows):
+        res = _bar_engine_kernel(
+            equity[k],
+            open_,
+            high,
+            low,
+            close,
+            target[k],
+            long_stop[k],
+            short_stop[k],
+            exit_long_stop[k],
+            exit_short_stop[k],
+            initial_equity,
+            slip[k],
+            commission[k],
+            multiplier[k],
+            fx_rate[k],
+            False,
+            metrics_only,
+            False,
+            initial_equity,
+            0,
+            0.0,
+            -1,
+            _REASON_MARKET_ENTRY,
+            pending,
+        )
+        trades[k] = res[0]
+        net[k] = res[1]
+        mdd[k] = res[2]
+        amb = res[3]
+        for j in range(amb.shape[0]):
+            amb_row[n_amb] = k
+            amb_idx[n_amb] = amb[j]
+            n_amb += 1
+    return amb_row[:n_amb], amb_idx[:n_amb]
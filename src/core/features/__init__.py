@@ -1,4 +1,4 @@
 """
 Core Features Package.
 """
-from .compute import compute_features_for_tf
+from .compute import build_feature_plan, compute_features_for_tf
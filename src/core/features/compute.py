@@ -11,12 +11,28 @@ from __future__ import annotations
 from ..feature_bundle import FeatureBundle
 
 import inspect
+import logging
 import numpy as np
-from typing import Dict, Literal, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Literal, Mapping, Optional, Tuple
 from datetime import datetime
 
 from contracts.features import FeatureRegistry, FeatureSpec
 from core.resampler import SessionSpecTaipei
+from indicators.numba_indicators import (
+    sma, ema, hh, ll, atr_wilder, percentile_rank, bbands_pb, bbands_width,
+    atr_channel_upper, atr_channel_lower, atr_channel_pos,
+    donchian_width, dist_to_hh, dist_to_ll,
+    rsi_wilder, adx_wilder, macd_hist, roc, rolling_z_strict,
+    true_range, atr_wilder_from_tr, atr_wilder_multi_from_tr,
+    sma_multi, ema_multi, hh_multi, ll_multi,
+)
+
+from .plan import FeaturePlan, PlanNode, PlanOutput
+
+logger = logging.getLogger(__name__)
 
 
 def compute_atr_14(
@@ -56,13 +72,11 @@ def compute_atr_14(
         tr[0] = h[0] - l[0]
 
     # 後續 bar 的 TR（需要 prev_close 有效）
-    for i in range(1, n):
-        if not (np.isfinite(h[i]) and np.isfinite(l[i]) and np.isfinite(c[i - 1])):
-            continue
-        hl = h[i] - l[i]
-        hc = abs(h[i] - c[i - 1])
-        lc = abs(l[i] - c[i - 1])
-        tr[i] = max(hl, hc, lc)
+    if n > 1:
+        prev_c = c[:-1]
+        ok = np.isfinite(h[1:]) & np.isfinite(l[1:]) & np.isfinite(prev_c)
+        h1, l1, pc = h[1:][ok], l[1:][ok], prev_c[ok]
+        tr[1:][ok] = np.maximum(np.maximum(h1 - l1, np.abs(h1 - pc)), np.abs(l1 - pc))
 
     # ATR = rolling mean of TR with window=14, strict NaN propagation per window.
     atr = np.full(n, np.nan, dtype=np.float64)
@@ -70,23 +84,27 @@ def compute_atr_14(
         return atr
 
     valid = np.isfinite(tr)
-    tr0 = np.where(valid, tr, 0.0)
-    csum = np.cumsum(tr0, dtype=np.float64)
-    ccount = np.cumsum(valid.astype(np.int64))
-
-    for i in range(13, n):
-        if i == 13:
-            count = int(ccount[i])
-            total = float(csum[i])
-        else:
-            count = int(ccount[i] - ccount[i - 14])
-            total = float(csum[i] - csum[i - 14])
-        if count == 14:
-            atr[i] = total / 14.0
+    total = window_diff_from_cumsum(np.cumsum(np.where(valid, tr, 0.0), dtype=np.float64), 14)
+    count = window_diff_from_cumsum(np.cumsum(valid.astype(np.int64)), 14)
+    full = count == 14
+    atr[13:][full] = total[full] / 14.0
 
     return atr
 
 
+def window_diff_from_cumsum(csum: np.ndarray, window: int) -> np.ndarray:
+    """
+    由 cumulative sum 取出結尾於 window-1..n-1 的視窗和（需 n >= window）
+
+    與逐 bar 寫法的算術相同：第一個視窗為 csum[window-1]，之後為 csum[i] - csum[i-window]。
+    輸入是 cumsum（不是原始值），與 numba_indicators._window_sums（原始值的分段累加）不同。
+    """
+    out = np.empty(len(csum) - window + 1, dtype=csum.dtype)
+    out[0] = csum[window - 1]
+    out[1:] = csum[window:] - csum[:-window]
+    return out
+
+
 def compute_returns(
     c: np.ndarray,
     method: str = "log",
@@ -153,38 +171,26 @@ def compute_rolling_z(
     
     # 初始化結果為 NaN
     z = np.full(n, np.nan, dtype=np.float64)
-    
-    # 計算 cumulative sums
-    cumsum = np.cumsum(x, dtype=np.float64)
-    cumsum2 = np.cumsum(x * x, dtype=np.float64)
-    
-    # 計算 rolling z-score
-    for i in range(window - 1, n):
-        # 計算視窗內的 sum 和 sum of squares
-        if i == window - 1:
-            sum_x = cumsum[i]
-            sum_x2 = cumsum2[i]
-        else:
-            sum_x = cumsum[i] - cumsum[i - window]
-            sum_x2 = cumsum2[i] - cumsum2[i - window]
-        
+    if n < window:
+        return z
+
+    # 以 cumulative sums 的差取得每個視窗的 sum 和 sum of squares
+    sum_x = window_diff_from_cumsum(np.cumsum(x, dtype=np.float64), window)
+    sum_x2 = window_diff_from_cumsum(np.cumsum(x * x, dtype=np.float64), window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
         # 計算 mean 和 variance
         mean = sum_x / window
         var = (sum_x2 / window) - (mean * mean)
-        
+
         # 防浮點負數
-        if var < 0:
-            var = 0.0
-        
+        var[var < 0] = 0.0
         std = np.sqrt(var)
-        
-        # 計算 z-score
-        if std == 0:
-            # std == 0 時，z = NaN（而不是 0）
-            z[i] = np.nan
-        else:
-            z[i] = (x[i] - mean) / std
-    
+
+        # std == 0 時，z = NaN（而不是 0）；NaN std 照常相除得 NaN
+        ok = ~(std == 0)
+        z[window - 1:][ok] = (x[window - 1:][ok] - mean[ok]) / std[ok]
+
     return z
 
 
@@ -236,6 +242,14 @@ def compute_session_vwap(
     return vwap
 
 
+# registry 未列出時補上的 baseline 特徵 → compute(inputs)（inputs 同家族計算的輸入 dict；不做 warmup）
+_BASELINE_FEATURES: Dict[str, Callable[[Mapping[str, object]], np.ndarray]] = {
+    "ret_z_200": lambda x: compute_rolling_z(compute_returns(x["c"], method="log"), window=200),
+    "session_vwap": lambda x: compute_session_vwap(x["ts"], x["c"], x["v"], x["session_spec"], x["breaks_policy"]),
+    "atr_14": lambda x: compute_atr_14(x["o"], x["h"], x["l"], x["c"]),
+}
+
+
 def _apply_feature_postprocessing(values: np.ndarray, spec) -> np.ndarray:
     """
     Apply warmup NaN and dtype enforcement according to FeatureSpec.
@@ -257,6 +271,373 @@ def _apply_feature_postprocessing(values: np.ndarray, spec) -> np.ndarray:
     return values
 
 
+# ---------------------------------------------------------------------------
+# Feature families（表格式分派）
+# ---------------------------------------------------------------------------
+
+ParamsKey = Tuple[Tuple[str, object], ...]
+SpecKey = Tuple[str, ParamsKey]
+
+
+@dataclass(frozen=True)
+class FeatureFamily:
+    """
+    特徵家族：名稱樣式 → 計算函式
+
+    Attributes:
+        name: 家族名稱（例如 "sma"），也是計算計畫辨識家族的依據
+        pattern: 名稱前綴（例如 "sma_"）；exact=True 時為完整名稱（例如 "atr_pct_14"）
+        inputs: 依序傳給 compute 的輸入欄位（ts/o/h/l/c/v/session_spec/breaks_policy）
+        compute: compute(*inputs, *args) -> np.ndarray
+        parse: parse(name, params) -> args（位置參數 tuple，例如 (window,)）
+        exact: pattern 是否為完整名稱
+    """
+    name: str
+    pattern: str
+    inputs: Tuple[str, ...]
+    compute: Callable[..., np.ndarray]
+    parse: Callable[[str, Mapping[str, object]], Tuple]
+    exact: bool = False
+
+
+def _window_from_name(part: int) -> Callable[[str, Mapping[str, object]], Tuple]:
+    """params["window"] 優先，否則取名稱以 "_" 分割後的第 part 段。"""
+    def parse(name: str, params: Mapping[str, object]) -> Tuple:
+        return (params.get("window", int(name.split("_")[part])),)
+    return parse
+
+
+def _fixed_args(*args) -> Callable[[str, Mapping[str, object]], Tuple]:
+    def parse(name: str, params: Mapping[str, object]) -> Tuple:
+        return args
+    return parse
+
+
+def _parse_macd(name: str, params: Mapping[str, object]) -> Tuple:
+    parts = name.split("_")
+    return (
+        params.get("fast", int(parts[2])),
+        params.get("slow", int(parts[3])),
+        params.get("signal", int(parts[4])),
+    )
+
+
+def _atr_pct_from_atr(c: np.ndarray, atr_vals: np.ndarray) -> np.ndarray:
+    values = np.full(len(c), np.nan, dtype=np.float64)
+    valid = (c != 0) & (~np.isnan(atr_vals))
+    values[valid] = atr_vals[valid] / c[valid]
+    return values
+
+
+def _atr_pct_14(h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+    return _atr_pct_from_atr(c, atr_wilder(h, l, c, 14))
+
+
+def _atr_pct_z(h: np.ndarray, l: np.ndarray, c: np.ndarray, window: int) -> np.ndarray:
+    return rolling_z_strict(_atr_pct_14(h, l, c), window)
+
+
+def _adx(h, l, c, window):
+    return adx_wilder(h, l, c, window)[0]
+
+
+def _di_plus(h, l, c, window):
+    return adx_wilder(h, l, c, window)[1]
+
+
+def _di_minus(h, l, c, window):
+    return adx_wilder(h, l, c, window)[2]
+
+
+def _ret_z(c: np.ndarray, window: int) -> np.ndarray:
+    return compute_rolling_z(compute_returns(c, method="log"), window=window)
+
+
+_FEATURE_FAMILIES: Dict[Tuple[str, bool], FeatureFamily] = {}
+
+
+def register_feature_family(family: FeatureFamily) -> None:
+    """
+    註冊特徵家族
+
+    比對規則：完整名稱優先，其次是最長的相符前綴（與原本 if/elif 順序一致，例如
+    atr_ch_upper_ / atr_pct_z_ 優先於 atr_）。
+
+    Raises:
+        ValueError: 相同 pattern 已註冊
+    """
+    key = (family.pattern, family.exact)
+    if key in _FEATURE_FAMILIES:
+        raise ValueError(f"feature family pattern already registered: {family.pattern!r}")
+    _FEATURE_FAMILIES[key] = family
+    _resolve_family.cache_clear()
+    _resolve_spec.cache_clear()
+    _build_feature_plan_cached.cache_clear()
+
+
+for _family in (
+    FeatureFamily("sma", "sma_", ("c",), sma, _window_from_name(1)),
+    FeatureFamily("ema", "ema_", ("c",), ema, _window_from_name(1)),
+    FeatureFamily("hh", "hh_", ("h",), hh, _window_from_name(1)),
+    FeatureFamily("ll", "ll_", ("l",), ll, _window_from_name(1)),
+    FeatureFamily("vx_percentile", "vx_percentile_", ("c",), percentile_rank, _window_from_name(2)),
+    FeatureFamily("percentile", "percentile_", ("c",), percentile_rank, _window_from_name(1)),
+    FeatureFamily("zscore", "zscore_", ("c",), compute_rolling_z, _window_from_name(1)),
+    FeatureFamily("bb_pb", "bb_pb_", ("c",), bbands_pb, _window_from_name(2)),
+    FeatureFamily("bb_width", "bb_width_", ("c",), bbands_width, _window_from_name(2)),
+    FeatureFamily("atr_ch_upper", "atr_ch_upper_", ("h", "l", "c"), atr_channel_upper, _window_from_name(3)),
+    FeatureFamily("atr_ch_lower", "atr_ch_lower_", ("h", "l", "c"), atr_channel_lower, _window_from_name(3)),
+    FeatureFamily("atr_ch_pos", "atr_ch_pos_", ("h", "l", "c"), atr_channel_pos, _window_from_name(3)),
+    FeatureFamily("atr_pct_14", "atr_pct_14", ("h", "l", "c"), _atr_pct_14, _fixed_args(), exact=True),
+    FeatureFamily("atr_pct_z", "atr_pct_z_", ("h", "l", "c"), _atr_pct_z, _window_from_name(3)),
+    # atr_14 也走 Wilder ATR（compute_atr_14 僅作為 registry 未列 atr_14 時的 baseline）
+    FeatureFamily("atr", "atr_", ("h", "l", "c"), atr_wilder, _window_from_name(1)),
+    FeatureFamily("donchian_width", "donchian_width_", ("h", "l", "c"), donchian_width, _window_from_name(2)),
+    FeatureFamily("dist_hh", "dist_hh_", ("h", "c"), dist_to_hh, _window_from_name(2)),
+    FeatureFamily("dist_ll", "dist_ll_", ("l", "c"), dist_to_ll, _window_from_name(2)),
+    FeatureFamily("rsi", "rsi_", ("c",), rsi_wilder, _window_from_name(1)),
+    FeatureFamily("adx", "adx_", ("h", "l", "c"), _adx, _window_from_name(1)),
+    FeatureFamily("di_plus", "di_plus_", ("h", "l", "c"), _di_plus, _window_from_name(2)),
+    FeatureFamily("di_minus", "di_minus_", ("h", "l", "c"), _di_minus, _window_from_name(2)),
+    FeatureFamily("macd_hist", "macd_hist_", ("c",), macd_hist, _parse_macd),
+    FeatureFamily("roc", "roc_", ("c",), roc, _window_from_name(1)),
+    FeatureFamily("ret_z_200", "ret_z_200", ("c",), _ret_z, _fixed_args(200), exact=True),
+    FeatureFamily("ret_z", "ret_z_", ("c",), _ret_z, _window_from_name(2)),
+    FeatureFamily(
+        "session_vwap", "session_vwap", ("ts", "c", "v", "session_spec", "breaks_policy"),
+        compute_session_vwap, _fixed_args(), exact=True,
+    ),
+):
+    _FEATURE_FAMILIES[(_family.pattern, _family.exact)] = _family
+del _family
+
+
+@lru_cache(maxsize=None)
+def _resolve_family(name: str) -> Optional[FeatureFamily]:
+    family = _FEATURE_FAMILIES.get((name, True))
+    if family is not None:
+        return family
+    best = None
+    for (pattern, exact), candidate in _FEATURE_FAMILIES.items():
+        if not exact and name.startswith(pattern) and (best is None or len(pattern) > len(best.pattern)):
+            best = candidate
+    return best
+
+
+def resolve_feature_family(name: str) -> Optional[FeatureFamily]:
+    """特徵名稱對應的家族（未支援時回傳 None）。"""
+    return _resolve_family(name)
+
+
+@lru_cache(maxsize=4096)
+def _resolve_spec(name: str, params_key: ParamsKey) -> Tuple[FeatureFamily, Tuple]:
+    family = _resolve_family(name)
+    if family is None:
+        raise ValueError(f"不支援的特徵名稱: {name}")
+    return family, family.parse(name, dict(params_key))
+
+
+def _freeze_param(value: object) -> object:
+    """巢狀參數轉為可 hash 的形式（list/tuple → tuple、dict → 排序後的 (key, value) tuple、set → frozenset）"""
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _freeze_param(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_param(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze_param(v) for v in value)
+    return value
+
+
+def _params_key(params: Mapping[str, object]) -> ParamsKey:
+    return tuple(sorted((k, _freeze_param(v)) for k, v in params.items()))
+
+
+@lru_cache(maxsize=None)
+def _required_params(func: Callable) -> Tuple[str, ...]:
+    """compute_func 的必需參數名稱（沒有預設值者），每個函式只做一次 inspect。"""
+    params = inspect.signature(func).parameters.values()
+    return tuple(p.name for p in params if p.default is inspect.Parameter.empty)
+
+
+# ---------------------------------------------------------------------------
+# Feature 計算計畫（共用中間結果）
+# ---------------------------------------------------------------------------
+
+# 以多視窗 kernel 批次計算的家族 → (kernel, 輸入欄位)；atr 另外共用 true range
+_BATCHED_KERNELS = {"sma": (sma_multi, "c"), "ema": (ema_multi, "c"), "hh": (hh_multi, "h"), "ll": (ll_multi, "l")}
+# 共用中間結果的家族 → (節點種類, select)
+_SHARED_FAMILIES = {
+    "adx": ("adx_wilder", 0),
+    "di_plus": ("adx_wilder", 1),
+    "di_minus": ("adx_wilder", 2),
+    "atr_pct_14": ("atr_pct", None),
+    "atr_pct_z": ("atr_pct_z", None),
+    "ret_z_200": ("ret_z", None),
+    "ret_z": ("ret_z", None),
+}
+
+
+def _planned_window(name: str, params_key: ParamsKey) -> Optional[Tuple[FeatureFamily, Optional[int]]]:
+    """
+    解析計畫可處理的規格：(家族, 整數視窗或 None)
+
+    視窗無法解析或非整數時回傳 None，交由逐一計算路徑處理（並拋出相同錯誤）。
+    """
+    try:
+        family, args = _resolve_spec(name, params_key)
+    except (ValueError, IndexError):
+        return None
+    if not args:
+        return family, None
+    window = args[0]
+    if isinstance(window, bool) or not isinstance(window, (int, np.integer)):
+        return None
+    return family, int(window)
+
+
+# 計畫節點函式：fn(inputs, *dep_values)，其餘參數以 functools.partial 綁定
+def _node_true_range(x):
+    return true_range(x["h"], x["l"], x["c"])
+
+
+def _node_log_returns(x):
+    return compute_returns(x["c"], method="log")
+
+
+def _node_multi(x, *, kernel, col, windows):
+    return kernel(x[col], windows)
+
+
+def _node_atr_multi(x, tr, *, windows):
+    return atr_wilder_multi_from_tr(tr, windows)
+
+
+def _node_row(x, rows, *, row):
+    return rows[row]
+
+
+def _node_atr_from_tr(x, tr, *, window):
+    return atr_wilder_from_tr(tr, window)
+
+
+def _node_atr_pct(x, atr_vals):
+    return _atr_pct_from_atr(x["c"], atr_vals)
+
+
+def _node_adx(x, *, window):
+    return adx_wilder(x["h"], x["l"], x["c"], window)
+
+
+def _node_ret_z(x, returns, *, window):
+    return compute_rolling_z(returns, window=window)
+
+
+def _node_atr_pct_z(x, atr_pct, *, window):
+    return rolling_z_strict(atr_pct, window)
+
+
+def build_feature_plan(specs: List[FeatureSpec]) -> FeaturePlan:
+    """
+    把 specs 解析成特徵計算計畫（依 spec 名稱與參數快取）
+
+    計畫涵蓋：
+    - sma_* / ema_* / hh_* / ll_* / atr_<w>：同家族多視窗批次計算（atr 共用 true range）
+    - adx_* / di_plus_* / di_minus_*：同視窗共用一次 adx_wilder
+    - atr_pct_14 / atr_pct_z_*：共用 ATR(14) 與 ATR(14)%（ATR(14) 若已在 atr 批次中則直接取用）
+    - ret_z_*：共用 log returns
+
+    其餘特徵（含 compute_func 規格）不在計畫內，由逐一計算路徑處理。
+    計畫結果逐一與逐一計算路徑完全一致。
+    """
+    keys = tuple(
+        (spec.name, _params_key(spec.params))
+        for spec in specs
+        if getattr(spec, "compute_func", None) is None
+    )
+    return _build_feature_plan_cached(keys)
+
+
+@lru_cache(maxsize=128)
+def _build_feature_plan_cached(spec_keys: Tuple[SpecKey, ...]) -> FeaturePlan:
+    tr_key = ("true_range",)
+
+    groups: Dict[str, List[Tuple[str, int]]] = {}
+    shared: List[Tuple[str, Tuple, Optional[int]]] = []
+    for name, params_key in spec_keys:
+        resolved = _planned_window(name, params_key)
+        if resolved is None:
+            continue
+        family, window = resolved
+        if family.name in _BATCHED_KERNELS or family.name == "atr":
+            groups.setdefault(family.name, []).append((name, window))
+        elif family.name in _SHARED_FAMILIES:
+            kind, select = _SHARED_FAMILIES[family.name]
+            shared.append((name, (kind, 14 if kind == "atr_pct" else window), select))
+
+    nodes: List[PlanNode] = [
+        PlanNode(tr_key, (), _node_true_range),
+        PlanNode(("log_returns",), (), _node_log_returns),
+    ]
+    outputs: List[PlanOutput] = []
+    atr_rows: Dict[int, Tuple[Tuple, int]] = {}
+    for family_name, members in groups.items():
+        windows = np.array([w for _, w in members], dtype=np.int64)
+        key = ("multi", family_name, tuple(int(w) for w in windows))
+        if family_name == "atr":
+            nodes.append(PlanNode(key, (tr_key,), partial(_node_atr_multi, windows=windows)))
+            for k, w in enumerate(key[2]):
+                atr_rows.setdefault(w, (key, k))
+        else:
+            kernel, col = _BATCHED_KERNELS[family_name]
+            nodes.append(PlanNode(key, (), partial(_node_multi, kernel=kernel, col=col, windows=windows)))
+        outputs.extend(PlanOutput(name, key, k) for k, (name, _) in enumerate(members))
+
+    for name, key, select in shared:
+        kind, window = key
+        if kind == "adx_wilder":
+            nodes.append(PlanNode(key, (), partial(_node_adx, window=window)))
+        elif kind == "ret_z":
+            nodes.append(PlanNode(key, (("log_returns",),), partial(_node_ret_z, window=window)))
+        elif kind == "atr_pct_z":
+            nodes.append(PlanNode(key, (("atr_pct", 14),), partial(_node_atr_pct_z, window=window)))
+        outputs.append(PlanOutput(name, key, select))
+
+    # ATR(14) / ATR(14)% 供 atr_pct_*；ATR(14) 已在 atr 批次中時直接取該列
+    if 14 in atr_rows:
+        batch_key, row = atr_rows[14]
+        nodes.append(PlanNode(("atr_wilder", 14), (batch_key,), partial(_node_row, row=row)))
+    else:
+        nodes.append(PlanNode(("atr_wilder", 14), (tr_key,), partial(_node_atr_from_tr, window=14)))
+    nodes.append(PlanNode(("atr_pct", 14), (("atr_wilder", 14),), _node_atr_pct))
+
+    # 只有被 outputs 用到的節點會進入計畫（拓撲排序時裁剪）
+    return FeaturePlan(nodes, outputs)
+
+
+def _compute_spec_values(
+    spec: FeatureSpec,
+    inputs: Mapping[str, object],
+    planned: Mapping[str, np.ndarray],
+) -> np.ndarray:
+    """單一特徵的值（尚未後處理）：compute_func、計畫結果或家族計算函式。"""
+    compute_func = getattr(spec, "compute_func", None)
+    if compute_func is not None:
+        # 必需參數映射到輸入陣列，其餘（例如 window）從 spec.params 取得
+        args = []
+        for param_name in _required_params(compute_func):
+            if param_name in inputs and param_name not in ("session_spec", "breaks_policy"):
+                args.append(inputs[param_name])
+            elif param_name in spec.params:
+                args.append(spec.params[param_name])
+            else:
+                raise ValueError(f"Cannot map parameter {param_name} for feature {spec.name}")
+        return compute_func(*args)
+    if spec.name in planned:
+        return planned[spec.name]
+    family, args = _resolve_spec(spec.name, _params_key(spec.params))
+    return family.compute(*(inputs[col] for col in family.inputs), *args)
+
+
 def compute_features_for_tf(
     ts: np.ndarray,
     o: np.ndarray,
@@ -268,6 +649,7 @@ def compute_features_for_tf(
     registry: FeatureRegistry,
     session_spec: SessionSpecTaipei,
     breaks_policy: str = "drop",
+    max_threads: Optional[int] = None,
 ) -> Dict[str, np.ndarray]:
     """
     計算指定 timeframe 的所有特徵
@@ -283,6 +665,8 @@ def compute_features_for_tf(
         registry: 特徵註冊表
         session_spec: session 規格
         breaks_policy: break 處理策略
+        max_threads: 大於 1 時以該數量的 thread pool 並行計算互不依賴的特徵
+            （numba kernels 為 nogil）；結果與循序計算完全相同。None / 1 為循序計算
         
     Returns:
         特徵字典，keys 必須為：
@@ -305,220 +689,45 @@ def compute_features_for_tf(
     
     # 建立結果字典
     result = {"ts": ts}  # ts 必須是相同的物件/值
-    # 計算每個特徵
-    for spec in specs:
-        # 檢查是否有 compute_func
-        if hasattr(spec, 'compute_func') and spec.compute_func is not None:
-            # 使用 compute_func
-            sig = inspect.signature(spec.compute_func)
-            params = list(sig.parameters.values())
-            # 只考慮沒有預設值的參數（必需參數）
-            required_params = [p for p in params if p.default is inspect.Parameter.empty]
-            # 映射參數名稱到對應的陣列
-            arg_map = {
-                "ts": ts,
-                "o": o,
-                "h": h,
-                "l": l,
-                "c": c,
-                "v": v,
-            }
-            args = []
-            for param in required_params:
-                if param.name in arg_map:
-                    args.append(arg_map[param.name])
-                else:
-                    # 可能是 window 參數，從 spec.params 取得
-                    if param.name in spec.params:
-                        args.append(spec.params[param.name])
-                    else:
-                        raise ValueError(f"Cannot map parameter {param.name} for feature {spec.name}")
-            # 呼叫 compute_func
-            try:
-                values = spec.compute_func(*args)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            except Exception as e:
-                raise
+    if max_threads is not None and max_threads < 1:
+        raise ValueError(f"max_threads 必須 >= 1，收到 {max_threads}")
+    executor: Optional[Executor] = None
+    if max_threads is not None and max_threads > 1 and specs:
+        executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="features")
+    try:
+        # 依計算計畫一次算出共用中間結果與批次特徵（每個中間陣列只算一次）
+        plan = build_feature_plan(specs)
+        planned, plan_stats = plan.execute({"h": h, "l": l, "c": c}, executor=executor)
+        logger.debug("feature plan tf=%s: %d/%d specs planned, %s", tf_min, len(plan), len(specs), plan_stats.as_dict())
+        # 家族計算函式與 compute_func 可用的輸入
+        inputs = {
+            "ts": ts,
+            "o": o,
+            "h": h,
+            "l": l,
+            "c": c,
+            "v": v,
+            "session_spec": session_spec,
+            "breaks_policy": breaks_policy,
+        }
+        # 計算每個特徵（並行時仍依 spec 順序收集與後處理）
+        if executor is None:
+            for spec in specs:
+                values = _compute_spec_values(spec, inputs, planned)
+                result[spec.name] = _apply_feature_postprocessing(values, spec)
         else:
-            # 根據特徵名稱使用預設計算函數
-            from indicators.numba_indicators import (
-                sma, ema, hh, ll, atr_wilder, percentile_rank, bbands_pb, bbands_width,
-                atr_channel_upper, atr_channel_lower, atr_channel_pos,
-                donchian_width, dist_to_hh, dist_to_ll,
-                rsi_wilder, adx_wilder, macd_hist, roc, rolling_z_strict
-            )
-            if spec.name.startswith("sma_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = sma(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("ema_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = ema(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("hh_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = hh(h, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("ll_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = ll(l, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("vx_percentile_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                values = percentile_rank(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("percentile_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = percentile_rank(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("zscore_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = compute_rolling_z(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("bb_pb_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                values = bbands_pb(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("bb_width_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                values = bbands_width(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("atr_ch_upper_"):
-                window = spec.params.get("window", int(spec.name.split("_")[3]))
-                values = atr_channel_upper(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("atr_ch_lower_"):
-                window = spec.params.get("window", int(spec.name.split("_")[3]))
-                values = atr_channel_lower(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("atr_ch_pos_"):
-                window = spec.params.get("window", int(spec.name.split("_")[3]))
-                values = atr_channel_pos(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name == "atr_pct_14":
-                atr_vals = atr_wilder(h, l, c, 14)
-                values = np.full(n, np.nan, dtype=np.float64)
-                valid = (c != 0) & (~np.isnan(atr_vals))
-                values[valid] = atr_vals[valid] / c[valid]
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("atr_pct_z_"):
-                window = spec.params.get("window", int(spec.name.split("_")[3]))
-                atr_vals = atr_wilder(h, l, c, 14)
-                atr_pct = np.full(n, np.nan, dtype=np.float64)
-                valid = (c != 0) & (~np.isnan(atr_vals))
-                atr_pct[valid] = atr_vals[valid] / c[valid]
-                values = rolling_z_strict(atr_pct, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("atr_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = atr_wilder(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("donchian_width_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                values = donchian_width(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("dist_hh_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                values = dist_to_hh(h, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("dist_ll_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                values = dist_to_ll(l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("rsi_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = rsi_wilder(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("adx_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values, _, _ = adx_wilder(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("di_plus_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                _, values, _ = adx_wilder(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("di_minus_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                _, _, values = adx_wilder(h, l, c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("macd_hist_"):
-                parts = spec.name.split("_")
-                fast = spec.params.get("fast", int(parts[2]))
-                slow = spec.params.get("slow", int(parts[3]))
-                signal = spec.params.get("signal", int(parts[4]))
-                values = macd_hist(c, fast, slow, signal)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name.startswith("roc_"):
-                window = spec.params.get("window", int(spec.name.split("_")[1]))
-                values = roc(c, window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name == "atr_14":
-                # fallback to compute_atr_14 (already defined)
-                values = compute_atr_14(o, h, l, c)
-                values = _apply_feature_postprocessing(values, spec)
-                result["atr_14"] = values
-            elif spec.name == "ret_z_200":
-                returns = compute_returns(c, method="log")
-                values = compute_rolling_z(returns, window=200)
-                values = _apply_feature_postprocessing(values, spec)
-                result["ret_z_200"] = values
-            elif spec.name.startswith("ret_z_"):
-                window = spec.params.get("window", int(spec.name.split("_")[2]))
-                returns = compute_returns(c, method="log")
-                values = compute_rolling_z(returns, window=window)
-                values = _apply_feature_postprocessing(values, spec)
-                result[spec.name] = values
-            elif spec.name == "session_vwap":
-                values = compute_session_vwap(
-                    ts, c, v, session_spec, breaks_policy
-                )
-                values = _apply_feature_postprocessing(values, spec)
-                result["session_vwap"] = values
-            else:
-                raise ValueError(f"不支援的特徵名稱: {spec.name}")
+            futures = [(spec, executor.submit(_compute_spec_values, spec, inputs, planned)) for spec in specs]
+            for spec, future in futures:
+                result[spec.name] = _apply_feature_postprocessing(future.result(), spec)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
     
     
     # 確保 baseline 特徵存在（若尚未計算）
-    if "ret_z_200" not in result:
-        returns = compute_returns(c, method="log")
-        values = compute_rolling_z(returns, window=200)
-        values = _apply_feature_postprocessing(values, None)
-        result["ret_z_200"] = values
-    if "session_vwap" not in result:
-        values = compute_session_vwap(
-            ts, c, v, session_spec, breaks_policy
-        )
-        values = _apply_feature_postprocessing(values, None)
-        result["session_vwap"] = values
-    if "atr_14" not in result:
-        values = compute_atr_14(o, h, l, c)
-        values = _apply_feature_postprocessing(values, None)
-        result["atr_14"] = values
+    for name, compute in _BASELINE_FEATURES.items():
+        if name not in result:
+            result[name] = _apply_feature_postprocessing(compute(inputs), None)
     
     # 確保所有必要特徵都存在（baseline + registry）
     for feat in ["ts", "atr_14", "ret_z_200", "session_vwap"]:
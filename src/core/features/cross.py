@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import numpy as np
 
-from .compute import compute_atr_14
+from .compute import compute_atr_14, window_diff_from_cumsum
 
 
 def _log_returns(c: np.ndarray) -> np.ndarray:
@@ -17,117 +17,93 @@ def _log_returns(c: np.ndarray) -> np.ndarray:
     return ret
 
 
+def _strict_window_stats(window: int, valid: np.ndarray, *cols: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Strict rolling sums of each column (NaN already replaced by 0).
+
+    Returns (full, sum_col0, sum_col1, ...) for windows ending at window-1..n-1,
+    where full marks windows with no NaN.
+    """
+    count = window_diff_from_cumsum(np.cumsum(valid.astype(np.int64)), window)
+    sums = tuple(window_diff_from_cumsum(np.cumsum(col, dtype=np.float64), window) for col in cols)
+    return (count == window,) + sums
+
+
 def _rolling_mean_strict(x: np.ndarray, window: int) -> np.ndarray:
     n = len(x)
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 0 or n == 0:
+    if window <= 0 or n < window:
         return out
     valid = ~np.isnan(x)
-    x0 = np.where(valid, x, 0.0)
-    csum = np.cumsum(x0, dtype=np.float64)
-    ccount = np.cumsum(valid.astype(np.int64))
-    for i in range(window - 1, n):
-        if i == window - 1:
-            count = ccount[i]
-            total = csum[i]
-        else:
-            count = ccount[i] - ccount[i - window]
-            total = csum[i] - csum[i - window]
-        if count == window:
-            out[i] = total / window
+    full, sum_x = _strict_window_stats(window, valid, np.where(valid, x, 0.0))
+    tail = out[window - 1:]
+    tail[full] = sum_x[full] / window
     return out
 
 
 def _rolling_sum_strict(x: np.ndarray, window: int) -> np.ndarray:
     n = len(x)
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 0 or n == 0:
+    if window <= 0 or n < window:
         return out
     valid = ~np.isnan(x)
-    x0 = np.where(valid, x, 0.0)
-    csum = np.cumsum(x0, dtype=np.float64)
-    ccount = np.cumsum(valid.astype(np.int64))
-    for i in range(window - 1, n):
-        if i == window - 1:
-            count = ccount[i]
-            total = csum[i]
-        else:
-            count = ccount[i] - ccount[i - window]
-            total = csum[i] - csum[i - window]
-        if count == window:
-            out[i] = total
+    full, sum_x = _strict_window_stats(window, valid, np.where(valid, x, 0.0))
+    tail = out[window - 1:]
+    tail[full] = sum_x[full]
     return out
 
 
 def _rolling_z_strict(x: np.ndarray, window: int) -> np.ndarray:
     n = len(x)
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1 or n == 0:
+    if window <= 1 or n < window:
         return out
     valid = ~np.isnan(x)
     x0 = np.where(valid, x, 0.0)
-    csum = np.cumsum(x0, dtype=np.float64)
-    csum2 = np.cumsum(x0 * x0, dtype=np.float64)
-    ccount = np.cumsum(valid.astype(np.int64))
-    for i in range(window - 1, n):
-        if i == window - 1:
-            count = ccount[i]
-            sum_x = csum[i]
-            sum_x2 = csum2[i]
-        else:
-            count = ccount[i] - ccount[i - window]
-            sum_x = csum[i] - csum[i - window]
-            sum_x2 = csum2[i] - csum2[i - window]
-        if count != window:
-            continue
+    full, sum_x, sum_x2 = _strict_window_stats(window, valid, x0, x0 * x0)
+    with np.errstate(invalid="ignore", divide="ignore"):
         mean = sum_x / window
         var = (sum_x2 / window) - (mean * mean)
-        if var <= 0:
-            continue
-        std = np.sqrt(var)
-        out[i] = (x[i] - mean) / std
+        # `not var <= 0` (rather than var > 0) keeps NaN variance windows, as before
+        ok = full & ~(var <= 0)
+        tail = out[window - 1:]
+        tail[ok] = (x[window - 1:][ok] - mean[ok]) / np.sqrt(var[ok])
     return out
 
 
+def _pair_window_moments(
+    x: np.ndarray, y: np.ndarray, window: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Strict rolling moments of (x, y) for windows ending at window-1..n-1.
+
+    Returns (ok, mean_x, mean_y, var_x, var_y, cov_xy); ok marks NaN-free windows
+    whose variances are not <= 0.
+    """
+    valid = (~np.isnan(x)) & (~np.isnan(y))
+    x0 = np.where(valid, x, 0.0)
+    y0 = np.where(valid, y, 0.0)
+    full, sum_x, sum_y, sum_x2, sum_y2, sum_xy = _strict_window_stats(
+        window, valid, x0, y0, x0 * x0, y0 * y0, x0 * y0
+    )
+    mean_x = sum_x / window
+    mean_y = sum_y / window
+    var_x = (sum_x2 / window) - (mean_x * mean_x)
+    var_y = (sum_y2 / window) - (mean_y * mean_y)
+    cov_xy = (sum_xy / window) - (mean_x * mean_y)
+    ok = full & ~(var_x <= 0) & ~(var_y <= 0)
+    return ok, mean_x, mean_y, var_x, var_y, cov_xy
+
+
 def _rolling_corr_strict(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
     n = len(x)
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1 or n == 0:
+    if window <= 1 or n < window:
         return out
-    valid = (~np.isnan(x)) & (~np.isnan(y))
-    x0 = np.where(valid, x, 0.0)
-    y0 = np.where(valid, y, 0.0)
-    csum_x = np.cumsum(x0, dtype=np.float64)
-    csum_y = np.cumsum(y0, dtype=np.float64)
-    csum_x2 = np.cumsum(x0 * x0, dtype=np.float64)
-    csum_y2 = np.cumsum(y0 * y0, dtype=np.float64)
-    csum_xy = np.cumsum(x0 * y0, dtype=np.float64)
-    ccount = np.cumsum(valid.astype(np.int64))
-    for i in range(window - 1, n):
-        if i == window - 1:
-            count = ccount[i]
-            sum_x = csum_x[i]
-            sum_y = csum_y[i]
-            sum_x2 = csum_x2[i]
-            sum_y2 = csum_y2[i]
-            sum_xy = csum_xy[i]
-        else:
-            count = ccount[i] - ccount[i - window]
-            sum_x = csum_x[i] - csum_x[i - window]
-            sum_y = csum_y[i] - csum_y[i - window]
-            sum_x2 = csum_x2[i] - csum_x2[i - window]
-            sum_y2 = csum_y2[i] - csum_y2[i - window]
-            sum_xy = csum_xy[i] - csum_xy[i - window]
-        if count != window:
-            continue
-        mean_x = sum_x / window
-        mean_y = sum_y / window
-        var_x = (sum_x2 / window) - (mean_x * mean_x)
-        var_y = (sum_y2 / window) - (mean_y * mean_y)
-        if var_x <= 0 or var_y <= 0:
-            continue
-        cov = (sum_xy / window) - (mean_x * mean_y)
-        out[i] = cov / (np.sqrt(var_x) * np.sqrt(var_y))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ok, _, _, var_x, var_y, cov = _pair_window_moments(x, y, window)
+        tail = out[window - 1:]
+        tail[ok] = cov[ok] / (np.sqrt(var_x[ok]) * np.sqrt(var_y[ok]))
     return out
 
 
@@ -141,49 +117,16 @@ def _rolling_ols_strict(x: np.ndarray, y: np.ndarray, window: int) -> tuple[np.n
     alpha = np.full(n, np.nan, dtype=np.float64)
     beta = np.full(n, np.nan, dtype=np.float64)
     r2 = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1 or n == 0:
+    if window <= 1 or n < window:
         return alpha, beta, r2
 
-    valid = (~np.isnan(x)) & (~np.isnan(y))
-    x0 = np.where(valid, x, 0.0)
-    y0 = np.where(valid, y, 0.0)
-    ccount = np.cumsum(valid.astype(np.int64))
-
-    csum_x = np.cumsum(x0, dtype=np.float64)
-    csum_y = np.cumsum(y0, dtype=np.float64)
-    csum_x2 = np.cumsum(x0 * x0, dtype=np.float64)
-    csum_y2 = np.cumsum(y0 * y0, dtype=np.float64)
-    csum_xy = np.cumsum(x0 * y0, dtype=np.float64)
-
-    for i in range(window - 1, n):
-        if i == window - 1:
-            count = ccount[i]
-            sum_x = csum_x[i]
-            sum_y = csum_y[i]
-            sum_x2 = csum_x2[i]
-            sum_y2 = csum_y2[i]
-            sum_xy = csum_xy[i]
-        else:
-            count = ccount[i] - ccount[i - window]
-            sum_x = csum_x[i] - csum_x[i - window]
-            sum_y = csum_y[i] - csum_y[i - window]
-            sum_x2 = csum_x2[i] - csum_x2[i - window]
-            sum_y2 = csum_y2[i] - csum_y2[i - window]
-            sum_xy = csum_xy[i] - csum_xy[i - window]
-        if count != window:
-            continue
-        mean_x = sum_x / window
-        mean_y = sum_y / window
-        var_x = (sum_x2 / window) - (mean_x * mean_x)
-        var_y = (sum_y2 / window) - (mean_y * mean_y)
-        if var_x <= 0 or var_y <= 0:
-            continue
-        cov_xy = (sum_xy / window) - (mean_x * mean_y)
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        ok, mean_x, mean_y, var_x, var_y, cov_xy = _pair_window_moments(x, y, window)
+        var_x, var_y, cov_xy = var_x[ok], var_y[ok], cov_xy[ok]
         b = cov_xy / var_x
-        a = mean_y - b * mean_x
-        alpha[i] = a
-        beta[i] = b
-        r2[i] = (cov_xy * cov_xy) / (var_x * var_y)
+        alpha[window - 1:][ok] = mean_y[ok] - b * mean_x[ok]
+        beta[window - 1:][ok] = b
+        r2[window - 1:][ok] = (cov_xy * cov_xy) / (var_x * var_y)
     return alpha, beta, r2
 
 
@@ -194,54 +137,32 @@ def _rolling_resid_std_strict(x: np.ndarray, y: np.ndarray, window: int, alpha:
     """
     n = len(x)
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1 or n == 0:
+    if window <= 1 or n < window:
         return out
 
     valid = (~np.isnan(x)) & (~np.isnan(y))
     x0 = np.where(valid, x, 0.0)
     y0 = np.where(valid, y, 0.0)
-    ccount = np.cumsum(valid.astype(np.int64))
-
-    csum_x = np.cumsum(x0, dtype=np.float64)
-    csum_y = np.cumsum(y0, dtype=np.float64)
-    csum_x2 = np.cumsum(x0 * x0, dtype=np.float64)
-    csum_y2 = np.cumsum(y0 * y0, dtype=np.float64)
-    csum_xy = np.cumsum(x0 * y0, dtype=np.float64)
-
-    for i in range(window - 1, n):
-        a = alpha[i]
-        b = beta[i]
-        if np.isnan(a) or np.isnan(b):
-            continue
-        if i == window - 1:
-            count = ccount[i]
-            sum_x = csum_x[i]
-            sum_y = csum_y[i]
-            sum_x2 = csum_x2[i]
-            sum_y2 = csum_y2[i]
-            sum_xy = csum_xy[i]
-        else:
-            count = ccount[i] - ccount[i - window]
-            sum_x = csum_x[i] - csum_x[i - window]
-            sum_y = csum_y[i] - csum_y[i - window]
-            sum_x2 = csum_x2[i] - csum_x2[i - window]
-            sum_y2 = csum_y2[i] - csum_y2[i - window]
-            sum_xy = csum_xy[i] - csum_xy[i - window]
-        if count != window:
-            continue
-
+    full, sum_x, sum_y, sum_x2, sum_y2, sum_xy = _strict_window_stats(
+        window, valid, x0, y0, x0 * x0, y0 * y0, x0 * y0
+    )
+    a = alpha[window - 1:]
+    b = beta[window - 1:]
+    ok = full & ~np.isnan(a) & ~np.isnan(b)
+    a, b = a[ok], b[ok]
+
+    with np.errstate(invalid="ignore", over="ignore"):
         # RSS = Σ(y - (a + b x))^2 expanded (population, window points)
         rss = (
-            sum_y2
+            sum_y2[ok]
             + (a * a) * window
-            + (b * b) * sum_x2
-            + 2.0 * a * b * sum_x
-            - 2.0 * a * sum_y
-            - 2.0 * b * sum_xy
+            + (b * b) * sum_x2[ok]
+            + 2.0 * a * b * sum_x[ok]
+            - 2.0 * a * sum_y[ok]
+            - 2.0 * b * sum_xy[ok]
         )
-        if rss < 0:
-            rss = 0.0
-        out[i] = np.sqrt(rss / window)
+        rss[rss < 0] = 0.0
+        out[window - 1:][ok] = np.sqrt(rss / window)
     return out
 
 
@@ -0,0 +1,538 @@
+"""
+Feature 增量狀態（INCREMENTAL append 只計算新 bars）
+
+compute_features_for_tf 的每個輸出特徵對應一種續算方式：
+- 遞迴型（ema / atr / atr_pct_* / atr_ch_* / rsi / adx / di_* / macd_hist / zscore / ret_z /
+  baseline atr_14）：以 indicators.online 的狀態物件保存算到 checkpoint 為止的遞推變數，
+  從該處繼續；
+- 有限視窗型（sma / hh / ll / percentile / bb_* / donchian_width / dist_* / roc）：沒有狀態，
+  從 bars 往前取足夠的尾段重算。sma / bbands 的 running sums 每 window 根重新播種
+  （見 numba_indicators._window_sums），尾段起點須對齊 window 的倍數才會逐位元相同；
+- 無法續算（session_vwap 為整段統計、compute_func 規格與自訂家族）：整段重算。
+
+checkpoint 為最後一根 bar 之前：最後一根 bucket 可能尚未收完，下次 append 時會改變。
+續算結果與完整 compute_features_for_tf 逐位元相同。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from contracts.features import FeatureRegistry, FeatureSpec
+from core.resampler import SessionSpecTaipei
+from indicators.numba_indicators import (
+    sma, ema, hh, ll, atr_wilder, percentile_rank, bbands_pb, bbands_width,
+    atr_channel_upper, atr_channel_lower, atr_channel_pos,
+    donchian_width, dist_to_hh, dist_to_ll,
+    rsi_wilder, macd_hist, roc, rolling_z_strict,
+)
+from indicators.online import (
+    AdxState, AtrState, CumsumWindowState, EmaState, MacdState, OnlineState, RollingZState, RsiState,
+)
+
+from .compute import (
+    _BASELINE_FEATURES, _adx, _apply_feature_postprocessing, _atr_pct_14, _atr_pct_from_atr, _atr_pct_z,
+    _compute_spec_values, _di_minus, _di_plus, _params_key, _resolve_spec, _ret_z, compute_rolling_z,
+)
+
+FEATURE_STATE_VERSION = 1
+
+States = Dict[str, OnlineState]
+Inputs = Mapping[str, np.ndarray]
+
+
+@dataclass(frozen=True)
+class OnlineFeature:
+    """
+    單一輸出特徵的續算方式
+
+    Attributes:
+        new_states: 建立零根 bar 時的狀態 {部件名稱: 狀態物件}；無狀態特徵為空 dict
+        advance: advance(states, x, start, stop) -> bars [start, stop) 的值（未後處理），並把
+            states 推進到 stop；x 為完整輸入陣列（有限視窗型會往前讀 start 之前的 bars）
+    """
+    new_states: Callable[[], States]
+    advance: Callable[[States, Inputs, int, int], np.ndarray]
+
+    def min_bars(self, states: States) -> int:
+        """上一版至少要有幾根 bar，其值才不再受後續 bars 影響（依序列長度整段 gate 的 kernel）"""
+        return max((s.min_bars() for s in states.values()), default=0)
+
+
+@dataclass
+class _LogReturnState(OnlineState):
+    """compute_returns(method="log")：上一根 close"""
+    count: int = 0
+    prev: float = np.nan
+
+    def update(self, c: np.ndarray) -> np.ndarray:
+        ret = np.full(len(c), np.nan, dtype=np.float64)
+        if len(c):
+            diff = np.diff(np.log(c if self.count == 0 else np.concatenate([[self.prev], c])))
+            ret[len(c) - len(diff):] = diff
+            self.prev = c[-1]
+        self.count += len(c)
+        return ret
+
+
+@dataclass
+class _TailValues(OnlineState):
+    """衍生序列最後 size 個值（供其後的有限視窗計算往前讀）"""
+    size: int
+    values: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+
+    def extend(self, new: np.ndarray) -> np.ndarray:
+        """回傳保存的值 + new，並保留最後 size 個"""
+        series = np.concatenate([self.values, new])
+        self.values = series[len(series) - min(self.size, len(series)):]
+        return series
+
+
+@dataclass
+class _BaselineAtrState(OnlineState):
+    """compute_atr_14：NaN-aware true range 的 14 根 cumsum 視窗平均"""
+    count: int = 0
+    prev_close: float = np.nan
+    tail_tr: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    tail_valid: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+
+    def update(self, h: np.ndarray, l: np.ndarray, c: np.ndarray) -> np.ndarray:
+        m = len(c)
+        tr = np.full(m, np.nan, dtype=np.float64)
+        if m:
+            if self.count == 0:
+                if np.isfinite(h[0]) and np.isfinite(l[0]):
+                    tr[0] = h[0] - l[0]
+                h_, l_, prev_c, off = h[1:], l[1:], c[:-1], 1
+            else:
+                h_, l_, prev_c, off = h, l, np.concatenate([[self.prev_close], c[:-1]]), 0
+            ok = np.isfinite(h_) & np.isfinite(l_) & np.isfinite(prev_c)
+            h1, l1, pc = h_[ok], l_[ok], prev_c[ok]
+            tr[off:][ok] = np.maximum(np.maximum(h1 - l1, np.abs(h1 - pc)), np.abs(l1 - pc))
+            self.prev_close = c[-1]
+        valid = np.isfinite(tr)
+        total_state = CumsumWindowState(14, self.count, self.tail_tr)
+        count_state = CumsumWindowState(14, self.count, self.tail_valid)
+        total = total_state.update(np.where(valid, tr, 0.0))
+        count = count_state.update(valid.astype(np.int64))
+        self.tail_tr, self.tail_valid = total_state.tail, count_state.tail
+        self.count += m
+
+        atr = np.full(m, np.nan, dtype=np.float64)
+        full = count == 14
+        seg = atr[m - len(total):]
+        seg[full] = total[full] / 14.0
+        return atr
+
+
+# ---------------------------------------------------------------------------
+# 各家族的續算方式
+# ---------------------------------------------------------------------------
+
+def _tail_start(start: int, lookback: int, align: int) -> int:
+    """start 往前 lookback 根、再向下對齊到 align 的倍數（不足時為 0）"""
+    r = start - max(lookback, 0)
+    if r <= 0:
+        return 0
+    return r - r % max(align, 1)
+
+
+def _windowed(compute, inputs: Tuple[str, ...], *, lookback: int = -1, aligned: bool = False):
+    """
+    有限視窗家族（視窗 w）：第 i 根的值只取決於前 w + lookback 根到第 i 根
+
+    aligned=True（sma / bbands）時尾段起點再對齊 w 的倍數，重新播種的相位與完整計算相同。
+    """
+    def factory(window: int) -> OnlineFeature:
+        def advance(states, x, start, stop):
+            r = _tail_start(start, window + lookback, window if aligned else 1)
+            return compute(*(x[col][r:stop] for col in inputs), window)[start - r:]
+        return OnlineFeature(dict, advance)
+    return factory
+
+
+def _ema_feature(window: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["ema"].update(x["c"][start:stop])
+    return OnlineFeature(lambda: {"ema": EmaState(window)}, advance)
+
+
+def _hlc(x: Inputs, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return x["h"][start:stop], x["l"][start:stop], x["c"][start:stop]
+
+
+def _atr_feature(window: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["atr"].update(*_hlc(x, start, stop))
+    return OnlineFeature(lambda: {"atr": AtrState(window)}, advance)
+
+
+def _atr_pct_14_feature() -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return _atr_pct_from_atr(x["c"][start:stop], states["atr"].update(*_hlc(x, start, stop)))
+    return OnlineFeature(lambda: {"atr": AtrState(14)}, advance)
+
+
+def _atr_pct_z_feature(window: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        atr_pct = _atr_pct_from_atr(x["c"][start:stop], states["atr"].update(*_hlc(x, start, stop)))
+        series = states["atr_pct"].extend(atr_pct)
+        return rolling_z_strict(series, window)[len(series) - len(atr_pct):]
+    return OnlineFeature(lambda: {"atr": AtrState(14), "atr_pct": _TailValues(max(window - 1, 0))}, advance)
+
+
+def _atr_channel_feature(kind: str) -> Callable[[int], OnlineFeature]:
+    # 與 atr_channel_* kernel 相同的逐元素算式：SMA（對齊的尾段）± Wilder ATR（狀態）
+    def factory(window: int) -> OnlineFeature:
+        def advance(states, x, start, stop):
+            atr_vals = states["atr"].update(*_hlc(x, start, stop))
+            r = _tail_start(start, window - 1, window)
+            sma_vals = sma(x["c"][r:stop], window)[start - r:]
+            out = np.full(stop - start, np.nan, dtype=np.float64)
+            live = np.arange(start, stop) >= window - 1
+            upper = sma_vals + atr_vals
+            lower = sma_vals - atr_vals
+            if kind == "upper":
+                out[live] = upper[live]
+            elif kind == "lower":
+                out[live] = lower[live]
+            else:
+                denom = upper - lower
+                live &= denom != 0.0
+                out[live] = (x["c"][start:stop][live] - lower[live]) / denom[live]
+            return out
+        return OnlineFeature(lambda: {"atr": AtrState(window)}, advance)
+    return factory
+
+
+def _rsi_feature(window: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["rsi"].update(x["c"][start:stop])
+    return OnlineFeature(lambda: {"rsi": RsiState(window)}, advance)
+
+
+def _adx_feature(select: int) -> Callable[[int], OnlineFeature]:
+    def factory(window: int) -> OnlineFeature:
+        def advance(states, x, start, stop):
+            return states["adx"].update(*_hlc(x, start, stop))[select]
+        return OnlineFeature(lambda: {"adx": AdxState(window)}, advance)
+    return factory
+
+
+def _macd_feature(fast: int, slow: int, signal: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["macd"].update(x["c"][start:stop])
+    return OnlineFeature(lambda: {"macd": MacdState(fast, slow, signal)}, advance)
+
+
+def _zscore_feature(window: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["z"].update(x["c"][start:stop])
+    return OnlineFeature(lambda: {"z": RollingZState(window)}, advance)
+
+
+def _ret_z_feature(window: int) -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["z"].update(states["ret"].update(x["c"][start:stop]))
+    return OnlineFeature(lambda: {"ret": _LogReturnState(), "z": RollingZState(window)}, advance)
+
+
+def _baseline_atr_feature() -> OnlineFeature:
+    def advance(states, x, start, stop):
+        return states["atr"].update(*_hlc(x, start, stop))
+    return OnlineFeature(lambda: {"atr": _BaselineAtrState()}, advance)
+
+
+# 家族計算函式 → 以 parse 出的整數參數建立 OnlineFeature；以函式物件（而非家族名稱）對應，
+# 自訂家族即使同名也不會誤用。未列出者（session_vwap 等）整段重算。
+_ONLINE_FAMILIES: Dict[Callable, Callable[..., OnlineFeature]] = {
+    sma: _windowed(sma, ("c",), aligned=True),
+    ema: _ema_feature,
+    hh: _windowed(hh, ("h",)),
+    ll: _windowed(ll, ("l",)),
+    percentile_rank: _windowed(percentile_rank, ("c",)),
+    compute_rolling_z: _zscore_feature,
+    bbands_pb: _windowed(bbands_pb, ("c",), aligned=True),
+    bbands_width: _windowed(bbands_width, ("c",), aligned=True),
+    atr_channel_upper: _atr_channel_feature("upper"),
+    atr_channel_lower: _atr_channel_feature("lower"),
+    atr_channel_pos: _atr_channel_feature("pos"),
+    _atr_pct_14: _atr_pct_14_feature,
+    _atr_pct_z: _atr_pct_z_feature,
+    atr_wilder: _atr_feature,
+    donchian_width: _windowed(donchian_width, ("h", "l", "c")),
+    dist_to_hh: _windowed(dist_to_hh, ("h", "c")),
+    dist_to_ll: _windowed(dist_to_ll, ("l", "c")),
+    rsi_wilder: _rsi_feature,
+    _adx: _adx_feature(0),
+    _di_plus: _adx_feature(1),
+    _di_minus: _adx_feature(2),
+    macd_hist: _macd_feature,
+    roc: _windowed(roc, ("c",), lookback=0),
+    _ret_z: _ret_z_feature,
+}
+
+_BASELINE_ONLINE: Dict[str, Callable[[], OnlineFeature]] = {
+    "ret_z_200": lambda: _ret_z_feature(200),
+    "atr_14": _baseline_atr_feature,
+}
+
+
+def online_feature(name: str, spec: Optional[FeatureSpec]) -> Optional[OnlineFeature]:
+    """
+    輸出特徵的續算方式；spec 為 None 表示 baseline 特徵
+
+    Returns:
+        OnlineFeature，無法續算（須整段重算）時為 None
+    """
+    if spec is None:
+        factory = _BASELINE_ONLINE.get(name)
+        return factory() if factory is not None else None
+    if getattr(spec, "compute_func", None) is not None:
+        return None
+    try:
+        family, args = _resolve_spec(spec.name, _params_key(spec.params))
+    except (ValueError, IndexError):
+        return None
+    factory = _ONLINE_FAMILIES.get(family.compute)
+    if factory is None or any(isinstance(a, bool) or not isinstance(a, (int, np.integer)) for a in args):
+        return None
+    return factory(*(int(a) for a in args))
+
+
+# ---------------------------------------------------------------------------
+# 狀態快照（存成 features NPZ 旁的 NPZ）
+# ---------------------------------------------------------------------------
+
+@dataclass
+class FeatureState:
+    """
+    某個 tf features NPZ 的續算狀態
+
+    Attributes:
+        checkpoint: 狀態對應的 bar 數（bars [0, checkpoint) 已推進）
+        bars_sha256: bars [0, checkpoint) 的 SHA256（下次續算時須與新 bars 的同段相符）
+        specs_sha256: 輸出特徵規格的 SHA256（規格變動時不可續算）
+        states: "特徵/部件/欄位" -> 陣列
+        features_sha256: 搭配的 features NPZ 檔案 SHA256（寫檔後由呼叫端填入）
+    """
+    checkpoint: int
+    bars_sha256: str
+    specs_sha256: str
+    states: Dict[str, np.ndarray]
+    features_sha256: Optional[str] = None
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        meta = {
+            "version": FEATURE_STATE_VERSION,
+            "checkpoint": self.checkpoint,
+            "bars_sha256": self.bars_sha256,
+            "specs_sha256": self.specs_sha256,
+            "features_sha256": self.features_sha256,
+        }
+        return {"__meta__": np.array(json.dumps(meta, sort_keys=True)), **self.states}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]) -> "FeatureState":
+        """
+        Raises:
+            ValueError: 缺少 meta、meta 欄位不完整或版本不符
+        """
+        try:
+            meta = json.loads(str(arrays["__meta__"]))
+            version = meta.get("version")
+            if version != FEATURE_STATE_VERSION:
+                raise ValueError(f"features 狀態版本不符: {version} != {FEATURE_STATE_VERSION}")
+            checkpoint = int(meta["checkpoint"])
+            bars_sha256 = str(meta["bars_sha256"])
+            specs_sha256 = str(meta["specs_sha256"])
+            features_sha256 = meta.get("features_sha256")
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"features 狀態缺少或無法解析 meta: {e!r}")
+        return cls(
+            checkpoint=checkpoint,
+            bars_sha256=bars_sha256,
+            specs_sha256=specs_sha256,
+            states={k: v for k, v in arrays.items() if k != "__meta__"},
+            features_sha256=features_sha256,
+        )
+
+
+def _output_features(registry: FeatureRegistry, tf_min: int) -> Dict[str, Optional[FeatureSpec]]:
+    """compute_features_for_tf 的輸出特徵（ts 除外）→ spec（baseline 為 None）"""
+    outputs: Dict[str, Optional[FeatureSpec]] = {spec.name: spec for spec in registry.specs_for_tf(tf_min)}
+    for name in _BASELINE_FEATURES:
+        outputs.setdefault(name, None)
+    return outputs
+
+
+def _specs_sha256(outputs: Mapping[str, Optional[FeatureSpec]]) -> str:
+    rows = []
+    for name, spec in outputs.items():
+        if spec is None:
+            rows.append([name, None])
+            continue
+        func = getattr(spec, "compute_func", None)
+        rows.append([name, sorted(spec.params.items()), spec.min_warmup_bars, getattr(func, "__qualname__", None)])
+    return hashlib.sha256(json.dumps(rows, default=str).encode("utf-8")).hexdigest()
+
+
+def _bars_sha256(x: Inputs, stop: int) -> str:
+    h = hashlib.sha256()
+    for key in ("ts", "o", "h", "l", "c", "v"):
+        arr = np.ascontiguousarray(x[key][:stop])
+        h.update(f"{key}:{arr.dtype.str}:".encode("utf-8"))
+        h.update(arr.tobytes())
+    return h.hexdigest()
+
+
+def _checkpoint(n: int) -> int:
+    return max(n - 1, 0)
+
+
+def _dump_states(name: str, states: States, out: Dict[str, np.ndarray]) -> None:
+    for part, state in states.items():
+        for key, value in state.to_arrays().items():
+            out[f"{name}/{part}/{key}"] = value
+
+
+def _load_states(name: str, feature: OnlineFeature, arrays: Mapping[str, np.ndarray]) -> Optional[States]:
+    states = feature.new_states()
+    try:
+        return {
+            part: type(state).from_arrays(
+                {key.rsplit("/", 1)[1]: value for key, value in arrays.items() if key.startswith(f"{name}/{part}/")}
+            )
+            for part, state in states.items()
+        }
+    except KeyError:
+        return None
+
+
+def _inputs(ts, o, h, l, c, v) -> Dict[str, np.ndarray]:
+    return {"ts": ts, "o": o, "h": h, "l": l, "c": c, "v": v}
+
+
+def _full_values(name: str, spec: Optional[FeatureSpec], inputs: Mapping[str, object]) -> np.ndarray:
+    """與 compute_features_for_tf 相同的整段計算（計畫結果與逐一計算路徑一致）"""
+    if spec is None:
+        return _apply_feature_postprocessing(_BASELINE_FEATURES[name](inputs), None)
+    return _apply_feature_postprocessing(_compute_spec_values(spec, inputs, {}), spec)
+
+
+def _postprocess_from(values: np.ndarray, spec: Optional[FeatureSpec], start: int) -> np.ndarray:
+    """_apply_feature_postprocessing 套用在從第 start 根 bar 開始的片段"""
+    if values.dtype != np.float64:
+        values = values.astype(np.float64)
+    warmup = getattr(spec, "min_warmup_bars", 0) if spec is not None else 0
+    if warmup > start:
+        values[:warmup - start] = np.nan
+    return values
+
+
+def capture_feature_state(
+    ts: np.ndarray,
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,
+    c: np.ndarray,
+    v: np.ndarray,
+    tf_min: int,
+    registry: FeatureRegistry,
+) -> FeatureState:
+    """
+    從第一根 bar 推進到 checkpoint 的續算狀態（完整計算 features 之後寫入）
+
+    只推進有狀態的特徵（每個 O(n)）；有限視窗型與整段重算型不需狀態。
+    """
+    x = _inputs(ts, o, h, l, c, v)
+    outputs = _output_features(registry, tf_min)
+    checkpoint = _checkpoint(len(ts))
+    states: Dict[str, np.ndarray] = {}
+    for name, spec in outputs.items():
+        feature = online_feature(name, spec)
+        if feature is None:
+            continue
+        feature_states = feature.new_states()
+        if feature_states:
+            feature.advance(feature_states, x, 0, checkpoint)
+            _dump_states(name, feature_states, states)
+    return FeatureState(checkpoint, _bars_sha256(x, checkpoint), _specs_sha256(outputs), states)
+
+
+def resume_features_for_tf(
+    ts: np.ndarray,
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,
+    c: np.ndarray,
+    v: np.ndarray,
+    tf_min: int,
+    registry: FeatureRegistry,
+    session_spec: SessionSpecTaipei,
+    previous: Mapping[str, np.ndarray],
+    state: FeatureState,
+    breaks_policy: str = "drop",
+) -> Optional[Tuple[Dict[str, np.ndarray], FeatureState, List[str]]]:
+    """
+    以上一版 features 與其續算狀態，只計算 checkpoint 之後的 bars
+
+    上一版 features 的 [0, checkpoint) 原樣保留；可續算的特徵從狀態推進，其餘整段重算。
+
+    Args:
+        ts, o, h, l, c, v: 本次完整的 resampled bars
+        previous: 上一版 features（與 state 同一次建置寫出）
+        state: 上一版的續算狀態
+
+    Returns:
+        (與 compute_features_for_tf 相同的 features, 新的續算狀態, 整段重算的特徵名稱)；
+        狀態不適用（規格變動、bars 的 checkpoint 之前不同、資料變短）時為 None
+    """
+    x = _inputs(ts, o, h, l, c, v)
+    full_inputs: Dict[str, object] = {**x, "session_spec": session_spec, "breaks_policy": breaks_policy}
+    outputs = _output_features(registry, tf_min)
+    n = len(ts)
+    n_previous = len(previous["ts"])
+    start = state.checkpoint
+    checkpoint = _checkpoint(n)
+    if (
+        state.specs_sha256 != _specs_sha256(outputs)
+        or not start <= min(n_previous, checkpoint)
+        or not np.array_equal(previous["ts"][:start], ts[:start])
+        or state.bars_sha256 != _bars_sha256(x, start)
+    ):
+        return None
+
+    result: Dict[str, np.ndarray] = {"ts": ts}
+    states_out: Dict[str, np.ndarray] = {}
+    full_recompute: List[str] = []
+    for name, spec in outputs.items():
+        feature = online_feature(name, spec)
+        if feature is None:
+            result[name] = _full_values(name, spec, full_inputs)
+            full_recompute.append(name)
+            continue
+        states = _load_states(name, feature, state.states)
+        if states is None or name not in previous or n_previous < feature.min_bars(states):
+            result[name] = _full_values(name, spec, full_inputs)
+            full_recompute.append(name)
+            fresh = feature.new_states()
+            if fresh:
+                feature.advance(fresh, x, 0, checkpoint)
+                _dump_states(name, fresh, states_out)
+            continue
+        if states:
+            head = feature.advance(states, x, start, checkpoint)
+            _dump_states(name, states, states_out)
+            values = np.concatenate([head, feature.advance(states, x, checkpoint, n)])
+        else:
+            values = feature.advance(states, x, start, n)
+        result[name] = np.concatenate([previous[name][:start], _postprocess_from(values, spec, start)])
+
+    new_state = FeatureState(checkpoint, _bars_sha256(x, checkpoint), state.specs_sha256, states_out)
+    return result, new_state, full_recompute
@@ -0,0 +1,213 @@
+"""
+Feature 計算計畫（common-subexpression elimination）
+
+把同一 timeframe 的特徵規格一次解析成中間陣列的 DAG（例如 true range、log returns、
+ATR、ADX 三元組、多視窗批次結果），每個節點在一次執行中只計算一次，供所有需要它的
+特徵共用。
+
+本模組只提供通用機制（節點、拓撲排序、執行與統計）；節點種類與特徵對應由
+core.features.compute 定義。
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+NodeKey = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class PlanNode:
+    """
+    DAG 中的一個中間結果
+
+    Attributes:
+        key: 節點識別（例如 ("atr_wilder", 14)），同 key 只計算一次
+        deps: 依賴節點的 key，執行時依序傳入 fn
+        fn: fn(inputs, *dep_values) -> value；inputs 為 {"h": ..., "l": ..., "c": ...} 等輸入欄位
+    """
+    key: NodeKey
+    deps: Tuple[NodeKey, ...]
+    fn: Callable[..., Any]
+
+
+@dataclass(frozen=True)
+class PlanOutput:
+    """
+    由計畫產出的特徵
+
+    Attributes:
+        name: 特徵名稱
+        node: 取值的節點 key
+        select: 節點值為 tuple / 2-D 陣列時取第幾個；None 表示整個節點值
+    """
+    name: str
+    node: NodeKey
+    select: Optional[int] = None
+
+
+@dataclass
+class PlanStats:
+    """
+    單次執行統計（除錯用）
+
+    Attributes:
+        nodes_computed: 實際計算的節點數
+        outputs: 產出的特徵數
+        shared_reads: 節點值被第二個以上的消費者（特徵或其他節點）重複使用的次數
+        seconds: 各節點計算耗時（key 以字串表示）
+    """
+    nodes_computed: int = 0
+    outputs: int = 0
+    shared_reads: int = 0
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "nodes_computed": self.nodes_computed,
+            "outputs": self.outputs,
+            "shared_reads": self.shared_reads,
+            "seconds": dict(self.seconds),
+            "total_seconds": float(sum(self.seconds.values())),
+        }
+
+
+def node_label(key: NodeKey) -> str:
+    """節點 key 的可讀字串，例如 atr_wilder(14)。"""
+    head, *args = key
+    return f"{head}({', '.join(str(a) for a in args)})"
+
+
+class FeaturePlan:
+    """
+    已編譯的特徵計算計畫
+
+    節點以拓撲順序保存；execute() 依序計算每個節點一次，再依 outputs 取出各特徵的值。
+    計畫本身不可變，可在多次執行（以及多執行緒）間共用。
+    """
+
+    def __init__(self, nodes: Iterable[PlanNode], outputs: Iterable[PlanOutput]):
+        self.outputs: Tuple[PlanOutput, ...] = tuple(outputs)
+        by_key: Dict[NodeKey, PlanNode] = {}
+        for node in nodes:
+            by_key.setdefault(node.key, node)
+        self.nodes: Tuple[PlanNode, ...] = _topological(by_key, [o.node for o in self.outputs])
+        # 依深度分層：同一層的節點互不依賴，可並行計算
+        depth: Dict[NodeKey, int] = {}
+        for node in self.nodes:
+            depth[node.key] = 1 + max((depth[d] for d in node.deps), default=-1)
+        levels: Dict[int, List[PlanNode]] = {}
+        for node in self.nodes:
+            levels.setdefault(depth[node.key], []).append(node)
+        self.levels: Tuple[Tuple[PlanNode, ...], ...] = tuple(tuple(levels[d]) for d in sorted(levels))
+        consumers: Dict[NodeKey, int] = {node.key: 0 for node in self.nodes}
+        for node in self.nodes:
+            for dep in node.deps:
+                consumers[dep] += 1
+        for out in self.outputs:
+            consumers[out.node] += 1
+        self.consumers: Dict[NodeKey, int] = consumers
+
+    def __len__(self) -> int:
+        return len(self.outputs)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(o.name for o in self.outputs)
+
+    def describe(self) -> Dict[str, Any]:
+        """計畫結構（節點、依賴、消費者數與特徵對應），供除錯與測試使用。"""
+        return {
+            "nodes": [
+                {
+                    "key": node_label(node.key),
+                    "deps": [node_label(d) for d in node.deps],
+                    "consumers": self.consumers[node.key],
+                }
+                for node in self.nodes
+            ],
+            "outputs": {
+                o.name: node_label(o.node) + ("" if o.select is None else f"[{o.select}]")
+                for o in self.outputs
+            },
+        }
+
+    def execute(
+        self,
+        inputs: Mapping[str, np.ndarray],
+        executor: Optional[Executor] = None,
+    ) -> Tuple[Dict[str, np.ndarray], PlanStats]:
+        """
+        執行計畫
+
+        Args:
+            inputs: 輸入欄位（例如 {"h": high, "l": low, "c": close}）
+            executor: 提供時逐層把互不依賴的節點送進 executor 並行計算
+                （numba kernels 為 nogil，可用 ThreadPoolExecutor）；結果與循序執行相同
+
+        Returns:
+            (特徵名稱 → 尚未後處理的陣列, 執行統計)；每個特徵拿到獨立的陣列，
+            後續 in-place 後處理不會互相影響。
+        """
+        stats = PlanStats()
+        values: Dict[NodeKey, Any] = {}
+        if executor is None:
+            for node in self.nodes:
+                values[node.key], stats.seconds[node_label(node.key)] = _run_node(node, inputs, values)
+                stats.nodes_computed += 1
+        else:
+            for level in self.levels:
+                futures = [(node, executor.submit(_run_node, node, inputs, values)) for node in level]
+                for node, future in futures:
+                    values[node.key], stats.seconds[node_label(node.key)] = future.result()
+                    stats.nodes_computed += 1
+        stats.shared_reads = sum(c - 1 for c in self.consumers.values() if c > 1)
+
+        result: Dict[str, np.ndarray] = {}
+        handed_out: List[np.ndarray] = []
+        for out in self.outputs:
+            value = values[out.node]
+            if out.select is not None:
+                value = value[out.select]
+            if any(np.may_share_memory(value, prev) for prev in handed_out):
+                # 同一塊記憶體已交給其他特徵，複製一份避免 in-place 後處理互相影響
+                value = np.array(value, dtype=np.float64, copy=True)
+            handed_out.append(value)
+            result[out.name] = value
+        stats.outputs = len(result)
+        return result, stats
+
+
+def _run_node(node: PlanNode, inputs: Mapping[str, np.ndarray], values: Mapping[NodeKey, Any]) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    value = node.fn(inputs, *(values[d] for d in node.deps))
+    return value, time.perf_counter() - t0
+
+
+def _topological(by_key: Mapping[NodeKey, PlanNode], roots: List[NodeKey]) -> Tuple[PlanNode, ...]:
+    order: List[PlanNode] = []
+    state: Dict[NodeKey, int] = {}  # 1 = visiting, 2 = done
+
+    def visit(key: NodeKey) -> None:
+        mark = state.get(key)
+        if mark == 2:
+            return
+        if mark == 1:
+            raise ValueError(f"feature plan has a cycle at {node_label(key)}")
+        if key not in by_key:
+            raise KeyError(f"feature plan is missing node {node_label(key)}")
+        state[key] = 1
+        node = by_key[key]
+        for dep in node.deps:
+            visit(dep)
+        state[key] = 2
+        order.append(node)
+
+    for root in roots:
+        visit(root)
+    return tuple(order)
@@ -12,7 +12,7 @@ import logging
 import re
 from dataclasses import dataclass
 from datetime import datetime, timedelta, date
-from typing import List, Tuple, Optional, Dict, Any, Literal
+from typing import List, Tuple, Optional, Dict, Any, Literal, Mapping, Sequence
 import numpy as np
 import pandas as pd
 
@@ -298,6 +298,184 @@ def compute_safe_recompute_start(
     return safe
 
 
+_US_PER_MINUTE = 60_000_000
+_US_PER_DAY = 86_400_000_000
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _empty_bars() -> Dict[str, np.ndarray]:
+    return {
+        "ts": np.array([], dtype="datetime64[s]"),
+        "open": np.array([], dtype="float64"),
+        "high": np.array([], dtype="float64"),
+        "low": np.array([], dtype="float64"),
+        "close": np.array([], dtype="float64"),
+        "volume": np.array([], dtype="int64"),
+    }
+
+
+def _datetime_to_us(dt: datetime) -> int:
+    """naive datetime → 自 1970-01-01 起的微秒數（wall-clock 算術，與 naive datetime 相減一致）"""
+    return (dt - _EPOCH) // timedelta(microseconds=1)
+
+
+def _ts_to_us(ts) -> np.ndarray:
+    """
+    時間戳記 → int64 微秒陣列
+
+    datetime64 陣列整批轉換；其他型別（UNIX seconds、datetime 物件）逐筆沿用原本的轉換規則
+    （UNIX seconds 以 datetime.fromtimestamp 解讀）。微秒是 datetime 的解析度，所以比較與
+    分桶結果與逐筆 datetime 運算相同。
+    """
+    arr = np.asarray(ts)
+    if arr.dtype.kind == "M":
+        return arr.astype("datetime64[us]").astype(np.int64)
+    out = np.empty(len(arr), dtype=np.int64)
+    for i, t in enumerate(arr):
+        if isinstance(t, (int, float, np.integer, np.floating)):
+            dt = datetime.fromtimestamp(t)
+        elif isinstance(t, np.datetime64):
+            dt = pd.Timestamp(t).to_pydatetime()
+        elif isinstance(t, datetime):
+            dt = t
+        else:
+            raise TypeError(f"不支援的時間戳記類型: {type(t)}")
+        out[i] = _datetime_to_us(dt)
+    return out
+
+
+def _session_mask_us(t_us: np.ndarray, session: SessionSpecTaipei) -> np.ndarray:
+    """
+    session.is_in_session(dt) and not session.is_in_break(dt) 的陣列版本
+
+    is_in_session 的語意照舊：隔夜時段只接受收盤前（當日 00:00 ~ close）的 bar；
+    非隔夜時段為 [open, close)，close_hhmm == "24:00" 時到隔日 00:00。
+    休市以 "%H:%M" 字串比較，這裡先對一天 1440 分鐘逐一做同樣的字串比較建表再查表。
+    """
+    tod = t_us - (t_us // _US_PER_DAY) * _US_PER_DAY
+    close_us = (session.close_hour * 60 + session.close_minute) * _US_PER_MINUTE
+    if session.is_overnight():
+        in_session = tod < close_us
+    else:
+        open_us = (session.open_hour * 60 + session.open_minute) * _US_PER_MINUTE
+        end_us = _US_PER_DAY if session.close_hhmm == "24:00" else close_us
+        in_session = (tod >= open_us) & (tod < end_us)
+    if not session.breaks:
+        return in_session
+    labels = [f"{m // 60:02d}:{m % 60:02d}" for m in range(1440)]
+    in_break_by_minute = np.array(
+        [any(start <= s < end for start, end in session.breaks) for s in labels], dtype=bool
+    )
+    return in_session & ~in_break_by_minute[tod // _US_PER_MINUTE]
+
+
+def _session_start_us(t_us: np.ndarray, session: SessionSpecTaipei) -> np.ndarray:
+    """
+    compute_session_start 的 session 規則（不含交易所覆寫）陣列版本
+
+    隔夜時段的三個候選都以 is_in_session(ts) 判斷（與候選無關），結果恆為前一天開盤；
+    非隔夜時段為當天開盤。
+    """
+    day = (t_us // _US_PER_DAY) * _US_PER_DAY
+    start = day + (session.open_hour * 60 + session.open_minute) * _US_PER_MINUTE
+    if session.is_overnight():
+        start -= _US_PER_DAY
+    return start
+
+
+def _instrument_trading_flags(t_us: np.ndarray, dataset_id: str, data_tz: str) -> np.ndarray:
+    """
+    交易所規則判斷：1 = 可交易、0 = 不可交易、-1 = 無規則（或判斷失敗），沿用 session 規則
+    """
+    flags = np.full(len(t_us), -1, dtype=np.int8)
+    try:
+        from core.trade_dates import trading_mask_for_instrument
+
+        allowed = trading_mask_for_instrument(t_us.astype("datetime64[us]"), dataset_id, data_tz=data_tz)
+    except Exception:
+        return flags
+    if allowed is not None:
+        flags[:] = allowed
+    return flags
+
+
+def _instrument_session_start_us(t_us: np.ndarray, dataset_id: str, data_tz: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    交易所 roll 規則的 session start：回傳 (start_us, found)；found 為 False 的 bar 沿用 session 規則
+    """
+    start = np.zeros(len(t_us), dtype=np.int64)
+    found = np.zeros(len(t_us), dtype=bool)
+    try:
+        from core.trade_dates import session_start_taipei_for_instrument_ts
+
+        s = session_start_taipei_for_instrument_ts(t_us.astype("datetime64[us]"), dataset_id, data_tz=data_tz)
+    except Exception:
+        return start, found
+    if s is not None:
+        start[:] = s.astype(np.int64)
+        found[:] = True
+    return start, found
+
+
+def _first_valid(values: np.ndarray, starts: np.ndarray, ends: np.ndarray, *, last: bool) -> np.ndarray:
+    """每段 [starts[k], ends[k]) 第一個（last=True 時最後一個）非 NaN 值；整段皆 NaN 時為 NaN（同 pandas first/last）"""
+    pick = ends - 1 if last else starts
+    if values.dtype.kind != "f":
+        return values[pick]
+    valid_pos = np.flatnonzero(~np.isnan(values))
+    if len(valid_pos) == len(values):
+        return values[pick]
+    out = np.full(len(starts), np.nan, dtype=values.dtype)
+    if last:
+        k = np.searchsorted(valid_pos, ends, side="left") - 1
+        ok = k >= 0
+        ok[ok] = valid_pos[k[ok]] >= starts[ok]
+    else:
+        k = np.searchsorted(valid_pos, starts, side="left")
+        ok = k < len(valid_pos)
+        ok[ok] = valid_pos[k[ok]] < ends[ok]
+    out[ok] = values[valid_pos[k[ok]]]
+    return out
+
+
+def _aggregate_buckets(
+    bucket_us: np.ndarray,
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,
+    c: np.ndarray,
+    v: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    依 bucket 聚合 OHLCV（同 groupby(bucket).agg(first/max/min/last/sum)，NaN 一律略過）
+    """
+    if len(bucket_us) > 1 and np.any(bucket_us[1:] < bucket_us[:-1]):
+        # groupby 依 bucket 排序、組內保持輸入順序 → stable sort
+        order = np.argsort(bucket_us, kind="stable")
+        bucket_us, o, h, l, c, v = (a[order] for a in (bucket_us, o, h, l, c, v))
+    new_bucket = np.empty(len(bucket_us), dtype=bool)
+    new_bucket[0] = True
+    np.not_equal(bucket_us[1:], bucket_us[:-1], out=new_bucket[1:])
+    starts = np.flatnonzero(new_bucket)
+    ends = np.append(starts[1:], len(bucket_us))
+
+    if v.dtype.kind in "iub":
+        volume = np.add.reduceat(v.astype(np.int64), starts)
+    else:
+        # 非整數 volume：沿用 pandas 的加總（skipna、compensated sum）再轉 int64
+        group_id = np.cumsum(new_bucket) - 1
+        volume = pd.Series(v).groupby(group_id, sort=False).sum().to_numpy(dtype="int64")
+
+    return {
+        "ts": bucket_us[starts].astype("datetime64[us]").astype("datetime64[s]"),
+        "open": _first_valid(o, starts, ends, last=False).astype("float64"),
+        "high": np.fmax.reduceat(h, starts).astype("float64"),
+        "low": np.fmin.reduceat(l, starts).astype("float64"),
+        "close": _first_valid(c, starts, ends, last=True).astype("float64"),
+        "volume": volume.astype("int64"),
+    }
+
+
 def resample_ohlcv(
     ts: np.ndarray, 
     o: np.ndarray, 
@@ -334,11 +512,131 @@ def resample_ohlcv(
             ts: datetime64[s] 陣列
             open, high, low, close, volume: float64 或 int64 陣列
     """
-    # 輸入驗證
     n = len(ts)
     if not (len(o) == len(h) == len(l) == len(c) == len(v) == n):
         raise ValueError("所有輸入陣列長度必須一致")
+    session_length_hours = _check_resample_limits(n, tf_min, session)
+    logger.info(f"Resampler 防護欄檢查通過: 輸入 bars={n}, timeframe={tf_min} 分鐘, 時段長度={session_length_hours:.1f} 小時")
     
+    if n == 0:
+        return _empty_bars()
+
+    t_us = _ts_to_us(ts)
+    o, h, l, c, v = (np.asarray(a) for a in (o, h, l, c, v))
+
+    # 過濾 bars：只保留在交易時段內且不在休市時段的 bars
+    keep = _keep_mask_us(t_us, session, dataset_id)
+
+    # 檢查是否在 start_ts 之後（如果提供）
+    if start_ts is not None:
+        keep &= t_us >= _datetime_to_us(start_ts)
+
+    idx = np.flatnonzero(keep)
+    if len(idx) == 0:
+        # 沒有有效的 bars
+        return _empty_bars()
+    t_us = t_us[idx]
+
+    # 計算每個 bar 所屬的 session_start
+    session_start = _anchor_us(t_us, session, dataset_id)
+
+    # bucket = session_start + floor(floor((dt - session_start) / 1 分鐘) / tf) * tf
+    delta_minutes = (t_us - session_start) // _US_PER_MINUTE
+    bucket_us = session_start + (delta_minutes // tf_min) * tf_min * _US_PER_MINUTE
+
+    # 開盤價：每個 bucket 的第一個 open；最高/最低價：max/min；收盤價：最後一個 close；成交量：總和
+    return _aggregate_buckets(bucket_us, o[idx], h[idx], l[idx], c[idx], v[idx])
+
+
+def resample_ohlcv_multi(
+    ts: np.ndarray,
+    o: np.ndarray,
+    h: np.ndarray,
+    l: np.ndarray,
+    c: np.ndarray,
+    v: np.ndarray,
+    tfs: Sequence[int],
+    session: SessionSpecTaipei,
+    dataset_id: str | None = None,
+    start_ts: Optional[datetime] | Mapping[int, Optional[datetime]] = None,
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    一次 resample 多個 timeframe，結果與逐一呼叫 resample_ohlcv 完全相同。
+    
+    時段過濾與 session anchor（含交易所規則）只對 normalized bars 做一次；各 timeframe
+    由共用的 session_start 與分鐘偏移算出 bucket。tf 由細到粗處理，若較粗的 tf 是已完成
+    的較細 tf 的倍數（且起點相同），直接由較細 tf 的 bars 聚合（例如 240m 由 120m 而來），
+    只在無法保證結果相同時（bars 未依時間排序、非整數 volume 等）才由原始 bars 聚合。
+    
+    Args:
+        ts, o, h, l, c, v: 同 resample_ohlcv
+        tfs: timeframe 分鐘數列表
+        session: 交易時段規格
+        dataset_id: 同 resample_ohlcv
+        start_ts: 所有 timeframe 共用的開始時間，或 {tf: 開始時間}（未列出的 tf 不過濾）
+        
+    Returns:
+        {tf: resampled bars 字典}
+    """
+    n = len(ts)
+    if not (len(o) == len(h) == len(l) == len(c) == len(v) == n):
+        raise ValueError("所有輸入陣列長度必須一致")
+    tf_list = sorted({int(tf) for tf in tfs})
+    session_length_hours = 0.0
+    for tf in tf_list:
+        session_length_hours = _check_resample_limits(n, tf, session)
+    logger.info(f"Resampler 防護欄檢查通過: 輸入 bars={n}, timeframes={tf_list} 分鐘, 時段長度={session_length_hours:.1f} 小時")
+
+    if isinstance(start_ts, Mapping):
+        start_us = {tf: _datetime_to_us(start_ts[tf]) if start_ts.get(tf) is not None else None for tf in tf_list}
+    else:
+        start_us = {tf: _datetime_to_us(start_ts) if start_ts is not None else None for tf in tf_list}
+
+    if n == 0:
+        return {tf: _empty_bars() for tf in tf_list}
+
+    t_us = _ts_to_us(ts)
+    idx = np.flatnonzero(_keep_mask_us(t_us, session, dataset_id))
+    t_us = t_us[idx]
+    o, h, l, c, v = (np.asarray(a)[idx] for a in (o, h, l, c, v))
+    session_start = _anchor_us(t_us, session, dataset_id)
+    delta_minutes = (t_us - session_start) // _US_PER_MINUTE
+    # 由 bars 重新聚合才與逐 bar 聚合逐位元相同：價格需為 float64（fmax/fmin 順序折疊）、volume 需為整數
+    can_cascade = all(a.dtype == np.float64 for a in (o, h, l, c)) and v.dtype.kind in "iub"
+
+    results: Dict[int, Dict[str, np.ndarray]] = {}
+    # tf → (開始時間, 每個 bucket 的 session_start, bucket 自 session_start 起的分鐘數)
+    levels: Dict[int, Tuple[Optional[int], np.ndarray, np.ndarray]] = {}
+    for tf in tf_list:
+        start = start_us[tf]
+        source = max((f for f in levels if tf % f == 0 and levels[f][0] == start), default=None)
+        if source is not None:
+            _, fine_start, fine_minutes = levels[source]
+            fine = results[source]
+            bucket_us = fine_start + (fine_minutes // tf) * tf * _US_PER_MINUTE
+            level = _cascade_level(bucket_us, fine_start)
+            if level is not None:
+                results[tf] = _aggregate_buckets(
+                    bucket_us, fine["open"], fine["high"], fine["low"], fine["close"], fine["volume"]
+                )
+                levels[tf] = (start,) + level
+                continue
+
+        sel = np.flatnonzero(t_us >= start) if start is not None else slice(None)
+        ss = session_start[sel]
+        bucket_us = ss + (delta_minutes[sel] // tf) * tf * _US_PER_MINUTE
+        if len(bucket_us) == 0:
+            results[tf] = _empty_bars()
+            continue
+        results[tf] = _aggregate_buckets(bucket_us, o[sel], h[sel], l[sel], c[sel], v[sel])
+        level = _cascade_level(bucket_us, ss) if can_cascade else None
+        if level is not None:
+            levels[tf] = (start,) + level
+    return results
+
+
+def _check_resample_limits(n: int, tf_min: int, session: SessionSpecTaipei) -> float:
+    """性能防護欄與參數檢查；回傳時段長度（小時）"""
     # 性能防護欄檢查
     if n > MAX_INPUT_BARS:
         raise ValueError(
@@ -362,155 +660,39 @@ def resample_ohlcv(
         raise ValueError(
             f"交易時段過長: {session_length_hours:.1f} 小時超過最大限制 {MAX_SESSION_HOURS} 小時。"
         )
-    
-    logger.info(f"Resampler 防護欄檢查通過: 輸入 bars={n}, timeframe={tf_min} 分鐘, 時段長度={session_length_hours:.1f} 小時")
-    
-    if n == 0:
-        return {
-            "ts": np.array([], dtype="datetime64[s]"),
-            "open": np.array([], dtype="float64"),
-            "high": np.array([], dtype="float64"),
-            "low": np.array([], dtype="float64"),
-            "close": np.array([], dtype="float64"),
-            "volume": np.array([], dtype="int64"),
-        }
-    
-    # 轉換 ts 為 datetime 物件
-    ts_datetime = []
-    for t in ts:
-        if isinstance(t, (int, float, np.integer, np.floating)):
-            # UNIX seconds
-            ts_datetime.append(datetime.fromtimestamp(t))
-        elif isinstance(t, np.datetime64):
-            # numpy datetime64
-            # 轉換為 pandas Timestamp 然後到 datetime
-            ts_datetime.append(pd.Timestamp(t).to_pydatetime())
-        elif isinstance(t, datetime):
-            # 已經是 datetime
-            ts_datetime.append(t)
-        else:
-            raise TypeError(f"不支援的時間戳記類型: {type(t)}")
-    
-    # 過濾 bars：只保留在交易時段內且不在休市時段的 bars
-    valid_indices = []
-    valid_ts = []
-    valid_o = []
-    valid_h = []
-    valid_l = []
-    valid_c = []
-    valid_v = []
-    
-    for i, dt in enumerate(ts_datetime):
-        if dataset_id:
-            try:
-                from core.trade_dates import is_trading_time_for_instrument
-
-                allowed = is_trading_time_for_instrument(dt, dataset_id, data_tz=session.tz)
-                if allowed is False:
-                    continue
-                if allowed is True:
-                    # Exchange-rule override applied; skip legacy session/break checks.
-                    pass
-                else:
-                    # No exchange override available; fall back to session rules.
-                    if not session.is_in_session(dt):
-                        continue
-                    if session.is_in_break(dt):
-                        continue
-            except Exception:
-                # Conservative: fall back to legacy session rules.
-                if not session.is_in_session(dt):
-                    continue
-                if session.is_in_break(dt):
-                    continue
-        else:
-            # 檢查是否在交易時段內
-            if not session.is_in_session(dt):
-                continue
-            # 檢查是否在休市時段內
-            if session.is_in_break(dt):
-                continue
-        
-        # 檢查是否在 start_ts 之後（如果提供）
-        if start_ts is not None and dt < start_ts:
-            continue
-        
-        valid_indices.append(i)
-        valid_ts.append(dt)
-        valid_o.append(o[i])
-        valid_h.append(h[i])
-        valid_l.append(l[i])
-        valid_c.append(c[i])
-        valid_v.append(v[i])
-    
-    if not valid_ts:
-        # 沒有有效的 bars
-        return {
-            "ts": np.array([], dtype="datetime64[s]"),
-            "open": np.array([], dtype="float64"),
-            "high": np.array([], dtype="float64"),
-            "low": np.array([], dtype="float64"),
-            "close": np.array([], dtype="float64"),
-            "volume": np.array([], dtype="int64"),
-        }
-    
-    # 將 valid_ts 轉換為 pandas DatetimeIndex 以便 resample
-    df = pd.DataFrame({
-        "open": valid_o,
-        "high": valid_h,
-        "low": valid_l,
-        "close": valid_c,
-        "volume": valid_v,
-    }, index=pd.DatetimeIndex(valid_ts, tz=None))
-    
-    # 計算每個 bar 所屬的 session_start
-    session_starts = [compute_session_start(dt, session, dataset_id=dataset_id) for dt in valid_ts]
-    
-    # 計算從 session_start 開始的經過分鐘數
-    # 我們需要將每個 bar 分配到以 session_start 為基準的 tf 分鐘區間
-    # 建立一個虛擬的時間戳記：session_start + floor((dt - session_start)/tf)*tf
-    bucket_times = []
-    for dt, sess_start in zip(valid_ts, session_starts):
-        delta = dt - sess_start
-        delta_minutes = int(delta.total_seconds() // 60)
-        bucket_minutes = (delta_minutes // tf_min) * tf_min
-        bucket_time = sess_start + timedelta(minutes=bucket_minutes)
-        bucket_times.append(bucket_time)
-    
-    # 使用 bucket_times 進行分組
-    df["bucket_time"] = bucket_times
-    
-    # 分組聚合
-    grouped = df.groupby("bucket_time", sort=True)
-    
-    # 計算 OHLCV
-    # 開盤價：每個 bucket 的第一個 open
-    # 最高價：每個 bucket 的 high 最大值
-    # 最低價：每個 bucket 的 low 最小值
-    # 收盤價：每個 bucket 的最後一個 close
-    # 成交量：每個 bucket 的 volume 總和
-    result_df = pd.DataFrame({
-        "open": grouped["open"].first(),
-        "high": grouped["high"].max(),
-        "low": grouped["low"].min(),
-        "close": grouped["close"].last(),
-        "volume": grouped["volume"].sum(),
-    })
-    
-    # 確保結果排序（groupby 應該已經排序，但為了安全）
-    result_df = result_df.sort_index()
-    
-    # 轉換為 numpy arrays
-    result_ts = result_df.index.to_numpy(dtype="datetime64[s]")
-    
-    return {
-        "ts": result_ts,
-        "open": result_df["open"].to_numpy(dtype="float64"),
-        "high": result_df["high"].to_numpy(dtype="float64"),
-        "low": result_df["low"].to_numpy(dtype="float64"),
-        "close": result_df["close"].to_numpy(dtype="float64"),
-        "volume": result_df["volume"].to_numpy(dtype="int64"),
-    }
+    return session_length_hours
+
+
+def _keep_mask_us(t_us: np.ndarray, session: SessionSpecTaipei, dataset_id: str | None) -> np.ndarray:
+    """時段內且不在休市時段的 bars；有 dataset_id 時交易所規則（True/False）優先，無規則沿用 session 規則"""
+    keep = _session_mask_us(t_us, session)
+    if dataset_id:
+        flags = _instrument_trading_flags(t_us, dataset_id, session.tz)
+        keep = (flags == 1) | ((flags == -1) & keep)
+    return keep
+
+
+def _anchor_us(t_us: np.ndarray, session: SessionSpecTaipei, dataset_id: str | None) -> np.ndarray:
+    """每個 bar 的 session_start（有交易所 roll 規則時以其為準）"""
+    session_start = _session_start_us(t_us, session)
+    if dataset_id:
+        override, found = _instrument_session_start_us(t_us, dataset_id, session.tz)
+        session_start = np.where(found, override, session_start)
+    return session_start
+
+
+def _cascade_level(bucket_us: np.ndarray, session_start: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    bucket 依輸入順序遞增且每個 bucket 只含單一 session_start 時，回傳
+    (每個 bucket 的 session_start, bucket 自 session_start 起的分鐘數) 供較粗 tf 沿用；否則 None
+    """
+    if len(bucket_us) == 0 or np.any(bucket_us[1:] < bucket_us[:-1]):
+        return None
+    starts = np.flatnonzero(np.r_[True, bucket_us[1:] != bucket_us[:-1]])
+    first = session_start[starts]
+    if np.any(np.minimum.reduceat(session_start, starts) != np.maximum.reduceat(session_start, starts)):
+        return None
+    return first, (bucket_us[starts] - first) // _US_PER_MINUTE
 
 
 def normalize_raw_bars(raw_ingest_result) -> Dict[str, np.ndarray]:
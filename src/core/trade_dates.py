@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from datetime import datetime, timedelta, time
+from datetime import datetime, timedelta, time, timezone
 from zoneinfo import ZoneInfo
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import yaml
 
 
@@ -67,12 +68,141 @@ def _parse_hms(value: str) -> time:
     raise ValueError(f"invalid time: {value}")
 
 
-def _time_in_range(t: time, start: time, end: time) -> bool:
-    # Non-overnight
+# ---------------------------------------------------------------------------
+# UTC-offset transition tables (array timezone conversion)
+#
+# All array helpers work on int64 microseconds since 1970-01-01: UTC instants, or naive
+# wall-clock times in some timezone ("local"). Conversions reproduce zoneinfo exactly,
+# including fold semantics for ambiguous / nonexistent wall times, so the array APIs
+# below agree with the per-datetime ZoneInfo code they replace.
+# ---------------------------------------------------------------------------
+
+_US_PER_SECOND = 1_000_000
+_US_PER_MINUTE = 60 * _US_PER_SECOND
+_US_PER_HOUR = 60 * _US_PER_MINUTE
+_US_PER_DAY = 24 * _US_PER_HOUR
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _TzTable:
+    """
+    UTC-offset transitions of one timezone over a range of years.
+
+    offset[k] applies from utc[k - 1] (exclusive of earlier instants) onward; offset[0]
+    applies before the first transition. Transitions are located by sampling the zone
+    once per day and bisecting to the second.
+    """
+
+    def __init__(self, utc: np.ndarray, offset: np.ndarray):
+        self.utc = utc
+        self.offset = offset
+        # Wall-clock transition points as zoneinfo builds them: fold=0 resolves a
+        # wall time with the larger of the two neighbouring offsets, fold=1 the smaller.
+        self._wall = (
+            utc + np.maximum(offset[:-1], offset[1:]),
+            utc + np.minimum(offset[:-1], offset[1:]),
+        )
+
+    def to_local(self, utc_us: np.ndarray) -> np.ndarray:
+        return utc_us + self.offset[np.searchsorted(self.utc, utc_us, side="right")]
+
+    def to_utc(self, local_us: np.ndarray, fold: int = 0) -> np.ndarray:
+        """Like `naive.replace(tzinfo=tz, fold=fold)` followed by conversion to UTC."""
+        return local_us - self.offset[np.searchsorted(self._wall[fold], local_us, side="right")]
+
+    def fold_of(self, local_us: np.ndarray, utc_us: np.ndarray) -> np.ndarray:
+        """fold attribute that astimezone() gives the wall time local_us of instant utc_us."""
+        return self.to_utc(local_us, 0) != utc_us
+
+
+@lru_cache(maxsize=64)
+def _tz_table_for_years(tz_name: str, first_year: int, last_year: int) -> _TzTable:
+    tz = ZoneInfo(tz_name)
+
+    def offset_us(sec: int) -> int:
+        return datetime.fromtimestamp(sec, tz).utcoffset() // timedelta(microseconds=1)
+
+    start = int(datetime(first_year, 1, 1, tzinfo=timezone.utc).timestamp())
+    end = int(datetime(last_year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+    transitions: list[int] = []
+    offsets = [offset_us(start)]
+    prev = start
+    for sec in range(start + 86400, end + 86400, 86400):
+        off = offset_us(sec)
+        if off == offsets[-1]:
+            prev = sec
+            continue
+        lo, hi = prev, sec
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if offset_us(mid) == offsets[-1]:
+                lo = mid
+            else:
+                hi = mid
+        transitions.append(hi * _US_PER_SECOND)
+        offsets.append(off)
+        prev = sec
+    return _TzTable(np.array(transitions, dtype=np.int64), np.array(offsets, dtype=np.int64))
+
+
+def _tz_table(tz_name: str, *arrays_us: np.ndarray) -> _TzTable:
+    """Transition table covering every timestamp in arrays_us (cached per decade range)."""
+    nonempty = [a for a in arrays_us if len(a)]
+    if not nonempty:
+        return _tz_table_for_years(tz_name, 1970, 1979)
+    lo = min(int(a.min()) for a in nonempty)
+    hi = max(int(a.max()) for a in nonempty)
+    years = np.array([lo, hi]).astype("datetime64[us]").astype("datetime64[Y]").astype(np.int64) + 1970
+    first = (int(years[0]) - 1) // 10 * 10
+    last = (int(years[1]) + 1) // 10 * 10 + 9
+    return _tz_table_for_years(tz_name, max(first, 1), min(last, 9998))
+
+
+def _to_us(ts_arr: Any) -> np.ndarray:
+    return np.asarray(ts_arr).astype("datetime64[us]").astype(np.int64)
+
+
+def _datetime_to_local_us(ts: datetime, data_tz: str) -> tuple[np.ndarray, np.ndarray]:
+    """Scalar datetime → (data_tz wall time, fold); naive ts is taken as data_tz wall time."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(ZoneInfo(data_tz))
+    local = (ts.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1)
+    return np.array([local], dtype=np.int64), np.array([bool(ts.fold)])
+
+
+def _wall_in(tz_name: str, src_tz: str, local: np.ndarray, fold: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Wall time and fold in tz_name of the src_tz wall times (local, fold), like astimezone().
+
+    As with astimezone() onto the zone a datetime already has, tz_name == src_tz returns the
+    input unchanged (a nonexistent wall time stays as written).
+    """
+    ZoneInfo(tz_name)
+    if tz_name == src_tz:
+        return local, fold
+    src = _tz_table(src_tz, local)
+    utc = np.where(fold, src.to_utc(local, 1), src.to_utc(local, 0))
+    dst = _tz_table(tz_name, utc)
+    wall = dst.to_local(utc)
+    return wall, dst.fold_of(wall, utc)
+
+
+def _wall_hhmm_us(value: str) -> int:
+    """Roll time as microseconds after midnight; like datetime.replace, rejects out-of-range values."""
+    hh, mm = _parse_roll_hhmm(value)
+    if not (0 <= hh < 24 and 0 <= mm < 60):
+        raise ValueError(f"invalid roll time: {value}")
+    return hh * _US_PER_HOUR + mm * _US_PER_MINUTE
+
+
+def _time_of_day_us(value: time) -> int:
+    return ((value.hour * 60 + value.minute) * 60 + value.second) * _US_PER_SECOND + value.microsecond
+
+
+def _time_in_range_us(tod: np.ndarray, start: int, end: int) -> np.ndarray:
     if end > start:
-        return start <= t < end
-    # Overnight (wrap midnight)
-    return t >= start or t < end
+        return (tod >= start) & (tod < end)
+    return (tod >= start) | (tod < end)
 
 
 @lru_cache(maxsize=256)
@@ -121,6 +251,28 @@ def _profile_windows_config_for_instrument(instrument: str) -> tuple[str, str, l
         return None
 
 
+@lru_cache(maxsize=256)
+def _profile_windows_us(instrument: str) -> tuple[str, str, tuple[tuple[int, int], ...], tuple[tuple[int, int], ...]] | None:
+    """
+    (windows_tz, data_tz, break ranges, trading ranges) with ranges as microseconds after midnight.
+
+    Raises like _parse_hms on malformed window times (callers treat that as "no rule").
+    """
+    win_cfg = _profile_windows_config_for_instrument(instrument)
+    if win_cfg is None:
+        return None
+    windows_tz, prof_data_tz, windows = win_cfg
+
+    def _ranges(state: str) -> tuple[tuple[int, int], ...]:
+        return tuple(
+            (_time_of_day_us(_parse_hms(w["start"])), _time_of_day_us(_parse_hms(w["end"])))
+            for w in windows
+            if w["state"] == state
+        )
+
+    return windows_tz, prof_data_tz, _ranges("BREAK"), _ranges("TRADING")
+
+
 def trade_days_for_ts(
     ts_arr: Any,
     *,
@@ -135,29 +287,42 @@ def trade_days_for_ts(
       - Convert each timestamp to exchange_tz.
       - If local time >= roll_time, trade_date = local_date + 1 day, else local_date.
 
+    The "+ 1 day" is 24 elapsed hours from local midnight (as with tz-aware pandas
+    arithmetic), so on a 25-hour DST day it stays on the same date.
+    Ambiguous or nonexistent data_tz wall times (or exchange-local midnights) raise ValueError.
+
     Returns:
       numpy array of dtype datetime64[D], aligned with ts_arr order.
     """
-    import numpy as np
-    import pandas as pd
-
     if len(ts_arr) == 0:
         return np.array([], dtype="datetime64[D]")
 
     roll_h, roll_m = _parse_roll_hhmm(trade_date_roll_time_local)
 
-    idx = pd.to_datetime(ts_arr.astype("datetime64[ns]"))
-    if getattr(idx, "tz", None) is None:
-        idx = idx.tz_localize(data_tz)
-    else:
-        idx = idx.tz_convert(data_tz)
-    exch = idx.tz_convert(exchange_tz)
-
-    after_roll = (exch.hour > roll_h) | ((exch.hour == roll_h) & (exch.minute >= roll_m))
-    base = exch.normalize()
-    trade_dates = base + pd.to_timedelta(after_roll.astype(int), unit="D")
-    # Return as datetime64[D] for fast boundary detection.
-    return trade_dates.tz_localize(None).values.astype("datetime64[D]")
+    ts64 = np.asarray(ts_arr).astype("datetime64[us]")
+    nat = np.isnat(ts64)
+    local = ts64.astype(np.int64)[~nat]
+    out = np.full(len(ts64), np.datetime64("NaT", "D"), dtype="datetime64[D]")
+    if len(local) == 0:
+        return out
+
+    data = _tz_table(data_tz, local)
+    utc = data.to_utc(local, 0)
+    if np.any(utc != data.to_utc(local, 1)):
+        raise ValueError(f"ambiguous or nonexistent wall times in {data_tz}")
+    exch = _tz_table(exchange_tz, utc)
+    exch_local = exch.to_local(utc)
+
+    day = exch_local // _US_PER_DAY * _US_PER_DAY
+    minute_of_day = (exch_local - day) // _US_PER_MINUTE
+    hour, minute = minute_of_day // 60, minute_of_day % 60
+    after_roll = (hour > roll_h) | ((hour == roll_h) & (minute >= roll_m))
+    day_utc = exch.to_utc(day, 0)
+    if np.any(day_utc != exch.to_utc(day, 1)):
+        raise ValueError(f"ambiguous or nonexistent local midnight in {exchange_tz}")
+    trade_day = exch.to_local(day_utc + after_roll * _US_PER_DAY) // _US_PER_DAY
+    out[~nat] = trade_day.astype("datetime64[D]")
+    return out
 
 
 def trade_days_for_instrument_ts(ts_arr: Any, instrument: str, *, data_tz: str = "Asia/Taipei"):
@@ -182,6 +347,36 @@ def trade_days_for_instrument_ts(ts_arr: Any, instrument: str, *, data_tz: str =
         return ts_arr.astype("datetime64[D]")
 
 
+def _session_start_local_us(local: np.ndarray, fold: np.ndarray, data_tz: str, exchange_tz: str, roll: str) -> np.ndarray:
+    """Session start as data_tz wall time: the latest exchange roll at or before each timestamp."""
+    roll_us = _wall_hhmm_us(roll)
+    exch_local, exch_fold = _wall_in(exchange_tz, data_tz, local, fold)
+    roll_local = exch_local // _US_PER_DAY * _US_PER_DAY + roll_us
+    # Wall-clock comparison and day arithmetic (same tzinfo); the start keeps the fold
+    # of the exchange-local timestamp it was derived from.
+    start_local = np.where(exch_local >= roll_local, roll_local, roll_local - _US_PER_DAY)
+    start, _ = _wall_in(data_tz, exchange_tz, start_local, exch_fold)
+    return start
+
+
+def session_start_taipei_for_instrument_ts(ts_arr: Any, instrument: str, *, data_tz: str = "Asia/Taipei"):
+    """
+    Array version of session_start_taipei_for_instrument for naive data_tz timestamps.
+
+    Returns datetime64[us] session starts (data_tz wall time), or None when the instrument
+    has no exchange roll config.
+    """
+    cfg = _instrument_exchange_config(_normalize_symbol(instrument))
+    if cfg is None:
+        return None
+    exchange, exchange_tz, roll = cfg
+    if not exchange_tz or not roll:
+        return None
+    local = _to_us(ts_arr)
+    fold = np.zeros(len(local), dtype=bool)
+    return _session_start_local_us(local, fold, data_tz, exchange_tz, roll).astype("datetime64[us]")
+
+
 def session_start_taipei_for_instrument(ts: datetime, instrument: str, *, data_tz: str = "Asia/Taipei") -> datetime | None:
     """
     Compute the session start (Taipei-local naive datetime) for a timestamp.
@@ -196,81 +391,73 @@ def session_start_taipei_for_instrument(ts: datetime, instrument: str, *, data_t
     if not exchange_tz or not roll:
         return None
 
-    # Localize ts as data_tz if it's naive.
-    if ts.tzinfo is None:
-        ts_local = ts.replace(tzinfo=ZoneInfo(data_tz))
-    else:
-        ts_local = ts.astimezone(ZoneInfo(data_tz))
-
-    ts_exch = ts_local.astimezone(ZoneInfo(exchange_tz))
-    roll_h, roll_m = _parse_roll_hhmm(roll)
-    roll_time = ts_exch.replace(hour=roll_h, minute=roll_m, second=0, microsecond=0)
-
-    # Session start is today's roll if ts >= roll else yesterday's roll.
-    if ts_exch >= roll_time:
-        start_exch = roll_time
-    else:
-        start_exch = roll_time - timedelta(days=1)
+    local, fold = _datetime_to_local_us(ts, data_tz)
+    start = _session_start_local_us(local, fold, data_tz, exchange_tz, roll)
+    return _EPOCH + timedelta(microseconds=int(start[0]))
 
-    start_tpe = start_exch.astimezone(ZoneInfo(data_tz))
-    return start_tpe.replace(tzinfo=None)
-
-
-def is_trading_time_for_instrument(ts: datetime, instrument: str, *, data_tz: str = "Asia/Taipei") -> bool | None:
-    """
-    Determine if a timestamp is within trading time (not a daily maintenance break).
 
-    Mainline rule for CME/CFE-style futures:
-      - daily break is [roll_time - 1h, roll_time) in exchange local time
-      - trading otherwise
-    """
+def _trading_mask_local(local: np.ndarray, fold: np.ndarray, data_tz: str, instrument: str) -> np.ndarray | None:
+    """Tradable flags for data_tz wall times; None when the instrument has no exchange rule."""
     cfg = _instrument_exchange_config(_normalize_symbol(instrument))
     if cfg is None:
         return None
     exchange, exchange_tz, roll = cfg
     if not exchange_tz or not roll:
         return None
-
-    if ts.tzinfo is None:
-        ts_local = ts.replace(tzinfo=ZoneInfo(data_tz))
-    else:
-        ts_local = ts.astimezone(ZoneInfo(data_tz))
+    ZoneInfo(data_tz)
 
     # CME/CFE: enforce daily 1h maintenance break relative to exchange roll time.
     if exchange in {"CME", "CFE"}:
-        ts_exch = ts_local.astimezone(ZoneInfo(exchange_tz))
-        roll_h, roll_m = _parse_roll_hhmm(roll)
-        roll_dt = ts_exch.replace(hour=roll_h, minute=roll_m, second=0, microsecond=0)
-
-        def _in_break(anchor: datetime) -> bool:
-            return (anchor - timedelta(hours=1)) <= ts_exch < anchor
-
-        if _in_break(roll_dt) or _in_break(roll_dt + timedelta(days=1)) or _in_break(roll_dt - timedelta(days=1)):
-            return False
-        return True
+        roll_us = _wall_hhmm_us(roll)
+        exch_local, _ = _wall_in(exchange_tz, data_tz, local, fold)
+        tod = exch_local - exch_local // _US_PER_DAY * _US_PER_DAY
+        in_break = np.zeros(len(local), dtype=bool)
+        # breaks before the roll of the same, next and previous exchange-local day
+        for anchor in (roll_us, roll_us + _US_PER_DAY, roll_us - _US_PER_DAY):
+            in_break |= (tod >= anchor - _US_PER_HOUR) & (tod < anchor)
+        return ~in_break
 
     # Other exchanges: if profile windows exist, classify by those windows (DST-aware).
-    win_cfg = _profile_windows_config_for_instrument(_normalize_symbol(instrument))
-    if win_cfg is None:
-        return None
-    windows_tz, prof_data_tz, windows = win_cfg
     try:
-        ts_in_data = ts_local.astimezone(ZoneInfo(prof_data_tz))
-        ts_in_windows = ts_in_data.astimezone(ZoneInfo(windows_tz))
-        t = ts_in_windows.timetz().replace(tzinfo=None)
-
-        # BREAK wins over TRADING if overlaps exist.
-        for w in windows:
-            if w["state"] != "BREAK":
-                continue
-            if _time_in_range(t, _parse_hms(w["start"]), _parse_hms(w["end"])):
-                return False
-        for w in windows:
-            if w["state"] != "TRADING":
-                continue
-            if _time_in_range(t, _parse_hms(w["start"]), _parse_hms(w["end"])):
-                return True
-        # Outside any trading/break window => not tradable at this time.
-        return False
+        win = _profile_windows_us(_normalize_symbol(instrument))
+        if win is None:
+            return None
+        windows_tz, prof_data_tz, breaks, trading = win
+        in_data, in_data_fold = _wall_in(prof_data_tz, data_tz, local, fold)
+        win_local, _ = _wall_in(windows_tz, prof_data_tz, in_data, in_data_fold)
+        tod = win_local - win_local // _US_PER_DAY * _US_PER_DAY
+
+        # BREAK wins over TRADING if overlaps exist; outside any window => not tradable.
+        tradable = np.zeros(len(local), dtype=bool)
+        for start, end in trading:
+            tradable |= _time_in_range_us(tod, start, end)
+        for start, end in breaks:
+            tradable &= ~_time_in_range_us(tod, start, end)
+        return tradable
     except Exception:
         return None
+
+
+def trading_mask_for_instrument(ts_arr: Any, instrument: str, *, data_tz: str = "Asia/Taipei"):
+    """
+    Array version of is_trading_time_for_instrument for naive data_tz timestamps.
+
+    Returns a bool array (True = tradable), or None when the instrument has no exchange
+    rule (callers fall back to their own session rules).
+    """
+    local = _to_us(ts_arr)
+    return _trading_mask_local(local, np.zeros(len(local), dtype=bool), data_tz, instrument)
+
+
+def is_trading_time_for_instrument(ts: datetime, instrument: str, *, data_tz: str = "Asia/Taipei") -> bool | None:
+    """
+    Determine if a timestamp is within trading time (not a daily maintenance break).
+
+    Mainline rule for CME/CFE-style futures:
+      - daily break is [roll_time - 1h, roll_time) in exchange local time
+      - trading otherwise
+    """
+    if _instrument_exchange_config(_normalize_symbol(instrument)) is None:
+        return None
+    mask = _trading_mask_local(*_datetime_to_local_us(ts, data_tz), data_tz, instrument)
+    return None if mask is None else bool(mask[0])
@@ -1,64 +1,213 @@
 """
 Numba-accelerated technical indicators.
+
+Rolling-window tolerance: sma / rolling_stdev / bbands_pb / bbands_width use O(n) running
+window sums instead of re-summing every window. Against a direct left-to-right window sum
+they agree to within rounding of the window magnitude -- for a window of length w,
+|Δ sum(x)| <= 4·w²·eps·max|x| and |Δ sum(x²)| <= 4·w²·eps·max(x²) with eps = 2**-52 --
+and exactly whenever the running sums are exact (e.g. integer or tick-multiple prices), on
+every w-th bar (re-seed), and for non-finite windows (NaN/inf handling is unchanged). Pass
+compensated=True for Neumaier-compensated sums on long series where drift matters.
 """
 import numpy as np
 from numba import njit
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def rolling_max(arr: np.ndarray, window: int) -> np.ndarray:
+    # O(n) monotonic deque of indices (values non-increasing front to back).
+    # Matches the windowed scan exactly: NaN when the window's first value is NaN, other NaNs
+    # are skipped, and ties resolve to the earliest index (so -0.0 / 0.0 keep scan order).
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
     if window <= 0:
         return out
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
     for i in range(n):
+        v = arr[i]
+        if not np.isnan(v):
+            while tail > head and arr[dq[tail - 1]] < v:
+                tail -= 1
+            dq[tail] = i
+            tail += 1
         if i < window - 1:
             continue
         start = i - window + 1
-        m = arr[start]
-        for j in range(start + 1, i + 1):
-            v = arr[j]
-            if v > m:
-                m = v
-        out[i] = m
+        while tail > head and dq[head] < start:
+            head += 1
+        if np.isnan(arr[start]):
+            continue
+        out[i] = arr[dq[head]]
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def rolling_min(arr: np.ndarray, window: int) -> np.ndarray:
+    # Mirror of rolling_max (values non-decreasing front to back).
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
     if window <= 0:
         return out
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
     for i in range(n):
+        v = arr[i]
+        if not np.isnan(v):
+            while tail > head and arr[dq[tail - 1]] > v:
+                tail -= 1
+            dq[tail] = i
+            tail += 1
         if i < window - 1:
             continue
         start = i - window + 1
-        m = arr[start]
-        for j in range(start + 1, i + 1):
-            v = arr[j]
-            if v < m:
-                m = v
-        out[i] = m
+        while tail > head and dq[head] < start:
+            head += 1
+        if np.isnan(arr[start]):
+            continue
+        out[i] = arr[dq[head]]
     return out
 
-@njit(cache=True)
-def sma(arr: np.ndarray, window: int) -> np.ndarray:
+@njit(cache=True, nogil=True)
+def _neumaier_add(s: float, c: float, x: float):
+    # Compensated (Neumaier) accumulation: returns the new running sum and its correction term.
+    t = s + x
+    if abs(s) >= abs(x):
+        c += (s - t) + x
+    else:
+        c += (x - t) + s
+    return t, c
+
+@njit(cache=True, nogil=True)
+def _window_sums(arr: np.ndarray, window: int, compensated: bool):
+    # Running sums of x and x*x over the finite values of each full window, O(n) overall.
+    # `status` records what the direct window sum would have hit: 0 all finite, 1 NaN
+    # (a NaN, or both +inf and -inf), 2 +inf, 3 -inf; sums are only meaningful for status 0.
+    #
+    # Default mode updates plain running sums and re-seeds them with a direct left-to-right
+    # window sum every `window` bars, so drift never spans more than one window and every
+    # re-seeded bar reproduces the legacy sum exactly. compensated=True keeps Neumaier-
+    # compensated running sums instead (no re-seed), which stays close to the exact sum
+    # on arbitrarily long series.
     n = arr.shape[0]
-    out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 0:
-        return out
+    sum_x = np.zeros(n, dtype=np.float64)
+    sum_x2 = np.zeros(n, dtype=np.float64)
+    status = np.zeros(n, dtype=np.int8)
+    if window <= 0 or n < window:
+        return sum_x, sum_x2, status
+    n_nan = 0
+    n_pinf = 0
+    n_ninf = 0
+    s1 = 0.0
+    s2 = 0.0
+    c1 = 0.0
+    c2 = 0.0
     for i in range(n):
+        v = arr[i]
+        u = 0.0
+        if np.isnan(v):
+            n_nan += 1
+        elif v == np.inf:
+            n_pinf += 1
+        elif v == -np.inf:
+            n_ninf += 1
+        if i >= window:
+            u = arr[i - window]
+            if np.isnan(u):
+                n_nan -= 1
+            elif u == np.inf:
+                n_pinf -= 1
+            elif u == -np.inf:
+                n_ninf -= 1
         if i < window - 1:
-            # For compatibility with legacy behavior, some implementations return mean of prefix
-            # but standard SMA requires the full window. 
-            # We'll stick to full window NaN for consistency with other indicators.
             continue
-        slice_sum = 0.0
-        for j in range(i - window + 1, i + 1):
-            slice_sum += arr[j]
-        out[i] = slice_sum / window
+        start = i - window + 1
+        if compensated:
+            if i == window - 1:
+                for j in range(start, i + 1):
+                    x = arr[j]
+                    if np.isfinite(x):
+                        s1, c1 = _neumaier_add(s1, c1, x)
+                        s2, c2 = _neumaier_add(s2, c2, x * x)
+            else:
+                if np.isfinite(v):
+                    s1, c1 = _neumaier_add(s1, c1, v)
+                    s2, c2 = _neumaier_add(s2, c2, v * v)
+                if np.isfinite(u):
+                    s1, c1 = _neumaier_add(s1, c1, -u)
+                    s2, c2 = _neumaier_add(s2, c2, -(u * u))
+            sum_x[i] = s1 + c1
+            sum_x2[i] = s2 + c2
+        else:
+            if (i - window + 1) % window == 0:
+                s1 = 0.0
+                s2 = 0.0
+                for j in range(start, i + 1):
+                    x = arr[j]
+                    if np.isfinite(x):
+                        s1 += x
+                        s2 += x * x
+            else:
+                if np.isfinite(v):
+                    s1 += v
+                    s2 += v * v
+                if np.isfinite(u):
+                    s1 -= u
+                    s2 -= u * u
+            sum_x[i] = s1
+            sum_x2[i] = s2
+        if n_nan > 0 or (n_pinf > 0 and n_ninf > 0):
+            status[i] = 1
+        elif n_pinf > 0:
+            status[i] = 2
+        elif n_ninf > 0:
+            status[i] = 3
+    return sum_x, sum_x2, status
+
+@njit(cache=True, nogil=True)
+def _sma_from_sums(sum_x: np.ndarray, status: np.ndarray, window: int) -> np.ndarray:
+    n = sum_x.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    for i in range(window - 1, n):
+        st = status[i]
+        if st == 0:
+            out[i] = sum_x[i] / window
+        elif st == 2:
+            out[i] = np.inf
+        elif st == 3:
+            out[i] = -np.inf
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
+def _stdev_from_sums(sum_x: np.ndarray, sum_x2: np.ndarray, status: np.ndarray, window: int) -> np.ndarray:
+    # Same arithmetic as the legacy direct-sum kernel; any non-finite value in the window -> NaN.
+    n = sum_x.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    for i in range(window - 1, n):
+        if status[i] != 0:
+            continue
+        mean = sum_x[i] / window
+        var = (sum_x2[i] / window) - (mean * mean)
+        # Bessel's correction for sample stdev (ddof=1)
+        # Var_sample = Var_pop * (N / (N-1))
+        var_sample = var * (window / (window - 1))
+        if var_sample < 0:
+            var_sample = 0.0
+        out[i] = np.sqrt(var_sample)
+    return out
+
+@njit(cache=True, nogil=True)
+def sma(arr: np.ndarray, window: int, compensated: bool = False) -> np.ndarray:
+    # Full-window SMA (the first window-1 bars are NaN), computed from running sums.
+    # See _window_sums for the default vs compensated accumulation.
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0 or n < window:
+        return out
+    sum_x, _, status = _window_sums(arr, window, compensated)
+    return _sma_from_sums(sum_x, status, window)
+
+@njit(cache=True, nogil=True)
 def ema(arr: np.ndarray, window: int) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -80,21 +229,20 @@ def ema(arr: np.ndarray, window: int) -> np.ndarray:
         out[i] = (arr[i] * alpha) + (out[i - 1] * (1.0 - alpha))
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def hh(arr: np.ndarray, window: int) -> np.ndarray:
     return rolling_max(arr, window)
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def ll(arr: np.ndarray, window: int) -> np.ndarray:
     return rolling_min(arr, window)
 
-@njit(cache=True)
-def atr_wilder(high, low, close, window):
+@njit(cache=True, nogil=True)
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
     n = len(high)
-    out = np.full(n, np.nan, dtype=np.float64)
-    if window > n or window <= 0:
-        return out
     tr = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return tr
     tr[0] = high[0] - low[0]
     for i in range(1, n):
         tr[i] = max(
@@ -102,6 +250,16 @@ def atr_wilder(high, low, close, window):
             abs(high[i] - close[i - 1]),
             abs(low[i] - close[i - 1]),
         )
+    return tr
+
+@njit(cache=True, nogil=True)
+def atr_wilder_from_tr(tr: np.ndarray, window: int) -> np.ndarray:
+    # Wilder ATR over a precomputed true range (see true_range), so several windows or
+    # consumers can share one TR pass.
+    n = len(tr)
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window > n or window <= 0:
+        return out
     
     # Initial ATR is SMA of TR
     tr_sum = 0.0
@@ -114,41 +272,31 @@ def atr_wilder(high, low, close, window):
         out[i] = (out[i - 1] * (window - 1) + tr[i]) / window
     return out
 
-@njit(cache=True)
-def rolling_stdev(arr: np.ndarray, window: int) -> np.ndarray:
+@njit(cache=True, nogil=True)
+def atr_wilder(high, low, close, window):
+    n = len(high)
+    if window > n or window <= 0:
+        return np.full(n, np.nan, dtype=np.float64)
+    return atr_wilder_from_tr(true_range(high, low, close), window)
+
+@njit(cache=True, nogil=True)
+def rolling_stdev(arr: np.ndarray, window: int, compensated: bool = False) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1:
+    if window <= 1 or n < window:
         return out
-    for i in range(n):
-        if i < window - 1:
-            continue
-        
-        sum_x = 0.0
-        sum_x2 = 0.0
-        for j in range(i - window + 1, i + 1):
-            val = arr[j]
-            sum_x += val
-            sum_x2 += val * val
-        
-        mean = sum_x / window
-        var = (sum_x2 / window) - (mean * mean)
-        # Bessel's correction for sample stdev (ddof=1)
-        # Var_sample = Var_pop * (N / (N-1))
-        var_sample = var * (window / (window - 1))
-        if var_sample < 0:
-            var_sample = 0.0
-        out[i] = np.sqrt(var_sample)
-    return out
+    sum_x, sum_x2, status = _window_sums(arr, window, compensated)
+    return _stdev_from_sums(sum_x, sum_x2, status, window)
 
-@njit(cache=True)
-def bbands_pb(arr: np.ndarray, window: int) -> np.ndarray:
+@njit(cache=True, nogil=True)
+def bbands_pb(arr: np.ndarray, window: int, compensated: bool = False) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1:
+    if window <= 1 or n < window:
         return out
-    sma_vals = sma(arr, window)
-    stdev_vals = rolling_stdev(arr, window)
+    sum_x, sum_x2, status = _window_sums(arr, window, compensated)
+    sma_vals = _sma_from_sums(sum_x, status, window)
+    stdev_vals = _stdev_from_sums(sum_x, sum_x2, status, window)
     for i in range(n):
         if i < window - 1:
             continue
@@ -161,14 +309,15 @@ def bbands_pb(arr: np.ndarray, window: int) -> np.ndarray:
             out[i] = (arr[i] - lower) / denom
     return out
 
-@njit(cache=True)
-def bbands_width(arr: np.ndarray, window: int) -> np.ndarray:
+@njit(cache=True, nogil=True)
+def bbands_width(arr: np.ndarray, window: int, compensated: bool = False) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 1:
+    if window <= 1 or n < window:
         return out
-    sma_vals = sma(arr, window)
-    stdev_vals = rolling_stdev(arr, window)
+    sum_x, sum_x2, status = _window_sums(arr, window, compensated)
+    sma_vals = _sma_from_sums(sum_x, status, window)
+    stdev_vals = _stdev_from_sums(sum_x, sum_x2, status, window)
     for i in range(n):
         if i < window - 1:
             continue
@@ -181,7 +330,7 @@ def bbands_width(arr: np.ndarray, window: int) -> np.ndarray:
             out[i] = (upper - lower) / denom
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def atr_channel_upper(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
     n = close.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -195,7 +344,7 @@ def atr_channel_upper(high: np.ndarray, low: np.ndarray, close: np.ndarray, wind
         out[i] = sma_vals[i] + atr_vals[i]
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def atr_channel_lower(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
     n = close.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -209,7 +358,7 @@ def atr_channel_lower(high: np.ndarray, low: np.ndarray, close: np.ndarray, wind
         out[i] = sma_vals[i] - atr_vals[i]
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def atr_channel_pos(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
     n = close.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -229,7 +378,7 @@ def atr_channel_pos(high: np.ndarray, low: np.ndarray, close: np.ndarray, window
             out[i] = (close[i] - lower) / denom
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def donchian_width(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
     n = close.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -247,7 +396,7 @@ def donchian_width(high: np.ndarray, low: np.ndarray, close: np.ndarray, window:
             out[i] = (hh_vals[i] - ll_vals[i]) / denom
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def dist_to_hh(high: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
     n = close.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -264,7 +413,7 @@ def dist_to_hh(high: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
             out[i] = (close[i] / denom) - 1.0
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def dist_to_ll(low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
     n = close.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -281,12 +430,35 @@ def dist_to_ll(low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
             out[i] = (close[i] / denom) - 1.0
     return out
 
-@njit(cache=True)
-def percentile_rank(arr: np.ndarray, window: int) -> np.ndarray:
+@njit(cache=True, nogil=True)
+def _fenwick_add(tree: np.ndarray, pos: int, delta: int) -> None:
+    size = tree.shape[0]
+    while pos < size:
+        tree[pos] += delta
+        pos += pos & (-pos)
+
+@njit(cache=True, nogil=True)
+def _fenwick_prefix(tree: np.ndarray, pos: int) -> int:
+    total = 0
+    while pos > 0:
+        total += tree[pos]
+        pos -= pos & (-pos)
+    return total
+
+# Up to this window the direct scan (O(n*w), but a SIMD compare-and-count per bar) beats the
+# Fenwick kernel (O(n log n): a global sort plus O(log n) tree walks per bar); both give
+# identical results. Measured crossover (scan / Fenwick, ms, tick-rounded random walk):
+#   n=50k:  w=126 4.4/7.4,    w=252 7.6/6.7,     w=300 8.5/6.9,     w=400 13.0/6.6
+#   n=200k: w=126 16.8/32.1,  w=252 31.6/36.0,   w=300 36.4/33.8,   w=400 45.2/31.6
+#   n=1M:   w=126 85.7/186.5, w=252 168.9/208.1, w=300 188.1/203.4, w=400 251.0/190.5
+# so the configured percentile_126 / percentile_252 stay on the scan. A sorted window buffer
+# (O(log w) search, O(w) shifts) was slower than both at every window.
+PERCENTILE_RANK_SCAN_MAX_WINDOW = 300
+
+@njit(cache=True, nogil=True)
+def _percentile_rank_scan(arr: np.ndarray, window: int) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
-    if window <= 0:
-        return out
     for i in range(n):
         start = i - window + 1
         if start < 0:
@@ -302,7 +474,56 @@ def percentile_rank(arr: np.ndarray, window: int) -> np.ndarray:
         out[i] = cnt / float(denom)
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
+def _percentile_rank_fenwick(arr: np.ndarray, window: int) -> np.ndarray:
+    # Values are mapped once to dense ranks over the whole series (equal values, incl. -0.0 /
+    # 0.0, share one; NaN gets rank 0 and is never counted) and a Fenwick tree over those ranks
+    # holds the window: O(n log n) for the sort, then O(log n) per bar instead of a window scan.
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    order = np.argsort(arr, kind="mergesort")
+    rank = np.zeros(n, dtype=np.int64)
+    r = 0
+    prev = 0.0
+    for k in range(n):
+        idx = order[k]
+        v = arr[idx]
+        if np.isnan(v):
+            continue
+        if r == 0 or v > prev:
+            r += 1
+            prev = v
+        rank[idx] = r
+    tree = np.zeros(r + 1, dtype=np.int64)
+    for i in range(n):
+        ri = rank[i]
+        if ri > 0:
+            _fenwick_add(tree, ri, 1)
+        start = i - window + 1
+        if start < 0:
+            start = 0
+        elif start > 0 and rank[start - 1] > 0:
+            _fenwick_add(tree, rank[start - 1], -1)
+        cnt = 0
+        if ri > 0:
+            cnt = _fenwick_prefix(tree, ri)
+        denom = i - start + 1
+        out[i] = cnt / float(denom)
+    return out
+
+@njit(cache=True, nogil=True)
+def percentile_rank(arr: np.ndarray, window: int) -> np.ndarray:
+    # Share of the trailing window (the available prefix for early bars) with values <= the
+    # current one; NaNs count in the denominator but never as <=, and a NaN current value
+    # ranks 0.
+    n = arr.shape[0]
+    if window <= 0:
+        return np.full(n, np.nan, dtype=np.float64)
+    if window <= PERCENTILE_RANK_SCAN_MAX_WINDOW:
+        return _percentile_rank_scan(arr, window)
+    return _percentile_rank_fenwick(arr, window)
+
+@njit(cache=True, nogil=True)
 def rsi_wilder(arr: np.ndarray, window: int) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -348,7 +569,7 @@ def rsi_wilder(arr: np.ndarray, window: int) -> np.ndarray:
             out[i] = 100.0 - (100.0 / (1.0 + rs))
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def adx_wilder(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     n = close.shape[0]
     adx = np.full(n, np.nan, dtype=np.float64)
@@ -426,7 +647,7 @@ def adx_wilder(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int
             
     return adx, di_plus, di_minus
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def macd_hist(arr: np.ndarray, fast: int, slow: int, signal: int) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -459,7 +680,7 @@ def macd_hist(arr: np.ndarray, fast: int, slow: int, signal: int) -> np.ndarray:
             out[i] = macd_line[i] - signal_line[i]
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def roc(arr: np.ndarray, window: int) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -472,7 +693,7 @@ def roc(arr: np.ndarray, window: int) -> np.ndarray:
             out[i] = (curr / prev) - 1.0
     return out
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def rolling_z_strict(arr: np.ndarray, window: int) -> np.ndarray:
     n = arr.shape[0]
     out = np.full(n, np.nan, dtype=np.float64)
@@ -500,3 +721,192 @@ def rolling_z_strict(arr: np.ndarray, window: int) -> np.ndarray:
         std = np.sqrt(var)
         out[i] = (arr[i] - mean) / std
     return out
+
+# --- Multi-window batched kernels -------------------------------------------------------
+# Each takes one input series plus a vector of windows and returns a (len(windows), n)
+# array in a single pass over the input; row k is bit-identical to the single-window
+# kernel called with windows[k]. Shared work (true range, prefix sums / non-finite counts,
+# the extrema deque) is done once for all windows.
+
+@njit(cache=True, nogil=True)
+def sma_multi(arr: np.ndarray, windows: np.ndarray, compensated: bool = False) -> np.ndarray:
+    # Per-window running sums follow _window_sums exactly; the NaN/+inf/-inf window counts
+    # come from prefix counts shared by every window.
+    n = arr.shape[0]
+    n_win = windows.shape[0]
+    out = np.full((n_win, n), np.nan, dtype=np.float64)
+    c_nan = np.zeros(n + 1, dtype=np.int64)
+    c_pinf = np.zeros(n + 1, dtype=np.int64)
+    c_ninf = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        v = arr[i]
+        c_nan[i + 1] = c_nan[i] + (1 if np.isnan(v) else 0)
+        c_pinf[i + 1] = c_pinf[i] + (1 if v == np.inf else 0)
+        c_ninf[i + 1] = c_ninf[i] + (1 if v == -np.inf else 0)
+    s1 = np.zeros(n_win, dtype=np.float64)
+    c1 = np.zeros(n_win, dtype=np.float64)
+    for i in range(n):
+        v = arr[i]
+        for k in range(n_win):
+            window = windows[k]
+            if window <= 0 or i < window - 1:
+                continue
+            start = i - window + 1
+            u = 0.0
+            if i >= window:
+                u = arr[i - window]
+            if compensated:
+                s = s1[k]
+                c = c1[k]
+                if i == window - 1:
+                    for j in range(start, i + 1):
+                        x = arr[j]
+                        if np.isfinite(x):
+                            s, c = _neumaier_add(s, c, x)
+                else:
+                    if np.isfinite(v):
+                        s, c = _neumaier_add(s, c, v)
+                    if np.isfinite(u):
+                        s, c = _neumaier_add(s, c, -u)
+                s1[k] = s
+                c1[k] = c
+                total = s + c
+            else:
+                if (i - window + 1) % window == 0:
+                    s = 0.0
+                    for j in range(start, i + 1):
+                        x = arr[j]
+                        if np.isfinite(x):
+                            s += x
+                    s1[k] = s
+                else:
+                    if np.isfinite(v):
+                        s1[k] += v
+                    if np.isfinite(u):
+                        s1[k] -= u
+                total = s1[k]
+            n_nan = c_nan[i + 1] - c_nan[start]
+            n_pinf = c_pinf[i + 1] - c_pinf[start]
+            n_ninf = c_ninf[i + 1] - c_ninf[start]
+            if n_nan > 0 or (n_pinf > 0 and n_ninf > 0):
+                continue
+            if n_pinf > 0:
+                out[k, i] = np.inf
+            elif n_ninf > 0:
+                out[k, i] = -np.inf
+            else:
+                out[k, i] = total / window
+    return out
+
+@njit(cache=True, nogil=True)
+def ema_multi(arr: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    # One running prefix sum provides every window's SMA seed (same left-to-right order).
+    n = arr.shape[0]
+    n_win = windows.shape[0]
+    out = np.full((n_win, n), np.nan, dtype=np.float64)
+    prefix = 0.0
+    for i in range(n):
+        v = arr[i]
+        prefix += v
+        for k in range(n_win):
+            window = windows[k]
+            if window <= 0:
+                continue
+            if window == 1:
+                out[k, i] = v
+            elif i == window - 1:
+                out[k, i] = prefix / window
+            elif i >= window:
+                alpha = 2.0 / (window + 1.0)
+                out[k, i] = (v * alpha) + (out[k, i - 1] * (1.0 - alpha))
+    return out
+
+@njit(cache=True, nogil=True)
+def atr_wilder_multi_from_tr(tr: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    # The running prefix sum of TR provides every window's SMA seed.
+    n = len(tr)
+    n_win = windows.shape[0]
+    out = np.full((n_win, n), np.nan, dtype=np.float64)
+    tr_sum = 0.0
+    for i in range(n):
+        tr_sum += tr[i]
+        for k in range(n_win):
+            window = windows[k]
+            if window <= 0 or window > n:
+                continue
+            if i == window - 1:
+                out[k, i] = tr_sum / window
+            elif i >= window:
+                out[k, i] = (out[k, i - 1] * (window - 1) + tr[i]) / window
+    return out
+
+@njit(cache=True, nogil=True)
+def atr_wilder_multi(high: np.ndarray, low: np.ndarray, close: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    # True range is computed once for all windows.
+    return atr_wilder_multi_from_tr(true_range(high, low, close), windows)
+
+@njit(cache=True, nogil=True)
+def _rolling_extrema_multi(arr: np.ndarray, windows: np.ndarray, is_max: bool) -> np.ndarray:
+    # A single monotonic deque sized for the largest window serves all windows: the extreme
+    # of a shorter window [start, i] is the first deque entry with index >= start (entries
+    # before it are either outside the window or would have dominated it), found by binary
+    # search. Ties and NaN handling match rolling_max / rolling_min.
+    n = arr.shape[0]
+    n_win = windows.shape[0]
+    out = np.full((n_win, n), np.nan, dtype=np.float64)
+    max_window = 0
+    for k in range(n_win):
+        if windows[k] > max_window:
+            max_window = windows[k]
+    if max_window <= 0:
+        return out
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(n):
+        v = arr[i]
+        if not np.isnan(v):
+            if is_max:
+                while tail > head and arr[dq[tail - 1]] < v:
+                    tail -= 1
+            else:
+                while tail > head and arr[dq[tail - 1]] > v:
+                    tail -= 1
+            dq[tail] = i
+            tail += 1
+        oldest = i - max_window + 1
+        while tail > head and dq[head] < oldest:
+            head += 1
+        for k in range(n_win):
+            window = windows[k]
+            if window <= 0 or i < window - 1:
+                continue
+            start = i - window + 1
+            if np.isnan(arr[start]):
+                continue
+            lo = head
+            hi = tail
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if dq[mid] < start:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            out[k, i] = arr[dq[lo]]
+    return out
+
+@njit(cache=True, nogil=True)
+def rolling_max_multi(arr: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    return _rolling_extrema_multi(arr, windows, True)
+
+@njit(cache=True, nogil=True)
+def rolling_min_multi(arr: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    return _rolling_extrema_multi(arr, windows, False)
+
+@njit(cache=True, nogil=True)
+def hh_multi(arr: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    return rolling_max_multi(arr, windows)
+
+@njit(cache=True, nogil=True)
+def ll_multi(arr: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    return rolling_min_multi(arr, windows)
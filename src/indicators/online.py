@@ -0,0 +1,397 @@
+"""
+Resumable (online) state for the recursive indicator kernels.
+
+EMA, Wilder ATR / RSI / ADX and MACD values depend on every earlier bar, so new bars can
+only be computed exactly by carrying the recursion forward from where the previous run
+stopped. Each state object holds the variables the matching numba_indicators kernel keeps
+between bars; update() consumes the next bars, returns the values the full kernel produces
+for them (same operations in the same order, so bit-identical) and advances the state in
+place. Any split of a series into update() calls gives the same values as one call.
+
+Kernels that gate their whole output on the series length (adx_wilder: n < 2 * window,
+macd_hist: n < slow + signal) are not gated here; min_bars() is the length a processed
+prefix needs before its values stop depending on later bars.
+
+CumsumWindowState continues the np.cumsum based window sums of core.features.compute
+(compute_rolling_z / compute_atr_14) the same way.
+
+States round-trip through flat arrays (to_arrays / from_arrays) for storage in an NPZ.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def _ema_step(v, i, window, acc, value):
+    # One bar of numba_indicators.ema at index i; returns (output, acc, value).
+    if window <= 0:
+        return np.nan, acc, value
+    if window == 1:
+        return v, acc, value
+    if i < window:
+        acc += v
+        if i == window - 1:
+            value = acc / window
+            return value, acc, value
+        return np.nan, acc, value
+    alpha = 2.0 / (window + 1.0)
+    value = (v * alpha) + (value * (1.0 - alpha))
+    return value, acc, value
+
+
+@njit(cache=True, nogil=True)
+def _ema_resume(arr, window, count, acc, value):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    for j in range(n):
+        out[j], acc, value = _ema_step(arr[j], count + j, window, acc, value)
+    return out, acc, value
+
+
+@njit(cache=True, nogil=True)
+def _atr_resume(high, low, close, window, count, prev_close, acc, value):
+    # true_range + atr_wilder_from_tr, one bar at a time.
+    n = high.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    for j in range(n):
+        i = count + j
+        if i == 0:
+            tr = high[j] - low[j]
+        else:
+            tr = max(
+                high[j] - low[j],
+                abs(high[j] - prev_close),
+                abs(low[j] - prev_close),
+            )
+        prev_close = close[j]
+        if i < window:
+            acc += tr
+            if i == window - 1:
+                value = acc / window
+                out[j] = value
+        else:
+            value = (value * (window - 1) + tr) / window
+            out[j] = value
+    return out, prev_close, acc, value
+
+
+@njit(cache=True, nogil=True)
+def _rsi_value(avg_gain, avg_loss):
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    rs = avg_gain / avg_loss
+    return 100.0 - (100.0 / (1.0 + rs))
+
+
+@njit(cache=True, nogil=True)
+def _rsi_resume(arr, window, count, prev, avg_gain, avg_loss):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    for j in range(n):
+        i = count + j
+        v = arr[j]
+        if i == 0:
+            prev = v
+            continue
+        diff = v - prev
+        prev = v
+        gain = 0.0
+        loss = 0.0
+        if diff > 0:
+            gain = diff
+        else:
+            loss = -diff
+        if i <= window:
+            # SMA seed over bars 1..window
+            avg_gain += gain
+            avg_loss += loss
+            if i == window:
+                avg_gain /= window
+                avg_loss /= window
+                out[j] = _rsi_value(avg_gain, avg_loss)
+        else:
+            avg_gain = (avg_gain * (window - 1) + gain) / window
+            avg_loss = (avg_loss * (window - 1) + loss) / window
+            out[j] = _rsi_value(avg_gain, avg_loss)
+    return out, prev, avg_gain, avg_loss
+
+
+@njit(cache=True, nogil=True)
+def _adx_resume(high, low, close, window, count, prev, smooth, dx_sum, adx_value):
+    # prev = [high, low, close] of the previous bar; smooth = [+DM, -DM, TR] running sums.
+    n = high.shape[0]
+    adx = np.full(n, np.nan, dtype=np.float64)
+    di_plus = np.full(n, np.nan, dtype=np.float64)
+    di_minus = np.full(n, np.nan, dtype=np.float64)
+    for j in range(n):
+        i = count + j
+        plus_dm = 0.0
+        minus_dm = 0.0
+        tr = 0.0
+        if i > 0:
+            up_move = high[j] - prev[0]
+            down_move = prev[1] - low[j]
+            if up_move > down_move and up_move > 0:
+                plus_dm = up_move
+            if down_move > up_move and down_move > 0:
+                minus_dm = down_move
+            tr = max(high[j] - low[j], abs(high[j] - prev[2]), abs(low[j] - prev[2]))
+        prev[0] = high[j]
+        prev[1] = low[j]
+        prev[2] = close[j]
+        if i == 0:
+            continue
+        if i <= window:
+            smooth[0] += plus_dm
+            smooth[1] += minus_dm
+            smooth[2] += tr
+            if i < window:
+                continue
+        else:
+            smooth[0] = (smooth[0] * (window - 1) + plus_dm) / window
+            smooth[1] = (smooth[1] * (window - 1) + minus_dm) / window
+            smooth[2] = (smooth[2] * (window - 1) + tr) / window
+        if smooth[2] > 0:
+            di_plus[j] = 100.0 * smooth[0] / smooth[2]
+            di_minus[j] = 100.0 * smooth[1] / smooth[2]
+        else:
+            di_plus[j] = 0.0
+            di_minus[j] = 0.0
+        diff = abs(di_plus[j] - di_minus[j])
+        summ = di_plus[j] + di_minus[j]
+        dx = 100.0 * diff / summ if summ != 0 else 0.0
+        if i < window * 2 - 1:
+            dx_sum += dx
+        elif i == window * 2 - 1:
+            # First ADX is SMA of DX
+            dx_sum += dx
+            adx_value = dx_sum / window
+            adx[j] = adx_value
+        else:
+            adx_value = (adx_value * (window - 1) + dx) / window
+            adx[j] = adx_value
+    return adx, di_plus, di_minus, dx_sum, adx_value
+
+
+@njit(cache=True, nogil=True)
+def _macd_resume(arr, fast, slow, signal, count, acc, value):
+    # acc / value = [fast EMA, slow EMA, signal line] seed sums and last values.
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    start_idx = slow - 1
+    alpha = 2.0 / (signal + 1.0)
+    for j in range(n):
+        i = count + j
+        v = arr[j]
+        ema_fast, acc[0], value[0] = _ema_step(v, i, fast, acc[0], value[0])
+        ema_slow, acc[1], value[1] = _ema_step(v, i, slow, acc[1], value[1])
+        macd_line = ema_fast - ema_slow
+        if i < start_idx:
+            continue
+        if i < start_idx + signal:
+            # Seed Signal SMA
+            acc[2] += macd_line
+            if i < start_idx + signal - 1:
+                continue
+            value[2] = acc[2] / signal
+        else:
+            value[2] = (macd_line * alpha) + (value[2] * (1.0 - alpha))
+        if not np.isnan(macd_line) and not np.isnan(value[2]):
+            out[j] = macd_line - value[2]
+    return out
+
+
+@dataclass
+class OnlineState:
+    """Base class: scalar fields round-trip as 0-d arrays, array fields as-is."""
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {f.name: np.array(getattr(self, f.name)) for f in fields(self)}
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, np.ndarray]):
+        """Raises KeyError if a field is missing."""
+        kwargs = {}
+        for f in fields(cls):
+            value = np.asarray(arrays[f.name])
+            kwargs[f.name] = value.copy() if value.ndim else value.item()
+        return cls(**kwargs)
+
+    def min_bars(self) -> int:
+        """Processed bars needed before already-returned values are final (length-gated kernels)."""
+        return 0
+
+
+@dataclass
+class EmaState(OnlineState):
+    """numba_indicators.ema (and each ema_multi row)."""
+    window: int
+    count: int = 0
+    acc: float = 0.0
+    value: float = np.nan
+
+    def update(self, arr: np.ndarray) -> np.ndarray:
+        out, self.acc, self.value = _ema_resume(arr, self.window, self.count, self.acc, self.value)
+        self.count += len(arr)
+        return out
+
+
+@dataclass
+class AtrState(OnlineState):
+    """true_range + atr_wilder_from_tr, i.e. atr_wilder (and each atr_wilder_multi row)."""
+    window: int
+    count: int = 0
+    prev_close: float = np.nan
+    acc: float = 0.0
+    value: float = np.nan
+
+    def update(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        if self.window <= 0:
+            out = np.full(len(close), np.nan, dtype=np.float64)
+        else:
+            out, self.prev_close, self.acc, self.value = _atr_resume(
+                high, low, close, self.window, self.count, self.prev_close, self.acc, self.value
+            )
+        self.count += len(close)
+        return out
+
+
+@dataclass
+class RsiState(OnlineState):
+    """numba_indicators.rsi_wilder."""
+    window: int
+    count: int = 0
+    prev: float = np.nan
+    avg_gain: float = 0.0
+    avg_loss: float = 0.0
+
+    def update(self, arr: np.ndarray) -> np.ndarray:
+        if self.window <= 0:
+            out = np.full(len(arr), np.nan, dtype=np.float64)
+        else:
+            out, self.prev, self.avg_gain, self.avg_loss = _rsi_resume(
+                arr, self.window, self.count, self.prev, self.avg_gain, self.avg_loss
+            )
+        self.count += len(arr)
+        return out
+
+
+@dataclass
+class AdxState(OnlineState):
+    """numba_indicators.adx_wilder; update() returns (adx, di_plus, di_minus)."""
+    window: int
+    count: int = 0
+    prev: np.ndarray = field(default_factory=lambda: np.full(3, np.nan, dtype=np.float64))
+    smooth: np.ndarray = field(default_factory=lambda: np.zeros(3, dtype=np.float64))
+    dx_sum: float = 0.0
+    adx: float = np.nan
+
+    def min_bars(self) -> int:
+        return 2 * self.window
+
+    def update(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        n = len(close)
+        if self.window <= 1:
+            nan = np.full(n, np.nan, dtype=np.float64)
+            self.count += n
+            return nan, nan.copy(), nan.copy()
+        adx, di_plus, di_minus, self.dx_sum, self.adx = _adx_resume(
+            high, low, close, self.window, self.count, self.prev, self.smooth, self.dx_sum, self.adx
+        )
+        self.count += n
+        return adx, di_plus, di_minus
+
+
+@dataclass
+class MacdState(OnlineState):
+    """numba_indicators.macd_hist (fast / slow EMA plus the signal-line EMA)."""
+    fast: int
+    slow: int
+    signal: int
+    count: int = 0
+    acc: np.ndarray = field(default_factory=lambda: np.zeros(3, dtype=np.float64))
+    value: np.ndarray = field(default_factory=lambda: np.full(3, np.nan, dtype=np.float64))
+
+    def min_bars(self) -> int:
+        return self.slow + self.signal
+
+    def update(self, arr: np.ndarray) -> np.ndarray:
+        if self.fast <= 0 or self.slow <= 0 or self.signal <= 0:
+            out = np.full(len(arr), np.nan, dtype=np.float64)
+        else:
+            out = _macd_resume(arr, self.fast, self.slow, self.signal, self.count, self.acc, self.value)
+        self.count += len(arr)
+        return out
+
+
+@dataclass
+class CumsumWindowState(OnlineState):
+    """
+    Window sums taken as differences of one running np.cumsum (first full window:
+    csum[window-1], then csum[i] - csum[i-window]); np.cumsum adds left to right, so
+    continuing it from its last value reproduces the full-series sums exactly.
+
+    tail holds the cumulative sums of the last `window` bars; its dtype is the sum dtype.
+    """
+    window: int
+    count: int = 0
+    tail: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+
+    def update(self, arr: np.ndarray) -> np.ndarray:
+        """Sums of the windows ending at the new bars that complete one (the last len(result) bars)."""
+        m = len(arr)
+        csum = np.cumsum(arr, dtype=self.tail.dtype) if self.count == 0 else (
+            np.cumsum(np.concatenate([self.tail[-1:], arr]), dtype=self.tail.dtype)[1:]
+        )
+        hist = np.concatenate([self.tail, csum])
+        base = self.count - len(self.tail)  # bar index of hist[0]
+        lo = max(self.count, self.window - 1)
+        hi = self.count + m
+        sums = hist[lo - base:hi - base].copy() if hi > lo else hist[:0].copy()
+        first = max(lo, self.window)
+        if hi > first:
+            sums[first - lo:] = hist[first - base:hi - base] - hist[first - self.window - base:hi - self.window - base]
+        self.tail = hist[-self.window:] if self.window > 0 else hist[:0]
+        self.count = hi
+        return sums
+
+
+@dataclass
+class RollingZState(OnlineState):
+    """core.features.compute.compute_rolling_z (population std, cumsum window sums)."""
+    window: int
+    count: int = 0
+    tail_x: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+    tail_x2: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float64))
+
+    def update(self, x: np.ndarray) -> np.ndarray:
+        m = len(x)
+        z = np.full(m, np.nan, dtype=np.float64)
+        if self.window <= 1:
+            self.count += m
+            return z
+        sx_state = CumsumWindowState(self.window, self.count, self.tail_x)
+        sx2_state = CumsumWindowState(self.window, self.count, self.tail_x2)
+        sum_x = sx_state.update(x)
+        sum_x2 = sx2_state.update(x * x)
+        self.tail_x, self.tail_x2 = sx_state.tail, sx2_state.tail
+        self.count += m
+        k = len(sum_x)
+        if k == 0:
+            return z
+        xs = x[m - k:]
+        zs = np.full(k, np.nan, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = sum_x / self.window
+            var = (sum_x2 / self.window) - (mean * mean)
+            var[var < 0] = 0.0
+            std = np.sqrt(var)
+            ok = ~(std == 0)
+            zs[ok] = (xs[ok] - mean[ok]) / std[ok]
+        z[m - k:] = zs
+        return z
@@ -0,0 +1,218 @@
+"""
+Numba kernel warm-up.
+
+Compiles (or loads from the on-disk cache) every kernel in numba_indicators plus the
+backtest simulator kernels, for the argument types the feature / simulator code actually
+passes, so the first job in a fresh worker process does not pay JIT latency. Compiled
+code lands in NUMBA_CACHE_DIR (kernels are declared with cache=True).
+
+    python -m indicators.warmup [--dtypes float64,int64] [--no-simulator]
+
+Reports per-kernel time and whether it was compiled, loaded from the disk cache, or
+already in memory.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import numba_indicators as ni
+
+_N = 64
+_WINDOW = 5
+_WINDOWS = np.array([3, 5], dtype=np.int64)
+
+# kernel name -> argument layout; "x" / "h" / "l" / "c" / "tr" are arrays of the warm-up
+# dtype, "w" a Python int window, "W" an int64 windows array, ints are passed as-is.
+# Calls mirror core.features.compute (compensated is left at its default).
+KERNEL_ARGS: Dict[str, Tuple] = {
+    "rolling_max": ("x", "w"),
+    "rolling_min": ("x", "w"),
+    "sma": ("x", "w"),
+    "ema": ("x", "w"),
+    "hh": ("x", "w"),
+    "ll": ("x", "w"),
+    "rolling_stdev": ("x", "w"),
+    "bbands_pb": ("x", "w"),
+    "bbands_width": ("x", "w"),
+    "percentile_rank": ("x", "w"),
+    "rsi_wilder": ("x", "w"),
+    "roc": ("x", "w"),
+    "rolling_z_strict": ("x", "w"),
+    "macd_hist": ("x", 12, 26, 9),
+    "true_range": ("h", "l", "c"),
+    "atr_wilder_from_tr": ("tr", "w"),
+    "atr_wilder": ("h", "l", "c", "w"),
+    "atr_channel_upper": ("h", "l", "c", "w"),
+    "atr_channel_lower": ("h", "l", "c", "w"),
+    "atr_channel_pos": ("h", "l", "c", "w"),
+    "donchian_width": ("h", "l", "c", "w"),
+    "adx_wilder": ("h", "l", "c", "w"),
+    "dist_to_hh": ("h", "c", "w"),
+    "dist_to_ll": ("l", "c", "w"),
+    "sma_multi": ("x", "W"),
+    "ema_multi": ("x", "W"),
+    "hh_multi": ("x", "W"),
+    "ll_multi": ("x", "W"),
+    "rolling_max_multi": ("x", "W"),
+    "rolling_min_multi": ("x", "W"),
+    "atr_wilder_multi_from_tr": ("tr", "W"),
+    "atr_wilder_multi": ("h", "l", "c", "W"),
+}
+
+# Fed by true_range output, which is always float64.
+_FLOAT_ONLY = {"atr_wilder_from_tr", "atr_wilder_multi_from_tr"}
+
+
+@dataclass(frozen=True)
+class KernelWarmup:
+    """
+    Warm-up outcome for one kernel.
+
+    source is "compiled", "cache" (loaded from NUMBA_CACHE_DIR), "memory" (already
+    compiled in this process, e.g. as a callee of an earlier kernel) or "error".
+    """
+    name: str
+    dtype: str
+    seconds: float
+    source: str
+    error: Optional[str] = None
+
+
+def _sample_arrays(dtype: np.dtype) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(0)
+    c = 100.0 + np.cumsum(rng.normal(0.0, 1.0, _N))
+    h = c + 1.0
+    l = c - 1.0
+    if np.issubdtype(dtype, np.integer):
+        c, h, l = np.round(c), np.round(h), np.round(l)
+    arrays = {"x": c.astype(dtype), "h": h.astype(dtype), "l": l.astype(dtype), "c": c.astype(dtype)}
+    arrays["tr"] = ni.true_range(h, l, c)
+    return arrays
+
+
+def _dispatcher_counts(dispatcher) -> Tuple[int, int]:
+    stats = dispatcher.stats
+    return sum(stats.cache_hits.values()), sum(stats.cache_misses.values())
+
+
+def _timed(name: str, dtype: str, dispatchers: Sequence, call: Callable[[], object]) -> KernelWarmup:
+    before = [_dispatcher_counts(d) for d in dispatchers]
+    t0 = time.perf_counter()
+    try:
+        call()
+    except Exception as e:  # e.g. a dtype the kernel cannot type; report and go on
+        return KernelWarmup(name, dtype, time.perf_counter() - t0, "error", f"{type(e).__name__}: {e}")
+    seconds = time.perf_counter() - t0
+    after = [_dispatcher_counts(d) for d in dispatchers]
+    if any(a[1] > b[1] for a, b in zip(after, before)):
+        source = "compiled"
+    elif any(a[0] > b[0] for a, b in zip(after, before)):
+        source = "cache"
+    else:
+        source = "memory"
+    return KernelWarmup(name, dtype, seconds, source)
+
+
+def _warm_indicators(dtype: np.dtype) -> List[KernelWarmup]:
+    arrays = _sample_arrays(dtype)
+    results = []
+    for name, layout in KERNEL_ARGS.items():
+        if name in _FLOAT_ONLY and dtype != np.float64:
+            continue
+        kernel = getattr(ni, name)
+        args = []
+        for item in layout:
+            if item == "w":
+                args.append(_WINDOW)
+            elif item == "W":
+                args.append(_WINDOWS)
+            elif isinstance(item, str):
+                args.append(arrays[item])
+            else:
+                args.append(item)
+        results.append(_timed(name, dtype.name, [kernel], lambda k=kernel, a=tuple(args): k(*a)))
+    return results
+
+
+def _warm_simulator() -> List[KernelWarmup]:
+    from core.backtest import simulator as sim
+
+    arrays = _sample_arrays(np.dtype(np.float64))
+    ts = np.arange(_N).astype("datetime64[s]")
+    c = arrays["c"]
+    target = np.where(np.arange(_N) % 10 < 5, 1.0, -1.0)
+    signals = {"target_dir": target, "long_stop": c + 0.5, "exit_long_stop": c - 2.0}
+    cost = sim.CostConfig(slippage_ticks_per_side=1.0, commission_per_side=1.0, tick_size=0.25, multiplier=1.0, fx_rate=1.0)
+    bars = dict(ts=ts, open_=c, high=arrays["h"], low=arrays["l"], close=c)
+    return [
+        _timed(
+            "simulator.simulate_bar_engine", "float64", [sim._bar_engine_kernel],
+            lambda: sim.simulate_bar_engine(**bars, signals=signals, cost=cost, record_trades=True),
+        ),
+        _timed(
+            "simulator.simulate_bar_engine_batch", "float64", [sim._bar_engine_batch_kernel],
+            lambda: sim.simulate_bar_engine_batch(
+                **bars, signals=sim.stack_signal_rows([signals, signals], _N), cost=cost
+            ),
+        ),
+    ]
+
+
+def warm_up(dtypes: Sequence[str] = ("float64",), include_simulator: bool = True) -> List[KernelWarmup]:
+    """
+    Compile or cache-load every kernel for each input dtype (feature code passes float64).
+
+    Returns one KernelWarmup per (kernel, dtype), in call order.
+    """
+    results: List[KernelWarmup] = []
+    for dtype in dtypes:
+        results.extend(_warm_indicators(np.dtype(dtype)))
+    if include_simulator:
+        results.extend(_warm_simulator())
+    return results
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile numba kernels into NUMBA_CACHE_DIR")
+    parser.add_argument(
+        "--dtypes",
+        type=str,
+        default="float64",
+        help="Input dtypes for indicator kernels, comma-separated (default: float64)",
+    )
+    parser.add_argument(
+        "--no-simulator",
+        action="store_true",
+        default=False,
+        help="Skip the backtest simulator kernels",
+    )
+    args = parser.parse_args(argv)
+    dtypes = [d.strip() for d in args.dtypes.split(",") if d.strip()]
+
+    import numba
+
+    print(f"NUMBA_CACHE_DIR: {numba.config.CACHE_DIR or '(default: next to sources)'}")
+    t0 = time.perf_counter()
+    results = warm_up(dtypes, include_simulator=not args.no_simulator)
+    for r in results:
+        line = f"{r.name:<40} {r.dtype:<8} {r.seconds * 1000.0:9.1f} ms  {r.source}"
+        if r.error:
+            line += f"  {r.error}"
+        print(line)
+    failed = [r for r in results if r.error]
+    counts = {s: sum(1 for r in results if r.source == s) for s in ("compiled", "cache", "memory")}
+    print(
+        f"{len(results)} kernels in {time.perf_counter() - t0:.2f}s "
+        f"(compiled {counts['compiled']}, cache {counts['cache']}, memory {counts['memory']}, failed {len(failed)})"
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
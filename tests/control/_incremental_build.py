@@ -0,0 +1,57 @@
+"""Shared scaffold for the INCREMENTAL build tests: raw TXT fixture, build wrapper, FULL-rebuild compare."""
+
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from control.shared_build import build_shared
+
+SEASON = "2026Q1"
+DATASET = "CME.MNQ"
+TFS = [15, 60, 240]
+
+
+def write_raw_txt(path: Path, days: int, open_offset: float = 0.0) -> None:
+    """Minute bars from 2024-03-04 00:00 on a seeded random walk; open = close + open_offset."""
+    rng = np.random.default_rng(0)
+    ts = np.datetime64("2024-03-04T00:00") + np.arange(days * 1440).astype("timedelta64[m]")
+    close = 1000.0 + np.cumsum(rng.normal(0.0, 1.0, len(ts)))
+    rows = ["Date,Time,Open,High,Low,Close,TotalVolume"]
+    for t, c in zip(ts, close):
+        day, hhmm = str(t).split("T")
+        rows.append(f"{day},{hhmm}:00,{c + open_offset:.2f},{c + 1:.2f},{c - 1:.2f},{c:.2f},{int(c) % 97}")
+    path.write_text("\n".join(rows) + "\n", encoding="utf-8")
+
+
+class IncrementalBuildCase(unittest.TestCase):
+    """Temp outputs root per test; subclasses say which per-tf file `_assert_matches_full` compares."""
+
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory(prefix="fishbro_test_incr_build_")
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.txt = self.root / "raw.txt"
+
+    def _build(self, outputs_root: Path, mode: str, **kwargs) -> dict:
+        return build_shared(
+            season=SEASON, dataset_id=DATASET, txt_path=self.txt, outputs_root=outputs_root,
+            mode=mode, build_bars=True, tfs=TFS, **kwargs,
+        )
+
+    def _load_tf(self, outputs_root: Path, tf: int) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    def _assert_matches_full(self, outputs_root: Path, **kwargs) -> None:
+        """FULL-build the same TXT into a fresh root and require identical per-tf files."""
+        full_root = self.root / "full"
+        self._build(full_root, "FULL", **kwargs)
+        for tf in TFS:
+            got = self._load_tf(outputs_root, tf)
+            ref = self._load_tf(full_root, tf)
+            self.assertEqual(sorted(got), sorted(ref))
+            for k in ref:
+                self.assertEqual(got[k].dtype, ref[k].dtype, (tf, k))
+                self.assertEqual(got[k].tobytes(), ref[k].tobytes(), (tf, k))
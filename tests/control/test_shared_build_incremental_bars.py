@@ -0,0 +1,81 @@
+"""INCREMENTAL bars builds resample only the appended tail and must match a FULL rebuild."""
+
+import unittest
+from pathlib import Path
+from typing import Dict
+from unittest import mock
+
+import numpy as np
+
+from _incremental_build import DATASET, SEASON, TFS, IncrementalBuildCase, write_raw_txt
+from control import shared_build
+from control.bars_store import load_npz, normalized_bars_path, resampled_bars_path
+
+
+class TestIncrementalBarsSplice(IncrementalBuildCase):
+    def _load_tf(self, outputs_root: Path, tf: int) -> Dict[str, np.ndarray]:
+        return load_npz(resampled_bars_path(outputs_root, SEASON, DATASET, tf))
+
+    def test_splice_matches_full_rebuild(self) -> None:
+        inc_root = self.root / "inc"
+        write_raw_txt(self.txt, 5)
+        self._build(inc_root, "FULL")
+        write_raw_txt(self.txt, 7)
+        report = self._build(inc_root, "INCREMENTAL", verify_incremental=True)
+
+        self.assertEqual(report["incremental_splice_by_tf"], {str(tf): True for tf in TFS})
+        for tf in TFS:
+            # safe point lies in the appended range, not at the start of the data
+            self.assertGreaterEqual(report["safe_recompute_start_by_tf"][str(tf)], "2024-03-08")
+        self._assert_matches_full(inc_root)
+
+    def test_unrecorded_previous_file_is_rebuilt(self) -> None:
+        inc_root = self.root / "inc"
+        write_raw_txt(self.txt, 5)
+        self._build(inc_root, "FULL")
+        # 60m file no longer matches the bars manifest -> not trusted as a prefix
+        path = resampled_bars_path(inc_root, SEASON, DATASET, 60)
+        bars = load_npz(path)
+        bars["close"] = bars["close"] + 1.0
+        np.savez(path, **bars)
+
+        write_raw_txt(self.txt, 7)
+        report = self._build(inc_root, "INCREMENTAL")
+        self.assertEqual(report["incremental_splice_by_tf"], {"15": True, "60": False, "240": True})
+        self._assert_matches_full(inc_root)
+
+    def test_stale_normalized_history_is_rebuilt(self) -> None:
+        inc_root = self.root / "inc"
+        write_raw_txt(self.txt, 5)
+        self._build(inc_root, "FULL")
+        # stored normalized bars no longer end with the TXT's bars -> not kept as history
+        path = normalized_bars_path(inc_root, SEASON, DATASET)
+        bars = load_npz(path)
+        bars["close"][-1] += 1.0
+        np.savez(path, **bars)
+
+        write_raw_txt(self.txt, 7)
+        with self.assertLogs("control.shared_build", "WARNING"):
+            report = self._build(inc_root, "INCREMENTAL")
+        self.assertEqual(report["incremental_splice_by_tf"], {str(tf): False for tf in TFS})
+        self._assert_matches_full(inc_root)
+
+    def test_verify_mode_rejects_bad_splice(self) -> None:
+        inc_root = self.root / "inc"
+        write_raw_txt(self.txt, 5)
+        self._build(inc_root, "FULL")
+        write_raw_txt(self.txt, 7)
+
+        real_splice = shared_build._splice_resampled
+
+        def drop_first_bar(previous, tail, safe_start):
+            spliced = real_splice(previous, tail, safe_start)
+            return {k: v[1:] for k, v in spliced.items()}
+
+        with mock.patch.object(shared_build, "_splice_resampled", drop_first_bar):
+            with self.assertRaisesRegex(ValueError, "完整重建不一致"):
+                self._build(inc_root, "INCREMENTAL", verify_incremental=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
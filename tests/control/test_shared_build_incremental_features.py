@@ -0,0 +1,97 @@
+"""INCREMENTAL features builds resume from the saved online state and must match a FULL rebuild."""
+
+import unittest
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from _incremental_build import DATASET, SEASON, TFS, IncrementalBuildCase, write_raw_txt
+from contracts.features import FeatureRegistry, FeatureSpec
+from control.features_store import features_path, features_state_path, load_features_npz
+
+NAMES = [
+    "sma_20", "ema_12", "hh_10", "percentile_30", "zscore_20", "bb_pb_20", "atr_ch_pos_10",
+    "atr_pct_z_20", "atr_5", "rsi_14", "adx_14", "di_plus_14", "macd_hist_12_26_9", "roc_10", "ret_z_50",
+]
+
+
+def _registry(extra=()):
+    return FeatureRegistry(specs=[
+        FeatureSpec(name=name, timeframe_min=tf, min_warmup_bars=5) for tf in TFS for name in [*NAMES, *extra]
+    ])
+
+
+def _write_raw_txt(path: Path, days: int) -> None:
+    # open sits 0.5 above close (bars tests use open == close)
+    write_raw_txt(path, days, open_offset=0.5)
+
+
+class TestIncrementalFeaturesResume(IncrementalBuildCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.inc_root = self.root / "inc"
+
+    def _build(self, outputs_root: Path, mode: str, registry=None, **kwargs) -> dict:
+        return super()._build(
+            outputs_root, mode, build_features=True, feature_registry=registry or _registry(), **kwargs
+        )
+
+    def _load_tf(self, outputs_root: Path, tf: int) -> Dict[str, np.ndarray]:
+        return load_features_npz(features_path(outputs_root, SEASON, DATASET, tf))
+
+    def test_resume_matches_full_rebuild(self) -> None:
+        _write_raw_txt(self.txt, 5)
+        self._build(self.inc_root, "FULL")
+        _write_raw_txt(self.txt, 7)
+        report = self._build(self.inc_root, "INCREMENTAL", verify_incremental=True)
+
+        self.assertEqual(report["incremental_resume_by_tf"], {str(tf): True for tf in TFS})
+        for tf in TFS:
+            # checkpoint is the last bar of the previous build, not the start of the data
+            self.assertGreaterEqual(report["lookback_rewind_by_tf"][str(tf)], "2024-03-08")
+        self._assert_matches_full(self.inc_root)
+
+    def test_unusable_state_falls_back_to_full_compute(self) -> None:
+        _write_raw_txt(self.txt, 5)
+        self._build(self.inc_root, "FULL")
+        # 15m: state missing; 60m: features file no longer paired with its state
+        features_state_path(self.inc_root, SEASON, DATASET, 15).unlink()
+        path = features_path(self.inc_root, SEASON, DATASET, 60)
+        features = load_features_npz(path)
+        features["ema_12"] = features["ema_12"] + 1.0
+        np.savez(path, **features)
+
+        _write_raw_txt(self.txt, 7)
+        report = self._build(self.inc_root, "INCREMENTAL")
+        self.assertEqual(report["incremental_resume_by_tf"], {"15": False, "60": False, "240": True})
+        self._assert_matches_full(self.inc_root)
+
+    def test_corrupt_state_falls_back_to_full_compute(self) -> None:
+        _write_raw_txt(self.txt, 5)
+        self._build(self.inc_root, "FULL")
+        # 15m: truncated state file; 60m: state meta missing required keys
+        path = features_state_path(self.inc_root, SEASON, DATASET, 15)
+        path.write_bytes(path.read_bytes()[:100])
+        path = features_state_path(self.inc_root, SEASON, DATASET, 60)
+        np.savez(path, __meta__=np.array('{"version": 1}'))
+
+        _write_raw_txt(self.txt, 7)
+        with self.assertLogs("control.shared_build", "WARNING"):
+            report = self._build(self.inc_root, "INCREMENTAL")
+        self.assertEqual(report["incremental_resume_by_tf"], {"15": False, "60": False, "240": True})
+        self._assert_matches_full(self.inc_root)
+
+    def test_changed_registry_is_recomputed(self) -> None:
+        _write_raw_txt(self.txt, 5)
+        self._build(self.inc_root, "FULL")
+        _write_raw_txt(self.txt, 7)
+        registry = _registry(extra=["ema_30"])
+        report = self._build(self.inc_root, "INCREMENTAL", registry)
+
+        self.assertEqual(report["incremental_resume_by_tf"], {str(tf): False for tf in TFS})
+        self._assert_matches_full(self.inc_root, registry=registry)
+
+
+if __name__ == "__main__":
+    unittest.main()
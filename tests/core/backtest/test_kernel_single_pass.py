@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from contracts.strategy import StrategySpec
+from core.backtest.kernel import BacktestKernel
+
+
+class CountingCrossStrategy:
+    calls = 0
+
+    def __init__(self, params):
+        self.window = int(params.get("window", 5))
+
+    def compute_signals(self, df: pd.DataFrame) -> pd.Series:
+        type(self).calls += 1
+        ma = df["close"].rolling(self.window).mean()
+        return (df["close"] > ma).astype(float) - (df["close"] < ma).astype(float)
+
+
+def test_run_with_equity_single_pass_matches_run() -> None:
+    rng = np.random.default_rng(0)
+    idx = pd.date_range("2024-01-01", periods=300, freq="h")
+    df = pd.DataFrame({"close": 100.0 + np.cumsum(rng.normal(0.0, 1.0, 300))}, index=idx)
+    spec = StrategySpec(
+        strategy_id="counting_cross",
+        class_path=f"{__name__}.CountingCrossStrategy",
+        params={"window": 7},
+    )
+
+    CountingCrossStrategy.calls = 0
+    result, equity = BacktestKernel.run_with_equity(df, spec, "snap", initial_equity=5_000.0)
+    assert CountingCrossStrategy.calls == 1
+
+    reference = BacktestKernel.run(df, spec, "snap")
+    assert result.run_id == reference.run_id
+    assert result.strategy_hash == reference.strategy_hash == spec.compute_hash()
+    assert result.metrics == reference.metrics
+    signals = CountingCrossStrategy(spec.params).compute_signals(df)
+    expected = 5_000.0 * (1.0 + signals.shift(1).fillna(0) * df["close"].pct_change().fillna(0)).cumprod()
+    pd.testing.assert_series_equal(equity, expected)
+    assert BacktestKernel._resolve_strategy(spec.class_path) is CountingCrossStrategy
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+
+from core.backtest.simulator import (
+    CostConfig,
+    simulate_bar_engine,
+    simulate_bar_engine_batch,
+    stack_signal_rows,
+)
+
+
+def test_batch_rows_match_single_runs() -> None:
+    rng = np.random.default_rng(11)
+    n, k_rows = 300, 6
+    ts = np.arange(n).astype("datetime64[s]")
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    open_ = close + rng.normal(0.0, 0.3, n)
+    high = np.maximum(open_, close) + 0.5
+    low = np.minimum(open_, close) - 0.5
+
+    rows = []
+    for k in range(k_rows):
+        row = {"target_dir": rng.choice([-1, 0, 1], size=n).astype(np.float64)}
+        if k % 2:
+            row["long_stop"] = close + 0.4
+            row["exit_long_stop"] = np.where(rng.random(n) < 0.5, close - 0.6, np.nan)
+        rows.append(row)
+    costs = [
+        CostConfig(slippage_ticks_per_side=float(k % 3), commission_per_side=1.0, tick_size=0.25, multiplier=2.0, fx_rate=30.0)
+        for k in range(k_rows)
+    ]
+
+    batch = simulate_bar_engine_batch(
+        ts=ts, open_=open_, high=high, low=low, close=close, signals=stack_signal_rows(rows, n), cost=costs
+    )
+    assert batch.equity.shape == (k_rows, n)
+    for k in range(k_rows):
+        single = simulate_bar_engine(
+            ts=ts, open_=open_, high=high, low=low, close=close, signals=rows[k], cost=costs[k]
+        )
+        assert np.array_equal(batch.equity[k], single.equity)
+        assert int(batch.trades[k]) == single.trades
+        assert float(batch.net[k]) == single.net
+        assert float(batch.mdd[k]) == single.mdd
+        assert batch.warnings[k] == single.warnings
+
+    lite = simulate_bar_engine_batch(
+        ts=ts, open_=open_, high=high, low=low, close=close, signals=stack_signal_rows(rows, n), cost=costs, metrics_only=True
+    )
+    assert lite.equity.shape == (k_rows, 0)
+    assert np.array_equal(lite.net, batch.net)
+    assert np.array_equal(lite.mdd, batch.mdd)
+    assert np.array_equal(lite.trades, batch.trades)
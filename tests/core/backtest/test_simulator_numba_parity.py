@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest.simulator import CostConfig, simulate_bar_engine
+
+from _reference_simulator import simulate_bar_engine_py
+
+
+def _make_bars(rng: np.random.Generator, n: int):
+    ts = (np.datetime64("2020-01-01T00:00:00") + np.arange(n) * np.timedelta64(3600, "s")).astype("datetime64[s]")
+    close = 10_000.0 + np.cumsum(rng.normal(0.0, 15.0, n))
+    open_ = close + rng.normal(0.0, 5.0, n)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0.0, 8.0, n))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0.0, 8.0, n))
+    return ts, open_, high, low, close
+
+
+def _make_signals(rng: np.random.Generator, close: np.ndarray, *, with_stops: bool, nan_frac: float):
+    n = len(close)
+    target = rng.choice([-1.0, 0.0, 1.0], size=n, p=[0.3, 0.3, 0.4])
+    target[rng.random(n) < nan_frac] = np.nan
+    signals = {"target_dir": target}
+    if with_stops:
+        def _stop(offset: float) -> np.ndarray:
+            s = close + offset + rng.normal(0.0, 10.0, n)
+            s[rng.random(n) < 0.3] = np.nan
+            return s
+
+        signals["long_stop"] = _stop(10.0)
+        signals["short_stop"] = _stop(-10.0)
+        signals["exit_long_stop"] = _stop(-25.0)
+        signals["exit_short_stop"] = _stop(25.0)
+    return signals
+
+
+def _assert_parity(sim_nb, sim_py) -> None:
+    assert np.array_equal(sim_nb.equity, sim_py.equity)
+    assert sim_nb.trades == sim_py.trades
+    assert sim_nb.net == sim_py.net
+    assert sim_nb.mdd == sim_py.mdd
+    assert sim_nb.warnings == sim_py.warnings
+    assert sim_nb.trades_ledger.records.tobytes() == sim_py.trades_ledger.records.tobytes()
+    assert sim_nb.trades_ledger.to_dicts() == sim_py.trades_ledger.to_dicts()
+
+
+COSTS = [
+    CostConfig(slippage_ticks_per_side=0.0, commission_per_side=0.0, tick_size=0.25, multiplier=1.0, fx_rate=1.0),
+    CostConfig(slippage_ticks_per_side=1.0, commission_per_side=2.5, tick_size=0.25, multiplier=2.0, fx_rate=32.1),
+    CostConfig(slippage_ticks_per_side=-1.0, commission_per_side=1.0, tick_size=0.05, multiplier=50.0, fx_rate=1.0),
+]
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("cost", COSTS)
+@pytest.mark.parametrize("with_stops", [False, True])
+def test_numba_matches_python_reference(seed: int, cost: CostConfig, with_stops: bool) -> None:
+    rng = np.random.default_rng(seed)
+    ts, open_, high, low, close = _make_bars(rng, 500)
+    signals = _make_signals(rng, close, with_stops=with_stops, nan_frac=0.05)
+    kwargs = dict(ts=ts, open_=open_, high=high, low=low, close=close, signals=signals, cost=cost, initial_equity=10_000.0)
+    for record in (False, True):
+        _assert_parity(
+            simulate_bar_engine(**kwargs, record_trades=record),
+            simulate_bar_engine_py(**kwargs, record_trades=record),
+        )
+
+
+def test_parity_with_pandas_and_irregular_signals() -> None:
+    rng = np.random.default_rng(7)
+    ts, open_, high, low, close = _make_bars(rng, 120)
+    idx = pd.to_datetime(ts.astype("datetime64[ns]"))
+    signals = {
+        # int target with a short array (missing tail -> flat)
+        "target_dir": np.array([1, 1, -1, 0, 2, -2] * 15, dtype=np.int64),
+        # pandas Series stops with a datetime index
+        "long_stop": pd.Series(close + 5.0, index=idx),
+        "short_stop": None,
+        "exit_long_stop": pd.Series(np.where(rng.random(120) < 0.5, close - 5.0, np.nan), index=idx),
+        "exit_short_stop": np.array([None] * 120, dtype=object),
+    }
+    kwargs = dict(ts=ts, open_=open_, high=high, low=low, close=close, cost=COSTS[1], record_trades=True)
+    # Series are read positionally; the reference path gets the equivalent ndarray because
+    # integer `Series[i]` lookups on a DatetimeIndex are label-based on newer pandas.
+    signals_np = {k: (v.to_numpy() if isinstance(v, pd.Series) else v) for k, v in signals.items()}
+    _assert_parity(
+        simulate_bar_engine(**kwargs, signals=signals),
+        simulate_bar_engine_py(**kwargs, signals=signals_np),
+    )
+
+
+def test_parity_edge_lengths() -> None:
+    for n in (0, 1, 2):
+        ts = np.arange(n).astype("datetime64[s]")
+        px = np.full(n, 100.0)
+        signals = {"target_dir": np.ones(n)}
+        kwargs = dict(ts=ts, open_=px, high=px, low=px, close=px, signals=signals, cost=COSTS[1], record_trades=True)
+        _assert_parity(simulate_bar_engine(**kwargs), simulate_bar_engine_py(**kwargs))
+
+
+@pytest.mark.parametrize("seed", [0, 5])
+def test_metrics_only_matches_full_run(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    ts, open_, high, low, close = _make_bars(rng, 400)
+    close[200] = np.nan  # NaN mark-to-market must propagate into net/mdd like the array path
+    signals = _make_signals(rng, close, with_stops=True, nan_frac=0.05)
+    kwargs = dict(ts=ts, open_=open_, high=high, low=low, close=close, signals=signals, cost=COSTS[1])
+    lite = simulate_bar_engine(**kwargs, metrics_only=True)
+    ref = simulate_bar_engine_py(**kwargs)
+    assert lite.equity.size == 0
+    assert lite.trades == ref.trades
+    np.testing.assert_array_equal(np.array([lite.net, lite.mdd]), np.array([ref.net, ref.mdd]))
+    assert lite.warnings == ref.warnings
+
+
+@pytest.mark.parametrize("seed", [0, 3])
+def test_resumed_segments_match_single_run(seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    ts, open_, high, low, close = _make_bars(rng, 600)
+    signals = _make_signals(rng, close, with_stops=True, nan_frac=0.05)
+    cost = COSTS[1]
+    full = simulate_bar_engine(
+        ts=ts, open_=open_, high=high, low=low, close=close, signals=signals, cost=cost, record_trades=True
+    )
+
+    state = None
+    equity, ledger_rows, trades = [], [], 0
+    for lo, hi in ((0, 137), (137, 138), (138, 420), (420, 600)):
+        seg = simulate_bar_engine(
+            ts=ts[lo:hi],
+            open_=open_[lo:hi],
+            high=high[lo:hi],
+            low=low[lo:hi],
+            close=close[lo:hi],
+            signals={k: v[lo:hi] for k, v in signals.items()},
+            cost=cost,
+            record_trades=True,
+            initial_state=state,
+        )
+        state = seg.final_state
+        equity.append(seg.equity)
+        ledger_rows.extend(seg.trades_ledger.to_dicts())
+        trades += seg.trades
+
+    assert np.array_equal(np.concatenate(equity), full.equity)
+    assert trades == full.trades
+    assert ledger_rows == full.trades_ledger.to_dicts()
+    # NaN signals make the `pending` tuples unequal under ==; compare them as arrays.
+    assert state.__dict__ | {"pending": None} == full.final_state.__dict__ | {"pending": None}
+    np.testing.assert_array_equal(np.array(state.pending), np.array(full.final_state.pending))
+
+
+def test_flattened_state_matches_fresh_segment() -> None:
+    rng = np.random.default_rng(9)
+    ts, open_, high, low, close = _make_bars(rng, 300)
+    signals = _make_signals(rng, close, with_stops=True, nan_frac=0.05)
+    signals["target_dir"][:150] = 1.0  # ends the first segment long with a pending long signal
+    cost = COSTS[1]
+    first = simulate_bar_engine(
+        ts=ts[:150], open_=open_[:150], high=high[:150], low=low[:150], close=close[:150],
+        signals={k: v[:150] for k, v in signals.items()}, cost=cost,
+    )
+    assert first.final_state.position == 1
+    flat = first.final_state.flattened()
+    assert flat.is_flat and flat.cash == first.final_state.equity
+
+    tail = dict(
+        ts=ts[150:], open_=open_[150:], high=high[150:], low=low[150:], close=close[150:],
+        signals={k: v[150:] for k, v in signals.items()}, cost=cost, record_trades=True,
+    )
+    resumed = simulate_bar_engine(**tail, initial_state=flat)
+    fresh = simulate_bar_engine(**tail, initial_equity=flat.equity)
+    # bar 0 is not traded on the previous segment's signals, exactly like a fresh start
+    assert resumed.equity[0] == flat.cash
+    assert np.array_equal(resumed.equity, fresh.equity)
+    assert (resumed.trades, resumed.net, resumed.mdd, resumed.warnings) == (fresh.trades, fresh.net, fresh.mdd, fresh.warnings)
+    assert resumed.trades_ledger == fresh.trades_ledger
+    assert resumed.final_state.__dict__ | {"pending": None} == fresh.final_state.__dict__ | {"pending": None}
@@ -2,7 +2,9 @@ import unittest
 
 import numpy as np
 
-from core.backtest.simulator import CostConfig, simulate_bar_engine
+from core.backtest.simulator import CostConfig, TradeLedger, simulate_bar_engine
+
+from _reference_simulator import simulate_bar_engine_py
 
 
 class TestSimulatorTradeLedger(unittest.TestCase):
@@ -45,3 +47,56 @@ class TestSimulatorTradeLedger(unittest.TestCase):
             self.assertIn("exit_t", trade)
             self.assertIn("net_pnl", trade)
 
+
+    def test_trade_ledger_is_columnar_and_feeds_stress_vectors(self):
+        from control.research_slippage_stress import _compute_net_with_slippage
+        from core.backtest.simulator import TRADE_LEDGER_DTYPE
+
+        rng = np.random.default_rng(3)
+        n = 400
+        ts = (np.datetime64("2025-01-01T00:00:00") + np.arange(n) * np.timedelta64(3600, "s")).astype("datetime64[s]")
+        close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+        open_ = close + rng.normal(0.0, 0.3, n)
+        high = np.maximum(open_, close) + 0.5
+        low = np.minimum(open_, close) - 0.5
+        signals = {"target_dir": rng.choice([-1, 0, 1], size=n).astype(np.float64), "exit_long_stop": close - 0.7}
+        cost = CostConfig(slippage_ticks_per_side=1.0, commission_per_side=1.5, tick_size=0.25, multiplier=2.0, fx_rate=1.0)
+        sim = simulate_bar_engine(
+            ts=ts, open_=open_, high=high, low=low, close=close, signals=signals, cost=cost, record_trades=True
+        )
+
+        ledger = sim.trades_ledger
+        self.assertGreater(len(ledger), 10)
+        self.assertEqual(ledger.records.dtype, TRADE_LEDGER_DTYPE)
+        rows = ledger.to_dicts()
+        self.assertEqual(rows[0]["entry_t"], f"{np.datetime_as_string(ts[ledger.records['entry_idx'][0]], unit='s')}Z")
+        self.assertEqual([r["net_pnl"] for r in rows], ledger.net_pnl.tolist())
+        self.assertEqual(ledger[-1], rows[-1])
+
+        fills = [
+            {
+                "entry_price": r["entry_price"],
+                "exit_price": r["exit_price"],
+                "entry_side": "buy" if r["direction"] == "long" else "sellshort",
+                "exit_side": "sell" if r["direction"] == "long" else "buytocover",
+            }
+            for r in rows
+        ]
+        for slip_ticks in (0, 2):
+            self.assertEqual(
+                _compute_net_with_slippage(ledger, slip_ticks, 0.25, 1.5),
+                _compute_net_with_slippage(fills, slip_ticks, 0.25, 1.5),
+            )
+
+        # Both simulators return the same ledger type; slicing works as on a list of rows.
+        sim_py = simulate_bar_engine_py(
+            ts=ts, open_=open_, high=high, low=low, close=close, signals=signals, cost=cost, record_trades=True
+        )
+        self.assertIsInstance(sim_py.trades_ledger, TradeLedger)
+        self.assertEqual(sim_py.trades_ledger, ledger)
+        self.assertEqual(sim_py.trades_ledger.to_dicts(), rows)
+        self.assertEqual(ledger[:3], rows[:3])
+        self.assertEqual(ledger[-2:], rows[-2:])
+        self.assertNotEqual(ledger, rows)  # a ledger is not a plain list
+        with self.assertRaises(TypeError):
+            hash(ledger)
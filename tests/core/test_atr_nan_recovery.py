@@ -2,7 +2,7 @@ import unittest
 
 import numpy as np
 
-from core.features.compute import compute_atr_14
+from core.features.compute import compute_atr_14, compute_rolling_z
 
 
 class TestAtrNanRecovery(unittest.TestCase):
@@ -24,3 +24,34 @@ class TestAtrNanRecovery(unittest.TestCase):
         finite_after = np.isfinite(atr[33:]).sum()
         self.assertGreater(finite_after, 0)
 
+
+    def test_atr_matches_per_bar_definition(self):
+        rng = np.random.default_rng(4)
+        n = 300
+        c = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+        h = c + np.abs(rng.normal(0.0, 1.0, n))
+        l = c - np.abs(rng.normal(0.0, 1.0, n))
+        h[[40, 41, 200]] = np.nan
+        c[120] = np.nan
+
+        tr = np.full(n, np.nan)
+        tr[0] = h[0] - l[0]
+        for i in range(1, n):
+            if np.isfinite(h[i]) and np.isfinite(l[i]) and np.isfinite(c[i - 1]):
+                tr[i] = max(h[i] - l[i], abs(h[i] - c[i - 1]), abs(l[i] - c[i - 1]))
+        full = np.array([i >= 13 and np.isfinite(tr[i - 13:i + 1]).all() for i in range(n)])
+
+        atr = compute_atr_14(c, h, l, c)
+        np.testing.assert_array_equal(np.isfinite(atr), full)
+        expected = [tr[i - 13:i + 1].mean() for i in np.flatnonzero(full)]
+        np.testing.assert_allclose(atr[full], expected, rtol=1e-12)
+
+    def test_rolling_z_flat_window_is_nan(self):
+        x = np.array([1.0, 2.0, 3.0, 5.0, 5.0, 5.0, 5.0, 9.0])
+        z = compute_rolling_z(x, 3)
+        self.assertTrue(np.isnan(z[:2]).all())
+        self.assertAlmostEqual(z[2], 1.224744871391589)
+        # [5, 5, 5] has std == 0 -> NaN rather than 0
+        self.assertTrue(np.isnan(z[5]) and np.isnan(z[6]))
+        self.assertGreater(z[7], 0.0)
+        self.assertTrue(np.isnan(compute_rolling_z(x, 9)).all())
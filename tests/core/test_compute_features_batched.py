@@ -0,0 +1,176 @@
+"""Batched multi-window families and the shared-intermediate feature plan must reproduce the per-spec path."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from contracts.features import FeatureRegistry, FeatureSpec
+from core.features import compute as compute_mod
+from core.features.compute import (
+    FeatureFamily,
+    compute_features_for_tf,
+    register_feature_family,
+    resolve_feature_family,
+)
+from core.features.plan import FeaturePlan
+from core.resampler import SessionSpecTaipei
+
+
+def _bars(n: int = 1500):
+    rng = np.random.default_rng(12)
+    ts = (np.datetime64("2024-01-02T08:45:00") + np.arange(n) * np.timedelta64(60, "m")).astype("datetime64[s]")
+    c = 17000.0 + np.cumsum(rng.normal(0.0, 12.0, n))
+    o = c + rng.normal(0.0, 4.0, n)
+    h = np.maximum(o, c) + np.abs(rng.normal(0.0, 6.0, n))
+    l = np.minimum(o, c) - np.abs(rng.normal(0.0, 6.0, n))
+    h[n // 7] = np.nan
+    v = rng.integers(1, 500, n).astype(np.float64)
+    return ts, o, h, l, c, v
+
+
+def _registry(tf: int) -> FeatureRegistry:
+    names = [f"{fam}_{w}" for fam in ("sma", "ema", "hh", "ll") for w in (5, 10, 20, 60, 120, 240)]
+    names += ["atr_5", "atr_10", "atr_14", "atr_40", "atr_pct_14", "atr_ch_upper_20", "rsi_14", "bb_pb_20"]
+    names += ["adx_14", "di_plus_14", "di_minus_14", "adx_20", "atr_pct_z_20", "atr_pct_z_60"]
+    names += ["ret_z_50", "ret_z_200"]
+    specs = [FeatureSpec(name=nm, timeframe_min=tf, min_warmup_bars=7) for nm in names]
+    # explicit window param overrides the name
+    specs.append(FeatureSpec(name="sma_7", timeframe_min=tf, params={"window": 3}))
+    return FeatureRegistry(specs=specs)
+
+
+class TestBatchedFeatureFamilies(unittest.TestCase):
+    def test_family_resolution(self):
+        expected = {
+            "sma_20": "sma",
+            "atr_14": "atr",  # Wilder ATR, as before; compute_atr_14 is only the baseline fallback
+            "atr_pct_14": "atr_pct_14",
+            "atr_pct_z_20": "atr_pct_z",
+            "atr_ch_pos_20": "atr_ch_pos",
+            "vx_percentile_20": "vx_percentile",
+            "percentile_20": "percentile",
+            "ret_z_200": "ret_z_200",
+            "ret_z_50": "ret_z",
+            "dist_hh_20": "dist_hh",
+            "di_minus_14": "di_minus",
+            "session_vwap": "session_vwap",
+        }
+        for name, family in expected.items():
+            self.assertEqual(resolve_feature_family(name).name, family, name)
+        self.assertIsNone(resolve_feature_family("nope_20"))
+
+        self.assertEqual(compute_mod._planned_window("sma_7", (("window", 3),))[1], 3)
+        self.assertIsNone(compute_mod._planned_window("sma_fast", (("window", 3),)))  # per-spec path raises
+        self.assertIsNone(compute_mod._planned_window("ema_20", (("window", 20.0),)))
+
+    def test_nested_params_are_hashable(self):
+        ts, o, h, l, c, v = _bars(50)
+        session = SessionSpecTaipei(open_hhmm="08:45", close_hhmm="13:45", breaks=[])
+        # model_construct: the lru_cache key must not depend on params being scalars
+        spec = FeatureSpec.model_construct(
+            name="sma_5", timeframe_min=60, params={"levels": [1, 2], "opts": {"b": [3], "a": {4}}},
+            lookback_bars=0, window=1, min_warmup_bars=0, dtype="float64", div0_policy="DIV0_RET_NAN", family=None,
+        )
+        out = compute_features_for_tf(ts, o, h, l, c, v, 60, FeatureRegistry.model_construct(specs=[spec]), session)
+        ref = compute_features_for_tf(ts, o, h, l, c, v, 60, FeatureRegistry(specs=[FeatureSpec(name="sma_5", timeframe_min=60)]), session)
+        np.testing.assert_array_equal(out["sma_5"], ref["sma_5"])
+        self.assertEqual(
+            compute_mod._params_key({"opts": {"b": [3], "a": 1}, "w": 2}),
+            (("opts", (("a", 1), ("b", (3,)))), ("w", 2)),
+        )
+
+    def test_unknown_feature_and_bad_window_raise(self):
+        ts, o, h, l, c, v = _bars(50)
+        session = SessionSpecTaipei(open_hhmm="08:45", close_hhmm="13:45", breaks=[])
+        for spec, err in (
+            (FeatureSpec(name="nope_20", timeframe_min=60), "不支援的特徵名稱"),
+            (FeatureSpec(name="sma_fast", timeframe_min=60, params={"window": 3}), "invalid literal"),
+        ):
+            with self.assertRaisesRegex(ValueError, err):
+                compute_features_for_tf(ts, o, h, l, c, v, 60, FeatureRegistry(specs=[spec]), session)
+
+    def test_registered_family_is_dispatched(self):
+        ts, o, h, l, c, v = _bars(50)
+        session = SessionSpecTaipei(open_hhmm="08:45", close_hhmm="13:45", breaks=[])
+        family = FeatureFamily("hl_mid", "hl_mid_", ("h", "l"), lambda hi, lo, w: (hi + lo) / w, lambda name, params: (2.0,))
+        with mock.patch.dict(compute_mod._FEATURE_FAMILIES):
+            register_feature_family(family)
+            with self.assertRaises(ValueError):
+                register_feature_family(family)
+            registry = FeatureRegistry(specs=[FeatureSpec(name="hl_mid_1", timeframe_min=60)])
+            out = compute_features_for_tf(ts, o, h, l, c, v, 60, registry, session)
+        compute_mod._resolve_family.cache_clear()
+        compute_mod._resolve_spec.cache_clear()
+        np.testing.assert_array_equal(out["hl_mid_1"], (h + l) / 2.0)
+        self.assertIsNone(resolve_feature_family("hl_mid_1"))
+
+    def test_matches_per_spec_path(self):
+        ts, o, h, l, c, v = _bars()
+        session = SessionSpecTaipei(open_hhmm="08:45", close_hhmm="13:45", breaks=[])
+        registry = _registry(60)
+        batched = compute_features_for_tf(ts, o, h, l, c, v, 60, registry, session)
+        with mock.patch.object(compute_mod, "build_feature_plan", return_value=FeaturePlan([], [])):
+            legacy = compute_features_for_tf(ts, o, h, l, c, v, 60, registry, session)
+        self.assertEqual(list(batched), list(legacy))
+        for name in legacy:
+            if name == "ts":
+                continue
+            self.assertTrue(np.array_equal(batched[name].view(np.int64), legacy[name].view(np.int64)), name)
+        self.assertTrue(np.isnan(batched["sma_5"][:7]).all())
+
+    def test_threaded_matches_sequential(self):
+        ts, o, h, l, c, v = _bars()
+        session = SessionSpecTaipei(open_hhmm="08:45", close_hhmm="13:45", breaks=[])
+        registry = _registry(60)
+        sequential = compute_features_for_tf(ts, o, h, l, c, v, 60, registry, session)
+        threaded = compute_features_for_tf(ts, o, h, l, c, v, 60, registry, session, max_threads=4)
+        self.assertEqual(list(threaded), list(sequential))
+        for name in sequential:
+            self.assertTrue(np.array_equal(threaded[name].view(np.int64), sequential[name].view(np.int64)), name)
+        with self.assertRaises(ValueError):
+            compute_features_for_tf(ts, o, h, l, c, v, 60, registry, session, max_threads=0)
+
+    def test_split_feature_threads(self):
+        from control.shared_build import _split_feature_threads
+
+        self.assertEqual(_split_feature_threads(None, 5), (1, None))
+        self.assertEqual(_split_feature_threads(1, 5), (1, None))
+        self.assertEqual(_split_feature_threads(4, 5), (4, None))
+        self.assertEqual(_split_feature_threads(8, 2), (2, 4))
+        self.assertEqual(_split_feature_threads(8, 0), (1, None))
+
+
+    def test_plan_shares_intermediates(self):
+        registry = _registry(60)
+        plan = compute_mod.build_feature_plan(registry.specs_for_tf(60))
+        self.assertIs(plan, compute_mod.build_feature_plan(registry.specs_for_tf(60)))  # cached
+        desc = plan.describe()
+        nodes = {node["key"]: node for node in desc["nodes"]}
+        # one adx pass feeds adx/di_plus/di_minus; one log-return pass feeds every ret_z
+        self.assertEqual(nodes["adx_wilder(14)"]["consumers"], 3)
+        self.assertEqual(nodes["log_returns()"]["consumers"], 2)
+        self.assertEqual(nodes["true_range()"]["consumers"], 1)
+        # ATR(14) for atr_pct comes from the atr batch row, not a second Wilder pass
+        self.assertEqual(nodes["atr_wilder(14)"]["deps"], ["multi(atr, (10, 14, 40, 5))"])  # specs are name-sorted
+        self.assertEqual(nodes["atr_pct(14)"]["consumers"], 3)
+        self.assertEqual(desc["outputs"]["di_minus_14"], "adx_wilder(14)[2]")
+        self.assertNotIn("rsi_14", desc["outputs"])
+
+        ts, o, h, l, c, v = _bars()
+        with mock.patch("indicators.numba_indicators.adx_wilder") as adx_patch:
+            adx_patch.side_effect = AssertionError("adx must be bound at plan build time")
+            values, stats = plan.execute({"h": h, "l": l, "c": c})
+        self.assertEqual(stats.nodes_computed, len(desc["nodes"]))
+        self.assertEqual(stats.outputs, len(desc["outputs"]))
+        self.assertGreater(stats.shared_reads, 0)
+        self.assertIn("adx_wilder(14)", stats.as_dict()["seconds"])
+        # outputs never alias each other (postprocessing is in place)
+        arrays = list(values.values())
+        for i, a in enumerate(arrays):
+            for b in arrays[i + 1:]:
+                self.assertFalse(np.may_share_memory(a, b))
+
+
+if __name__ == "__main__":
+    unittest.main()
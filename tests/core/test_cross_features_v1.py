@@ -2,7 +2,14 @@ from __future__ import annotations
 
 import numpy as np
 
-from core.features.cross import compute_cross_features_v1
+from core.features.cross import (
+    _rolling_corr_strict,
+    _rolling_ols_strict,
+    _rolling_resid_std_strict,
+    _rolling_sum_strict,
+    _rolling_z_strict,
+    compute_cross_features_v1,
+)
 
 
 def _make_series(n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -84,3 +91,63 @@ def test_cross_features_v1_shapes_and_warmup():
     # beta_60 sanity: should be finite for correlated series when window full
     beta_model = features["beta_60"][-1]
     assert np.isnan(beta_model) or np.isfinite(beta_model)
+
+
+def _strict_sums_loop(x: np.ndarray, y: np.ndarray, window: int):
+    """Per-bar cumsum-difference loop (the original scalar formulation)."""
+    valid = (~np.isnan(x)) & (~np.isnan(y))
+    x0 = np.where(valid, x, 0.0)
+    y0 = np.where(valid, y, 0.0)
+    csums = [np.cumsum(a, dtype=np.float64) for a in (x0, y0, x0 * x0, y0 * y0, x0 * y0)]
+    ccount = np.cumsum(valid.astype(np.int64))
+    for i in range(window - 1, len(x)):
+        if i == window - 1:
+            yield i, ccount[i], [c[i] for c in csums]
+        else:
+            yield i, ccount[i] - ccount[i - window], [c[i] - c[i - window] for c in csums]
+
+
+def test_vectorized_strict_kernels_match_scalar_loop():
+    rng = np.random.default_rng(5)
+    n = 400
+    x = rng.normal(0.0, 0.01, n)
+    y = 0.6 * x + rng.normal(0.0, 0.005, n)
+    x[rng.random(n) < 0.03] = np.nan
+    y[rng.random(n) < 0.03] = np.nan
+    y[200:230] = 0.0  # zero variance stretch
+
+    for window in (2, 5, 60, n + 1):
+        exp_corr = np.full(n, np.nan)
+        exp_alpha, exp_beta, exp_r2, exp_rs = (np.full(n, np.nan) for _ in range(4))
+        exp_z, exp_sum = np.full(n, np.nan), np.full(n, np.nan)
+        for i, count, (sx, sy, sx2, sy2, sxy) in _strict_sums_loop(x, y, window):
+            if count != window:
+                continue
+            mx, my = sx / window, sy / window
+            vx, vy = sx2 / window - mx * mx, sy2 / window - my * my
+            if vx <= 0 or vy <= 0:
+                continue
+            cov = sxy / window - mx * my
+            exp_corr[i] = cov / (np.sqrt(vx) * np.sqrt(vy))
+            b = cov / vx
+            a = my - b * mx
+            exp_alpha[i], exp_beta[i], exp_r2[i] = a, b, (cov * cov) / (vx * vy)
+            rss = sy2 + (a * a) * window + (b * b) * sx2 + 2.0 * a * b * sx - 2.0 * a * sy - 2.0 * b * sxy
+            exp_rs[i] = np.sqrt(max(rss, 0.0) / window)
+        for i, count, (sx, _, sx2, _, _) in _strict_sums_loop(x, x, window):
+            if count != window:
+                continue
+            exp_sum[i] = sx
+            m = sx / window
+            v = sx2 / window - m * m
+            if v > 0:
+                exp_z[i] = (x[i] - m) / np.sqrt(v)
+
+        alpha, beta, r2 = _rolling_ols_strict(x, y, window)
+        np.testing.assert_array_equal(_rolling_corr_strict(x, y, window), exp_corr)
+        np.testing.assert_array_equal(alpha, exp_alpha)
+        np.testing.assert_array_equal(beta, exp_beta)
+        np.testing.assert_array_equal(r2, exp_r2)
+        np.testing.assert_array_equal(_rolling_resid_std_strict(x, y, window, alpha, beta), exp_rs)
+        np.testing.assert_array_equal(_rolling_z_strict(x, window), exp_z)
+        np.testing.assert_array_equal(_rolling_sum_strict(x, window), exp_sum)
@@ -0,0 +1,325 @@
+"""Parity of the O(n) indicator kernels against the original windowed-scan implementations."""
+
+import math
+import unittest
+
+import numpy as np
+from numba import njit
+
+from indicators.numba_indicators import (
+    _percentile_rank_fenwick,
+    atr_wilder,
+    atr_wilder_multi,
+    bbands_pb,
+    bbands_width,
+    dist_to_hh,
+    dist_to_ll,
+    donchian_width,
+    ema,
+    ema_multi,
+    hh,
+    hh_multi,
+    ll,
+    ll_multi,
+    percentile_rank,
+    rolling_max,
+    rolling_min,
+    rolling_stdev,
+    sma,
+    sma_multi,
+)
+
+EPS = 2.0 ** -52
+
+
+@njit
+def _rolling_max_scan(arr, window):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0:
+        return out
+    for i in range(n):
+        if i < window - 1:
+            continue
+        start = i - window + 1
+        m = arr[start]
+        for j in range(start + 1, i + 1):
+            v = arr[j]
+            if v > m:
+                m = v
+        out[i] = m
+    return out
+
+
+@njit
+def _rolling_min_scan(arr, window):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0:
+        return out
+    for i in range(n):
+        if i < window - 1:
+            continue
+        start = i - window + 1
+        m = arr[start]
+        for j in range(start + 1, i + 1):
+            v = arr[j]
+            if v < m:
+                m = v
+        out[i] = m
+    return out
+
+
+@njit
+def _sma_direct(arr, window):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0:
+        return out
+    for i in range(window - 1, n):
+        s = 0.0
+        for j in range(i - window + 1, i + 1):
+            s += arr[j]
+        out[i] = s / window
+    return out
+
+
+@njit
+def _stdev_direct(arr, window):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 1:
+        return out
+    for i in range(window - 1, n):
+        sum_x = 0.0
+        sum_x2 = 0.0
+        for j in range(i - window + 1, i + 1):
+            val = arr[j]
+            sum_x += val
+            sum_x2 += val * val
+        mean = sum_x / window
+        var = (sum_x2 / window) - (mean * mean)
+        var_sample = var * (window / (window - 1))
+        if var_sample < 0:
+            var_sample = 0.0
+        out[i] = np.sqrt(var_sample)
+    return out
+
+
+def _bbands_direct(arr, window):
+    m = _sma_direct(arr, window)
+    sd = _stdev_direct(arr, window)
+    upper = m + 2.0 * sd
+    lower = m - 2.0 * sd
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pb = np.where(upper - lower == 0.0, np.nan, (arr - lower) / (upper - lower))
+        width = np.where(m == 0.0, np.nan, (upper - lower) / m)
+    if window <= 1:
+        pb[:] = np.nan
+        width[:] = np.nan
+    return pb, width
+
+
+@njit
+def _percentile_rank_scan(arr, window):
+    n = arr.shape[0]
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window <= 0:
+        return out
+    for i in range(n):
+        start = i - window + 1
+        if start < 0:
+            start = 0
+        cur = arr[i]
+        cnt = 0
+        denom = i - start + 1
+        for j in range(start, i + 1):
+            if arr[j] <= cur:
+                cnt += 1
+        out[i] = cnt / float(denom)
+    return out
+
+
+@njit
+def _atr_wilder_direct(high, low, close, window):
+    n = len(high)
+    out = np.full(n, np.nan, dtype=np.float64)
+    if window > n or window <= 0:
+        return out
+    tr = np.empty(n, dtype=np.float64)
+    tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        tr[i] = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    tr_sum = 0.0
+    for i in range(window):
+        tr_sum += tr[i]
+    out[window - 1] = tr_sum / window
+    for i in range(window, n):
+        out[i] = (out[i - 1] * (window - 1) + tr[i]) / window
+    return out
+
+
+def _series(seed: int, n: int = 3000) -> list[np.ndarray]:
+    rng = np.random.default_rng(seed)
+    walk = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    ties = np.round(walk / 2.0) * 2.0  # long runs of equal values
+    signed_zero = rng.choice([0.0, -0.0, 1.0, -1.0], size=n)
+    with_nan = walk.copy()
+    with_nan[rng.random(n) < 0.05] = np.nan
+    with_nan[:3] = np.nan
+    with_inf = walk.copy()
+    with_inf[rng.integers(0, n, 10)] = np.inf
+    with_inf[rng.integers(0, n, 10)] = -np.inf
+    return [walk, ties, signed_zero, with_nan, with_inf, np.sort(walk), np.sort(walk)[::-1].copy()]
+
+
+def _same_bits(a: np.ndarray, b: np.ndarray) -> bool:
+    return a.shape == b.shape and np.array_equal(a.view(np.int64), b.view(np.int64))
+
+
+class TestRollingExtremaParity(unittest.TestCase):
+    WINDOWS = (-1, 0, 1, 2, 3, 20, 120, 2999, 3000, 3001)
+
+    def test_rolling_max_min_bit_identical(self):
+        for seed in (0, 1):
+            for arr in _series(seed):
+                for w in self.WINDOWS:
+                    self.assertTrue(_same_bits(rolling_max(arr, w), _rolling_max_scan(arr, w)), (seed, w))
+                    self.assertTrue(_same_bits(rolling_min(arr, w), _rolling_min_scan(arr, w)), (seed, w))
+                    self.assertTrue(_same_bits(hh(arr, w), _rolling_max_scan(arr, w)))
+                    self.assertTrue(_same_bits(ll(arr, w), _rolling_min_scan(arr, w)))
+
+    def test_derived_features_unchanged(self):
+        rng = np.random.default_rng(5)
+        close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, 2000))
+        high = close + np.abs(rng.normal(0.0, 0.5, 2000))
+        low = close - np.abs(rng.normal(0.0, 0.5, 2000))
+        high[100] = np.nan
+        for w in (5, 60, 240):
+            hh_ref = _rolling_max_scan(high, w)
+            ll_ref = _rolling_min_scan(low, w)
+            exp_width = np.where(np.arange(2000) >= w - 1, (hh_ref - ll_ref) / close, np.nan)
+            self.assertTrue(_same_bits(donchian_width(high, low, close, w), exp_width))
+            exp_hh = np.where(np.arange(2000) >= w - 1, close / hh_ref - 1.0, np.nan)
+            exp_ll = np.where(np.arange(2000) >= w - 1, close / ll_ref - 1.0, np.nan)
+            self.assertTrue(_same_bits(dist_to_hh(high, close, w), exp_hh))
+            self.assertTrue(_same_bits(dist_to_ll(low, close, w), exp_ll))
+
+
+
+class TestRunningSumKernels(unittest.TestCase):
+    WINDOWS = (-1, 0, 1, 2, 3, 20, 240, 2999, 3000, 3001)
+
+    def _assert_same(self, got, exp, msg=None):
+        self.assertTrue(_same_bits(got, exp), msg)
+
+    def test_exact_sums_are_bit_identical(self):
+        # Tick-multiple prices keep every running sum exact, so nothing may move.
+        rng = np.random.default_rng(2)
+        ticks = np.round((17000.0 + np.cumsum(rng.normal(0.0, 10.0, 3000))) * 4.0) / 4.0
+        flat = np.full(3000, 1234.5)
+        for arr in (ticks, flat):
+            for w in self.WINDOWS:
+                for compensated in (False, True):
+                    self._assert_same(sma(arr, w, compensated), _sma_direct(arr, w), w)
+                    self._assert_same(rolling_stdev(arr, w, compensated), _stdev_direct(arr, w), w)
+                    pb, width = _bbands_direct(arr, w)
+                    np.testing.assert_array_equal(bbands_pb(arr, w, compensated), pb)
+                    np.testing.assert_array_equal(bbands_width(arr, w, compensated), width)
+
+    def test_float_series_within_documented_tolerance(self):
+        for seed in (0, 1):
+            for arr in _series(seed)[:2] + [1.2 + np.cumsum(np.random.default_rng(seed).normal(0.0, 1e-4, 3000))]:
+                for w in (2, 5, 20, 240):
+                    for compensated in (False, True):
+                        got = sma(arr, w, compensated)
+                        ref = _sma_direct(arr, w)
+                        np.testing.assert_array_equal(np.isnan(got), np.isnan(ref))
+                        tol = 4.0 * w * EPS * np.max(np.abs(arr))
+                        self.assertLessEqual(np.nanmax(np.abs(got - ref)), tol, (seed, w))
+
+                        sd = rolling_stdev(arr, w, compensated)
+                        sd_ref = _stdev_direct(arr, w)
+                        np.testing.assert_array_equal(np.isnan(sd), np.isnan(sd_ref))
+                        var_tol = 16.0 * w * EPS * np.max(arr * arr)
+                        self.assertLessEqual(np.nanmax(np.abs(sd * sd - sd_ref * sd_ref)), var_tol, (seed, w))
+
+                    # Default mode re-seeds from a direct sum every `w` bars.
+                    reseed = np.arange(w - 1, arr.shape[0], w)
+                    self._assert_same(sma(arr, w)[reseed], _sma_direct(arr, w)[reseed])
+                    self._assert_same(rolling_stdev(arr, w)[reseed], _stdev_direct(arr, w)[reseed])
+
+    def test_non_finite_windows_unchanged(self):
+        for seed in (0, 1):
+            series = _series(seed)
+            for arr in (series[3], series[4]):
+                for w in self.WINDOWS:
+                    got = sma(arr, w)
+                    ref = _sma_direct(arr, w)
+                    bad = ~np.isfinite(ref)
+                    np.testing.assert_array_equal(got[bad], ref[bad])  # NaN payloads may differ
+                    sd = rolling_stdev(arr, w)
+                    np.testing.assert_array_equal(np.isnan(sd), np.isnan(_stdev_direct(arr, w)))
+
+    def test_compensated_mode_tracks_exact_sum_on_long_series(self):
+        rng = np.random.default_rng(3)
+        n, w = 200_000, 240
+        arr = 1e6 + (rng.normal(0.0, 1.0, n) * np.arange(n)) % 7.3
+        idx = np.arange(w - 1, n, 997)
+        exact = np.array([math.fsum(arr[i - w + 1 : i + 1]) / w for i in idx])
+        got = sma(arr, w, True)[idx]
+        self.assertLessEqual(np.max(np.abs(got - exact)), EPS * np.max(np.abs(arr)))
+
+
+
+class TestPercentileRankParity(unittest.TestCase):
+    def test_bit_identical_including_prefix(self):
+        for seed in (0, 1):
+            for arr in _series(seed) + [np.full(50, np.nan), np.empty(0)]:
+                for w in (-1, 0, 1, 2, 3, 20, 250, 300, 301, 2999, 3000, 5000):
+                    ref = _percentile_rank_scan(arr, w)
+                    self.assertTrue(_same_bits(percentile_rank(arr, w), ref), (seed, w))
+                    if w > 0:
+                        # Exercise the order-statistic kernel below the dispatch threshold too.
+                        self.assertTrue(_same_bits(_percentile_rank_fenwick(arr, w), ref), (seed, w))
+
+
+
+class TestMultiWindowKernels(unittest.TestCase):
+    WINDOWS = np.array([5, 10, 20, 1, 240, 20, 0, -3, 2999, 3000, 3001, 2], dtype=np.int64)
+
+    def test_rows_match_single_window_kernels(self):
+        for seed in (0, 1):
+            for arr in _series(seed):
+                for compensated in (False, True):
+                    batch = sma_multi(arr, self.WINDOWS, compensated)
+                    self.assertEqual(batch.shape, (len(self.WINDOWS), arr.shape[0]))
+                    for k, w in enumerate(self.WINDOWS):
+                        np.testing.assert_array_equal(batch[k], sma(arr, w, compensated), err_msg=str(w))
+                for multi, single in ((ema_multi, ema), (hh_multi, hh), (ll_multi, ll)):
+                    batch = multi(arr, self.WINDOWS)
+                    for k, w in enumerate(self.WINDOWS):
+                        self.assertTrue(_same_bits(batch[k], single(arr, w)), (single.__name__, w))
+
+    def test_atr_rows_match_single_window(self):
+        rng = np.random.default_rng(4)
+        close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, 3000))
+        high = close + np.abs(rng.normal(0.0, 0.5, 3000))
+        low = close - np.abs(rng.normal(0.0, 0.5, 3000))
+        high[50] = np.nan
+        for n in (0, 1, 3000):
+            batch = atr_wilder_multi(high[:n], low[:n], close[:n], self.WINDOWS)
+            for k, w in enumerate(self.WINDOWS):
+                ref = _atr_wilder_direct(high[:n], low[:n], close[:n], w)
+                self.assertTrue(_same_bits(atr_wilder(high[:n], low[:n], close[:n], w), ref), w)
+                self.assertTrue(_same_bits(batch[k], ref), w)
+
+    def test_empty_window_vector(self):
+        arr = np.arange(10.0)
+        none = np.empty(0, dtype=np.int64)
+        for out in (sma_multi(arr, none), ema_multi(arr, none), hh_multi(arr, none), ll_multi(arr, none)):
+            self.assertEqual(out.shape, (0, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""The warm-up entry point must cover every public numba kernel and report each one."""
+
+import inspect
+import io
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from numba.core.registry import CPUDispatcher
+
+from indicators import numba_indicators as ni
+from indicators.warmup import KERNEL_ARGS, main, warm_up
+
+
+class TestNumbaWarmup(unittest.TestCase):
+    def test_covers_every_public_kernel(self):
+        public = {
+            name for name, obj in inspect.getmembers(ni)
+            if isinstance(obj, CPUDispatcher) and not name.startswith("_")
+        }
+        self.assertEqual(set(KERNEL_ARGS), public)
+
+    def test_reports_each_kernel(self):
+        results = warm_up(("float64",), include_simulator=True)
+        names = [r.name for r in results]
+        self.assertEqual(names[: len(KERNEL_ARGS)], list(KERNEL_ARGS))
+        self.assertIn("simulator.simulate_bar_engine", names)
+        self.assertFalse([r for r in results if r.error])
+        for r in results:
+            self.assertIn(r.source, ("compiled", "cache", "memory"))
+            self.assertGreaterEqual(r.seconds, 0.0)
+        # second pass in the same process is served from memory
+        again = warm_up(("float64",), include_simulator=False)
+        self.assertEqual({r.source for r in again}, {"memory"})
+
+    def test_cli_exit_code(self):
+        self.assertEqual(main(["--no-simulator"]), 0)
+
+    def test_worker_warms_in_background(self):
+        from control.supervisor import worker
+
+        release = threading.Event()
+
+        class SlowWarmup:
+            returncode = 0
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def communicate(self):
+                release.wait(5)
+                return "42 kernels in 9.00s\n", ""
+
+        out = io.StringIO()
+        with mock.patch.object(worker.subprocess, "Popen", SlowWarmup), redirect_stdout(out):
+            thread = worker._warm_numba_cache()  # returns while the warm-up is still running
+            self.assertTrue(thread.is_alive())
+            release.set()
+            thread.join(5)
+        self.assertIn("NUMBA WARMUP: ok", out.getvalue())
+        self.assertIn("42 kernels", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
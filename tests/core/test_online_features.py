@@ -0,0 +1,138 @@
+"""Online indicator states and feature resumption must reproduce the full computation bit for bit."""
+
+import unittest
+
+import numpy as np
+
+from contracts.features import FeatureRegistry, FeatureSpec, default_feature_registry
+from core.features import compute_features_for_tf
+from core.features.compute import compute_rolling_z
+from core.features.online import FeatureState, capture_feature_state, resume_features_for_tf
+from core.resampler import SessionSpecTaipei
+from indicators import numba_indicators as ni
+from indicators.online import AdxState, AtrState, EmaState, MacdState, RollingZState, RsiState
+
+SESSION = SessionSpecTaipei("00:00", "24:00", [])
+NAMES = [
+    "sma_5", "sma_20", "ema_1", "ema_12", "hh_10", "ll_7", "percentile_30", "vx_percentile_450", "zscore_20",
+    "bb_pb_20", "bb_width_10", "atr_ch_upper_14", "atr_ch_lower_5", "atr_ch_pos_10", "atr_pct_14",
+    "atr_pct_z_20", "atr_14", "atr_5", "donchian_width_20", "dist_hh_10", "dist_ll_10", "rsi_14", "adx_14",
+    "di_plus_14", "di_minus_5", "macd_hist_12_26_9", "roc_10", "ret_z_50", "ret_z_200", "session_vwap",
+]
+
+
+def _bars(n, seed):
+    rng = np.random.default_rng(seed)
+    ts = np.datetime64("2024-01-02T00:00:00") + np.arange(n) * np.timedelta64(900, "s")
+    c = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    if seed % 2:
+        c = np.round(c * 4) / 4  # tick prices: many zero diffs / ties
+    o = c + rng.normal(0.0, 0.2, n)
+    h = np.maximum(o, c) + rng.random(n)
+    l = np.minimum(o, c) - rng.random(n)
+    for a in (c, h, l):
+        a[rng.random(n) < 0.02] = np.nan
+    return ts, o, h, l, c, rng.integers(0, 100, n)
+
+
+def _registry():
+    return FeatureRegistry(specs=[
+        FeatureSpec(name=name, timeframe_min=15, min_warmup_bars=(7 * i) % 40) for i, name in enumerate(NAMES)
+    ])
+
+
+class TestOnlineIndicatorStates(unittest.TestCase):
+    def _chunked(self, new_state, update, n, seed, outputs=1):
+        rng = np.random.default_rng(seed)
+        bounds = [0, *sorted(rng.integers(0, n + 1, 4).tolist()), n]
+        state, parts = new_state(), []
+        for a, b in zip(bounds[:-1], bounds[1:]):
+            state = type(state).from_arrays(state.to_arrays())  # round-trip between chunks
+            parts.append(update(state, a, b))
+        if outputs == 1:
+            return np.concatenate(parts)
+        return tuple(np.concatenate([p[k] for p in parts]) for k in range(outputs))
+
+    def test_states_match_full_kernels(self):
+        for seed in range(12):
+            ts, o, h, l, c, v = _bars(300, seed)
+            for w in (1, 2, 14, 40):
+                with self.subTest(seed=seed, window=w):
+                    cases = {
+                        "ema": (self._chunked(lambda: EmaState(w), lambda s, a, b: s.update(c[a:b]), 300, seed), ni.ema(c, w)),
+                        "atr": (
+                            self._chunked(lambda: AtrState(w), lambda s, a, b: s.update(h[a:b], l[a:b], c[a:b]), 300, seed),
+                            ni.atr_wilder(h, l, c, w),
+                        ),
+                        "rsi": (self._chunked(lambda: RsiState(w), lambda s, a, b: s.update(c[a:b]), 300, seed), ni.rsi_wilder(c, w)),
+                        "z": (self._chunked(lambda: RollingZState(w), lambda s, a, b: s.update(c[a:b]), 300, seed), compute_rolling_z(c, w)),
+                        "macd": (
+                            self._chunked(lambda: MacdState(w, 26, 9), lambda s, a, b: s.update(c[a:b]), 300, seed),
+                            ni.macd_hist(c, w, 26, 9),
+                        ),
+                    }
+                    adx = self._chunked(lambda: AdxState(w), lambda s, a, b: s.update(h[a:b], l[a:b], c[a:b]), 300, seed, 3)
+                    for name, got, ref in zip(("adx", "di_plus", "di_minus"), adx, ni.adx_wilder(h, l, c, w)):
+                        cases[name] = (got, ref)
+                    for name, (got, ref) in cases.items():
+                        self.assertEqual(got.tobytes(), ref.tobytes(), name)
+
+
+class TestResumeFeatures(unittest.TestCase):
+    def _assert_resume_matches_full(self, registry, n_old, n, seed):
+        bars = _bars(n, seed)
+        old = [a[:n_old].copy() for a in bars]
+        for a in old[1:5]:
+            a[-1] += 0.5  # the last previous bar was a partial bucket
+        previous = compute_features_for_tf(*old, 15, registry, SESSION)
+        state = FeatureState.from_arrays(capture_feature_state(*old, 15, registry).to_arrays())
+
+        got, new_state, full = resume_features_for_tf(*bars, 15, registry, SESSION, previous, state)
+        ref = compute_features_for_tf(*bars, 15, registry, SESSION)
+        self.assertEqual(sorted(got), sorted(ref))
+        for key in ref:
+            self.assertEqual(got[key].tobytes(), ref[key].tobytes(), key)
+        # the advanced state is the one a fresh capture would produce
+        captured = capture_feature_state(*bars, 15, registry)
+        self.assertEqual(new_state.checkpoint, captured.checkpoint)
+        self.assertEqual(new_state.bars_sha256, captured.bars_sha256)
+        self.assertEqual(sorted(new_state.states), sorted(captured.states))
+        for key, value in captured.states.items():
+            self.assertEqual(new_state.states[key].tobytes(), value.tobytes(), key)
+        return full
+
+    def test_resume_matches_full(self):
+        cases = [(_registry(), 700, 760), (_registry(), 699, 700), (default_feature_registry(), 500, 900)]
+        for k, (registry, n_old, n) in enumerate(cases):
+            with self.subTest(n_old=n_old, n=n):
+                full = self._assert_resume_matches_full(registry, n_old, n, k)
+                self.assertEqual(full, ["session_vwap"])  # whole-series statistic
+
+    def test_length_gated_kernels_recompute_until_previous_is_long_enough(self):
+        full = self._assert_resume_matches_full(_registry(), 20, 400, 3)
+        self.assertIn("adx_14", full)
+        self.assertIn("macd_hist_12_26_9", full)
+        self.assertNotIn("ema_12", full)
+
+    def test_state_rejected_when_prefix_or_specs_change(self):
+        registry = _registry()
+        ts, o, h, l, c, v = _bars(300, 5)
+        previous = compute_features_for_tf(ts[:200], o[:200], h[:200], l[:200], c[:200], v[:200], 15, registry, SESSION)
+        state = capture_feature_state(ts[:200], o[:200], h[:200], l[:200], c[:200], v[:200], 15, registry)
+
+        c2 = c.copy()
+        c2[50] += 1.0  # history before the checkpoint changed
+        self.assertIsNone(resume_features_for_tf(ts, o, h, l, c2, v, 15, registry, SESSION, previous, state))
+        other = FeatureRegistry(specs=[*registry.specs, FeatureSpec(name="ema_30", timeframe_min=15)])
+        self.assertIsNone(resume_features_for_tf(ts, o, h, l, c, v, 15, other, SESSION, previous, state))
+        self.assertIsNone(resume_features_for_tf(ts[:150], o[:150], h[:150], l[:150], c[:150], v[:150], 15, registry, SESSION, previous, state))
+
+    def test_incomplete_meta_is_rejected(self):
+        for meta in ('{"version": 1}', '{"version": 1, "checkpoint": 3}', "[]", "{", '{"version": 0}'):
+            with self.subTest(meta=meta):
+                with self.assertRaises(ValueError):
+                    FeatureState.from_arrays({"__meta__": np.array(meta)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""The array-based resample_ohlcv must reproduce the per-bar session / groupby definition exactly."""
+
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from core.resampler import SessionSpecTaipei, compute_session_start, resample_ohlcv, resample_ohlcv_multi
+
+
+def _reference(ts, o, h, l, c, v, tf_min, session, start_ts=None):
+    rows, buckets = [], []
+    for i, t in enumerate(ts):
+        dt = pd.Timestamp(t).to_pydatetime()
+        if not session.is_in_session(dt) or session.is_in_break(dt):
+            continue
+        if start_ts is not None and dt < start_ts:
+            continue
+        start = compute_session_start(dt, session)
+        minutes = int((dt - start).total_seconds() // 60)
+        buckets.append(start + timedelta(minutes=(minutes // tf_min) * tf_min))
+        rows.append((o[i], h[i], l[i], c[i], v[i]))
+    df = pd.DataFrame(rows, columns=["open", "high", "low", "close", "volume"])
+    g = df.groupby(pd.DatetimeIndex(buckets), sort=True)
+    out = pd.DataFrame({
+        "open": g["open"].first(), "high": g["high"].max(), "low": g["low"].min(),
+        "close": g["close"].last(), "volume": g["volume"].sum(),
+    })
+    return {
+        "ts": out.index.to_numpy(dtype="datetime64[s]"),
+        **{k: out[k].to_numpy(dtype="int64" if k == "volume" else "float64") for k in out},
+    }
+
+
+def _bars(n, seed):
+    rng = np.random.default_rng(seed)
+    ts = (np.datetime64("2024-03-08T00:00:00") + np.cumsum(rng.integers(1, 3, n)) * np.timedelta64(1, "m"))
+    c = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    o = c + rng.normal(0.0, 0.2, n)
+    h = np.maximum(o, c) + 0.5
+    l = np.minimum(o, c) - 0.5
+    for a in (o, c):
+        a[rng.random(n) < 0.1] = np.nan  # first/last skip NaN like groupby first()/last()
+    return ts.astype("datetime64[s]"), o, h, l, c, rng.integers(0, 50, n).astype(np.int64)
+
+
+class TestResampleVectorized(unittest.TestCase):
+    SESSIONS = [
+        SessionSpecTaipei("08:45", "13:45", [("10:00", "10:15")]),
+        SessionSpecTaipei("15:00", "05:00", [("00:00", "00:30")]),  # overnight
+        SessionSpecTaipei("00:00", "24:00", []),
+    ]
+
+    def _assert_same(self, got, ref):
+        self.assertEqual(list(got), list(ref))
+        for k in ref:
+            self.assertEqual(got[k].dtype, ref[k].dtype, k)
+            np.testing.assert_array_equal(got[k], ref[k], err_msg=k)
+
+    def test_matches_per_bar_reference(self):
+        for s, session in enumerate(self.SESSIONS):
+            ts, o, h, l, c, v = _bars(4000, s)
+            for tf in (1, 15, 60, 240):
+                with self.subTest(session=session.open_hhmm, tf=tf):
+                    got = resample_ohlcv(ts, o, h, l, c, v, tf, session)
+                    self._assert_same(got, _reference(ts, o, h, l, c, v, tf, session))
+
+    def test_start_ts_and_unsorted_input(self):
+        session = self.SESSIONS[0]
+        ts, o, h, l, c, v = _bars(2000, 7)
+        start = datetime(2024, 3, 9, 11, 7, 30)
+        got = resample_ohlcv(ts, o, h, l, c, v, 30, session, start_ts=start)
+        self._assert_same(got, _reference(ts, o, h, l, c, v, 30, session, start_ts=start))
+
+        perm = np.random.default_rng(3).permutation(len(ts))
+        args = [a[perm] for a in (ts, o, h, l, c, v)]
+        self._assert_same(resample_ohlcv(*args, 60, session), _reference(*args, 60, session))
+
+    def test_empty_results(self):
+        ts, o, h, l, c, v = _bars(10, 1)
+        session = SessionSpecTaipei("09:00", "09:00", [])  # empty session
+        for got in (resample_ohlcv(ts, o, h, l, c, v, 15, session), resample_ohlcv(ts[:0], o[:0], h[:0], l[:0], c[:0], v[:0], 15, session)):
+            self.assertEqual(len(got["ts"]), 0)
+            self.assertEqual(got["ts"].dtype, np.dtype("datetime64[s]"))
+            self.assertEqual(got["volume"].dtype, np.dtype("int64"))
+
+    def test_multi_matches_single_calls(self):
+        tfs = [15, 30, 60, 120, 240, 7]
+        for s, session in enumerate(self.SESSIONS):
+            ts, o, h, l, c, v = _bars(4000, 10 + s)
+            perm = np.random.default_rng(s).permutation(len(ts))
+            cases = {
+                "sorted": ((ts, o, h, l, c, v), None),
+                "per_tf_start": ((ts, o, h, l, c, v), {60: datetime(2024, 3, 9, 8, 0), 240: datetime(2024, 3, 9, 8, 0)}),
+                "unsorted": (tuple(a[perm] for a in (ts, o, h, l, c, v)), datetime(2024, 3, 9, 3, 0)),
+                "float_volume": ((ts, o, h, l, c, v.astype(np.float64)), None),
+            }
+            for name, (args, start) in cases.items():
+                with self.subTest(session=session.open_hhmm, case=name):
+                    got = resample_ohlcv_multi(*args, tfs, session, start_ts=start)
+                    self.assertEqual(sorted(got), sorted(tfs))
+                    for tf in tfs:
+                        tf_start = start.get(tf) if isinstance(start, dict) else start
+                        self._assert_same(got[tf], resample_ohlcv(*args, tf, session, start_ts=tf_start))
+
+        got = resample_ohlcv_multi(ts[:0], o[:0], h[:0], l[:0], c[:0], v[:0], [15, 60], self.SESSIONS[0])
+        self.assertEqual([len(got[tf]["ts"]) for tf in (15, 60)], [0, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
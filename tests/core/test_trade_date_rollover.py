@@ -1,4 +1,5 @@
 import unittest
+import warnings
 from datetime import datetime
 
 
@@ -86,6 +87,67 @@ class TestTradeDateRollover(unittest.TestCase):
         self.assertTrue(is_trading_time_for_instrument(datetime(2024, 1, 16, 15, 10), "TWF.MXF"))
         self.assertFalse(is_trading_time_for_instrument(datetime(2024, 1, 16, 7, 0), "TWF.MXF"))
 
+    def test_array_apis_match_scalar_across_dst(self) -> None:
+        import numpy as np
+        from datetime import timedelta
+        from zoneinfo import ZoneInfo
+
+        from core.trade_dates import (
+            is_trading_time_for_instrument,
+            session_start_taipei_for_instrument,
+            session_start_taipei_for_instrument_ts,
+            trading_mask_for_instrument,
+        )
+
+        chicago, taipei = ZoneInfo("America/Chicago"), ZoneInfo("Asia/Taipei")
+        # Two days of 7-minute bars around each 2024 Chicago DST transition (Taipei-local naive).
+        ts = np.concatenate([
+            np.datetime64(day) + np.arange(0, 2 * 1440, 7).astype("timedelta64[m]")
+            for day in ("2024-03-10T00:00", "2024-11-03T00:00")
+        ]).astype("datetime64[s]")
+        bars = [t.astype(datetime) for t in ts]
+
+        for instrument in ("CME.MNQ", "OSE.NK225M", "TWF.MXF"):
+            mask = trading_mask_for_instrument(ts, instrument, data_tz="Asia/Taipei")
+            self.assertEqual(mask.tolist(), [is_trading_time_for_instrument(b, instrument) for b in bars])
+            starts = session_start_taipei_for_instrument_ts(ts, instrument, data_tz="Asia/Taipei")
+            self.assertEqual(starts.astype(datetime).tolist(), [session_start_taipei_for_instrument(b, instrument) for b in bars])
+
+        # CME session start straight from zoneinfo: latest 17:00 Chicago at or before the bar.
+        starts = session_start_taipei_for_instrument_ts(ts, "CME.MNQ", data_tz="Asia/Taipei")
+        for b, got in zip(bars, starts.astype(datetime)):
+            exch = b.replace(tzinfo=taipei).astimezone(chicago)
+            roll = exch.replace(hour=17, minute=0, second=0)
+            if exch < roll:
+                roll -= timedelta(days=1)
+            self.assertEqual(got, roll.astimezone(taipei).replace(tzinfo=None))
+
+        self.assertIsNone(trading_mask_for_instrument(ts, "NOPE.XYZ"))
+        self.assertEqual(len(trading_mask_for_instrument(ts[:0], "CME.MNQ")), 0)
+
+    def test_trade_days_ambiguous_wall_time_and_nat(self) -> None:
+        import numpy as np
+
+        from core.trade_dates import trade_days_for_ts
+
+        kw = dict(exchange_tz="America/Chicago", trade_date_roll_time_local="17:00")
+        # 01:30 happens twice in Chicago on 2024-11-03 (pandas tz_localize raises too).
+        with self.assertRaises(ValueError):
+            trade_days_for_ts(np.array(["2024-11-03T01:30"], dtype="datetime64[s]"), data_tz="America/Chicago", **kw)
+
+        ts = np.array(["2024-11-03T16:59", "NaT", "2024-11-03T17:00"], dtype="datetime64[s]")
+        # NaT fill must carry a unit: numpy deprecates the generic one.
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            days = trade_days_for_ts(ts, data_tz="America/Chicago", **kw)
+        # The fall-back day is 25 hours long, so "+1 day" from local midnight lands on 23:00 the
+        # same date (tz-aware pandas arithmetic); the legacy bucket is kept.
+        self.assertEqual(days[0], np.datetime64("2024-11-03"))
+        self.assertTrue(np.isnat(days[1]))
+        self.assertEqual(days[2], np.datetime64("2024-11-03"))
+        days = trade_days_for_ts(ts[[2]] + np.timedelta64(1, "D"), data_tz="America/Chicago", **kw)
+        self.assertEqual(days[0], np.datetime64("2024-11-05"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from core.backtest.simulator import CostConfig
+
+
+class MeanCrossStrategy:
+    def __init__(self, params):
+        self.window = int(params.get("window", 10))
+        self.band = float(params.get("band", 0.0))
+
+    def compute_signals(self, df: pd.DataFrame) -> pd.Series:
+        dev = df["close"] - df["close"].rolling(self.window).mean()
+        return (dev > self.band).astype(float) - (dev < -self.band).astype(float)
+
+
+class TestParallelScreening(unittest.TestCase):
+    def test_pool_results_match_serial_in_order(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _CandidateScreener
+
+        rng = np.random.default_rng(4)
+        n = 1500
+        ts64 = (np.datetime64("2020-01-01T00:00:00") + np.arange(n) * np.timedelta64(3600, "s")).astype("datetime64[s]")
+        close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+        open_ = close + rng.normal(0.0, 0.3, n)
+        data = {
+            "open": open_,
+            "high": np.maximum(open_, close) + 0.5,
+            "low": np.minimum(open_, close) - 0.5,
+            "close": close,
+            "volume": np.full(n, 100.0),
+        }
+        segments = {"a": slice(0, 900), "b": slice(300, 1400)}
+        candidates = [{"window": w, "band": b} for w in (5, 10, 20, 40) for b in (0.0, 0.5, 1.0)]
+        kwargs = dict(
+            segments=segments,
+            ts64=ts64,
+            data=data,
+            features_data1={"atr_14": np.abs(rng.normal(1.0, 0.1, n))},
+            features_data2=None,
+            cross_features=None,
+            alias_map={},
+            dataset_id="TEST.DS",
+            data2_id=None,
+            season="2020Q1",
+            tf_min=60,
+            strategy_class=MeanCrossStrategy,
+            initial_equity=10_000.0,
+            cost=CostConfig(slippage_ticks_per_side=1.0, commission_per_side=1.0, tick_size=0.25, multiplier=2.0, fx_rate=1.0),
+        )
+
+        with _CandidateScreener(workers=1, **kwargs) as serial:
+            expected = {key: serial.screen(key, candidates) for key in segments}
+        # Pool size is capped by os.cpu_count(); lift the cap so the pool path runs on small CI boxes.
+        beats: list[str] = []
+        with (
+            mock.patch("os.cpu_count", return_value=4),
+            mock.patch("control.supervisor.handlers.run_research_wfs.HEARTBEAT_INTERVAL_SEC", 0.0),
+            _CandidateScreener(workers=2, heartbeat=beats.append, **kwargs) as pooled,
+        ):
+            self.assertEqual(pooled.workers, 2)
+            # one uniquely named .npy per shared array (5 bar columns + ts + 1 feature)
+            self.assertEqual(len(list(Path(pooled._tmp.name).glob("*.npy"))), 7)
+            got = {key: pooled.screen(key, candidates) for key in segments}
+        self.assertEqual(sorted(set(beats)), sorted(segments))
+
+        for key in segments:
+            for exp, actual in zip(expected[key], got[key]):
+                np.testing.assert_array_equal(actual, exp)
+        self.assertGreater(int(expected["a"][2].sum()), 0)
+
+    def test_segment_cache_is_bounded_lru(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _SegmentCache
+
+        cache = _SegmentCache(2)
+        cache[(0, 10)] = "a"
+        cache[(10, 20)] = "b"
+        self.assertEqual(cache[(0, 10)], "a")  # (0, 10) is now the most recent
+        cache[(20, 30)] = "c"
+        self.assertEqual(list(cache), [(0, 10), (20, 30)])
+        for k in range(10):
+            cache[(k, k + 1)] = k
+        self.assertEqual(len(cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+
+class FakeScreener:
+    """Deterministic per-(candidate, window) metrics; counts evaluations."""
+
+    def __init__(self, n_windows: int) -> None:
+        self.calls = []
+        rng = np.random.default_rng(1)
+        self.quality = rng.normal(0.0, 1.0, 500)
+        self.window_noise = rng.normal(0.0, 0.3, (500, n_windows))
+
+    def screen(self, segment_key, candidates):
+        w = int(segment_key.split("_")[1])
+        idx = np.array([c["id"] for c in candidates], dtype=np.int64)
+        self.calls.append((w, len(candidates)))
+        net = 100.0 * (self.quality[idx] + self.window_noise[idx, w])
+        mdd = np.full(len(idx), 50.0)
+        trades = np.full(len(idx), 40, dtype=np.int64)
+        return net, mdd, trades
+
+
+class TestScreeningStrategy(unittest.TestCase):
+    def test_window_priority_spreads_and_starts_recent(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _window_priority
+
+        self.assertEqual(_window_priority(5), [4, 0, 2, 3, 1])
+        self.assertEqual(sorted(_window_priority(12)), list(range(12)))
+        self.assertEqual(_window_priority(0), [])
+
+    def test_full_evaluates_everything(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _screen_grid
+
+        cands = [{"id": i} for i in range(30)]
+        screener = FakeScreener(4)
+        net, _, _, alive, record = _screen_grid(screener, cands, 4, strategy="full", top_k_limit=10, mdd_floor=200.0)
+        self.assertEqual(alive.tolist(), list(range(30)))
+        self.assertEqual(record["evaluations"], record["full_evaluations"])
+        self.assertEqual(screener.calls, [(w, 30) for w in range(4)])
+        np.testing.assert_array_equal(net[:, 2], screener.screen("is_2", cands)[0])
+
+    def test_successive_halving_spends_less_and_records_rungs(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _screen_grid
+
+        cands = [{"id": i} for i in range(400)]
+        screener = FakeScreener(9)
+        net, _, _, alive, record = _screen_grid(
+            screener, cands, 9, strategy="successive_halving", top_k_limit=20, mdd_floor=200.0, eta=3, min_windows=1
+        )
+        self.assertEqual(record["strategy"], "successive_halving")
+        self.assertEqual([r["candidates"] for r in record["rungs"]], [400, 134, 45])
+        self.assertEqual(len(record["rungs"][0]["windows"]), 1)
+        self.assertEqual(record["rungs"][-1]["windows"], list(range(9)))
+        self.assertEqual(alive.size, 45)
+        self.assertLess(record["evaluations"], record["full_evaluations"] // 2)
+        self.assertEqual(record["evaluations"], sum(n for _, n in screener.calls))
+        # Survivors carry full-window metrics; the strongest candidate survives.
+        self.assertIn(int(np.argmax(screener.quality[:400])), alive.tolist())
+        np.testing.assert_array_equal(net[alive, 5], screener.screen("is_5", [cands[i] for i in alive])[0])
+
+    def test_rejects_unknown_strategy(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _screen_grid
+
+        with self.assertRaises(ValueError):
+            _screen_grid(FakeScreener(2), [{"id": 0}], 2, strategy="random", top_k_limit=1, mdd_floor=1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+import numpy as np
+
+
+class TestSegmentRanges(unittest.TestCase):
+    def test_segment_range_matches_boolean_mask(self) -> None:
+        from control.supervisor.handlers.run_research_wfs import _segment_range, _segment_view
+
+        rng = np.random.default_rng(0)
+        ts64 = np.sort(rng.integers(0, 10_000, 500)).astype("datetime64[s]")
+        bounds = [(0, 9_999), (1_234, 5_678), (-50, 10), (9_990, 20_000), (4_000, 3_000), (int(ts64[7].astype(np.int64)),) * 2]
+        for lo, hi in bounds:
+            start, end = np.datetime64(lo, "s"), np.datetime64(hi, "s")
+            seg = _segment_range(ts64, start, end)
+            mask = (ts64 >= start) & (ts64 <= end)
+            np.testing.assert_array_equal(ts64[seg], ts64[mask])
+
+        view = _segment_view(ts64, slice(10, 20))
+        self.assertTrue(np.shares_memory(view, ts64))
+        self.assertFalse(view.flags.writeable)
+
+
+if __name__ == "__main__":
+    unittest.main()